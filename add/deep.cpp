@@ -8,6 +8,9 @@
 #include <fstream>
 #include <algorithm>
 #include <vector>
+#include <string>
+#include "../perfkit/native/measure.h"
+#include "../perfkit/native/timing.h"
 using namespace std;
 
 // 获取当前时间（微秒级）
@@ -213,7 +216,28 @@ struct BenchmarkResult {
     double speedup_unrolled8;
 };
 
-int main() {
+int main(int argc, char* argv[]) {
+    bool adaptive = false; // --adaptive: 重复到中位数置信区间足够窄为止，而不是固定次数
+    MeasureOptions options;
+    // --batched: CLOCK_MONOTONIC_RAW 纳秒计时，多次调用合成一个不少于 min_sample_ns 的样本
+    bool batched = false;
+    double min_sample_ns = 1e5;
+    for (int i = 1; i < argc; ++i) {
+        string arg = argv[i];
+        if (arg == "--adaptive") {
+            adaptive = true;
+        } else if (arg.rfind("--rel-width=", 0) == 0) {
+            options.rel_width = stod(arg.substr(12));
+        } else if (arg.rfind("--budget=", 0) == 0) {
+            options.budget_us = stod(arg.substr(9)) * 1e6; // 参数单位为秒
+        } else if (arg == "--batched") {
+            batched = true;
+        } else if (arg.rfind("--min-sample-us=", 0) == 0) {
+            min_sample_ns = stod(arg.substr(16)) * 1e3;
+            options.min_sample_us = min_sample_ns / 1e3;
+        }
+    }
+
     const size_t data_sizes[] = {
         // L1d缓存边界附近 (单核~37KB, 约4600个double)
         1024,             // 2^10 = 1,024   (8KB)
@@ -261,6 +285,20 @@ int main() {
     
     // 写入CSV表头
     csv_file << "数据大小,平凡算法(μs),两路链式(μs),递归两两相加(μs),原地两两相加(μs),展开4路(μs),展开8路分块(μs),两路加速比,递归加速比,两两相加加速比,展开4路加速比,展开8路加速比\n";
+
+    // 自适应模式下另存每个 (规模, 算法) 的中位数、置信区间和样本数（长表格式）
+    ofstream adaptive_csv;
+    if (adaptive) {
+        adaptive_csv.open("sum_algorithm_results_adaptive.csv");
+        adaptive_csv << "数据大小,算法,中位数(μs),CI下限(μs),CI上限(μs),样本数\n";
+    }
+
+    // 批量计时模式下另存每次调用的纳秒数和批大小
+    ofstream batched_csv;
+    if (batched) {
+        batched_csv.open("sum_algorithm_results_ns.csv");
+        batched_csv << "数据大小,算法,每次调用(ns),批大小\n";
+    }
     
     random_device rd;
     mt19937 gen(rd());
@@ -315,27 +353,53 @@ int main() {
             cout << "展开8路分块: " << unrolled8_result << "\n";
         }
         
-        // 测量各算法的执行时间
-        double time_naive = time_execution([&]() { naive_sum(data, size); }, runs);
-        double time_two_way = time_execution([&]() { two_way_sum(data, size); }, runs);
-        double time_recursive = time_execution([&]() { recursive_sum(data, size); }, runs);
+        // 固定次数取平均；自适应模式取中位数，并把置信区间写入 adaptive_csv；
+        // 批量模式下每个样本是 batch 次调用，结果换算为每次调用的时间
+        auto measure = [&](const char* name, auto&& func) {
+            if (!adaptive && !batched) {
+                return time_execution(func, runs);
+            }
+            double per_call_us;
+            size_t batch;
+            if (adaptive) {
+                // 自适应模式总是用 CLOCK_MONOTONIC_RAW，并由 measure_adaptive 自己决定批大小
+                MeasureResult stat = measure_adaptive(now_raw_us, func, options);
+                per_call_us = stat.median;
+                batch = stat.batch;
+                adaptive_csv << size << "," << name << "," << per_call_us << ","
+                             << stat.ci_low << "," << stat.ci_high << "," << stat.samples << "\n";
+            } else {
+                batch = calibrate_batch(func, min_sample_ns);
+                per_call_us = median_ci(time_batched(func, batch, runs)).median / 1e3;
+            }
+            if (batched) {
+                batched_csv << size << "," << name << "," << per_call_us * 1e3 << "," << batch << "\n";
+            }
+            return per_call_us;
+        };
+
+        // 测量各算法的执行时间（keep 保留结果，避免没有使用返回值的调用被编译器删除）
+        double time_naive = measure("平凡算法", [&]() { keep(naive_sum(data, size)); });
+        double time_two_way = measure("两路链式", [&]() { keep(two_way_sum(data, size)); });
+        double time_recursive = measure("递归两两相加", [&]() { keep(recursive_sum(data, size)); });
         
         // 原地算法每次需要复制一份新数据
-        double time_in_place = time_execution([&]() {
+        double time_in_place = measure("原地两两相加", [&]() {
             memcpy(data_copy, data, size * sizeof(double));
-            in_place_pairwise_sum(data_copy, size);
-        }, runs);
+            keep(in_place_pairwise_sum(data_copy, size));
+        });
         
         // 新算法性能测试
-        double time_unrolled4 = time_execution([&]() { unrolled_sum4(data, size); }, runs);
-        double time_unrolled8 = time_execution([&]() { unrolled_sum(data, size); }, runs);
+        double time_unrolled4 = measure("展开4路", [&]() { keep(unrolled_sum4(data, size)); });
+        double time_unrolled8 = measure("展开8路分块", [&]() { keep(unrolled_sum(data, size)); });
         
-        // 计算加速比
-        double speedup_two_way = time_naive / time_two_way;
-        double speedup_recursive = time_naive / time_recursive;
-        double speedup_in_place = time_naive / time_in_place;
-        double speedup_unrolled4 = time_naive / time_unrolled4;
-        double speedup_unrolled8 = time_naive / time_unrolled8;
+        // 计算加速比（gettimeofday 计时下小规模可能测得 0 微秒，此时记为 0）
+        auto speedup = [&](double time) { return time > 0 ? time_naive / time : 0.0; };
+        double speedup_two_way = speedup(time_two_way);
+        double speedup_recursive = speedup(time_recursive);
+        double speedup_in_place = speedup(time_in_place);
+        double speedup_unrolled4 = speedup(time_unrolled4);
+        double speedup_unrolled8 = speedup(time_unrolled8);
         
         // 存储结果
         BenchmarkResult result = {
@@ -390,6 +454,14 @@ int main() {
     
     // 关闭CSV文件
     csv_file.close();
+    if (adaptive) {
+        adaptive_csv.close();
+        cout << "自适应测量的置信区间已保存到 sum_algorithm_results_adaptive.csv" << endl;
+    }
+    if (batched) {
+        batched_csv.close();
+        cout << "每次调用的纳秒数已保存到 sum_algorithm_results_ns.csv" << endl;
+    }
     cout << "\n结果已保存到 sum_algorithm_results1.csv" << endl;
     
     return 0;
@@ -2,12 +2,16 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
 import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from perfkit import topology, costmodel
 
 # 创建输出目录
 os.makedirs('sum_analysis_charts', exist_ok=True)
 
 # 读取CSV文件
-df = pd.read_csv('/home/gump/pall/add/sum_algorithm_results6.csv')
+data_file = '/home/gump/pall/add/sum_algorithm_results6.csv'
+df = pd.read_csv(data_file)
 
 # 设置更好的算法名称用于显示
 algorithm_names = {
@@ -32,14 +36,14 @@ speedup_to_algo = {
 line_styles = ['-o', '-s', '-^', '-d', '-*', '-v']
 colors = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b']
 
-# 设置缓存边界
+# 设置缓存边界：使用产生这份数据的机器记录下来的缓存大小
 bytes_per_double = 8
-l1_size_bytes = (896 * 1024) / 24  # 约37KB
-l1_size = int(l1_size_bytes / bytes_per_double)  # 约4600个double
-l2_size_bytes = (32 * 1024 * 1024) / 12  # 约2.67MB
-l2_size = int(l2_size_bytes / bytes_per_double)  # 约333000个double
-l3_size_bytes = 36 * 1024 * 1024  # 36MB
-l3_size = int(l3_size_bytes / bytes_per_double)  # 约4500000个double
+cache_topology = topology.load_for(data_file)
+cache_bounds = topology.boundaries(cache_topology, bytes_per_double)
+l1_size = cache_bounds['L1']
+l2_size = cache_bounds['L2']
+l3_size = cache_bounds['L3']
+print(topology.describe(cache_topology))
 
 # ========== 1. 执行时间随数据规模变化图 (对数坐标) ==========
 plt.figure(figsize=(14, 8))
@@ -57,9 +61,9 @@ for i, algo in enumerate([col for col in df.columns if 'μs' in col]):
               linewidth=linewidth, markersize=8, zorder=zorder)
 
 # 添加缓存边界线
-plt.axvline(x=l1_size, color='gray', linestyle='--', alpha=0.7, label='L1 Cache (~4.6K)')
-plt.axvline(x=l2_size, color='gray', linestyle=':', alpha=0.7, label='L2 Cache (~333K)')
-plt.axvline(x=l3_size, color='gray', linestyle='-.', alpha=0.7, label='L3 Cache (~4.5M)')
+plt.axvline(x=l1_size, color='gray', linestyle='--', alpha=0.7, label=f'L1 Cache (~{topology.format_count(l1_size)})')
+plt.axvline(x=l2_size, color='gray', linestyle=':', alpha=0.7, label=f'L2 Cache (~{topology.format_count(l2_size)})')
+plt.axvline(x=l3_size, color='gray', linestyle='-.', alpha=0.7, label=f'L3 Cache (~{topology.format_count(l3_size)})')
 
 # 标记缓存区域
 plt.fill_betweenx([plt.ylim()[0], plt.ylim()[1]*10], 0, l1_size, color='blue', alpha=0.05)
@@ -99,9 +103,9 @@ for i, col in enumerate(speedup_cols):
                 linewidth=2, markersize=8)
 
 # 添加缓存边界线
-plt.axvline(x=l1_size, color='gray', linestyle='--', alpha=0.7, label='L1 Cache (~4.6K)')
-plt.axvline(x=l2_size, color='gray', linestyle=':', alpha=0.7, label='L2 Cache (~333K)')
-plt.axvline(x=l3_size, color='gray', linestyle='-.', alpha=0.7, label='L3 Cache (~4.5M)')
+plt.axvline(x=l1_size, color='gray', linestyle='--', alpha=0.7, label=f'L1 Cache (~{topology.format_count(l1_size)})')
+plt.axvline(x=l2_size, color='gray', linestyle=':', alpha=0.7, label=f'L2 Cache (~{topology.format_count(l2_size)})')
+plt.axvline(x=l3_size, color='gray', linestyle='-.', alpha=0.7, label=f'L3 Cache (~{topology.format_count(l3_size)})')
 
 # 添加基准线
 plt.axhline(y=1.0, color='r', linestyle='-', alpha=0.5, label='No Speedup (1.0)')
@@ -137,12 +141,7 @@ plt.close()
 plt.figure(figsize=(14, 8))
 
 # 定义缓存区域
-regions = [
-    (0, l1_size, 'L1 Region'),
-    (l1_size, l2_size, 'L2 Region'),
-    (l2_size, l3_size, 'L3 Region'),
-    (l3_size, float('inf'), 'Memory Region')
-]
+regions = topology.regions(cache_topology, bytes_per_double)
 
 # 为每个区域计算平均加速比
 region_data = []
@@ -211,9 +210,9 @@ for idx, row in df.iterrows():
 plt.semilogx(data_sizes, fastest_algo_idx, 'ko-', markersize=8)
 
 # 添加缓存边界线
-plt.axvline(x=l1_size, color='gray', linestyle='--', alpha=0.7, label='L1 Cache (~4.6K)')
-plt.axvline(x=l2_size, color='gray', linestyle=':', alpha=0.7, label='L2 Cache (~333K)')
-plt.axvline(x=l3_size, color='gray', linestyle='-.', alpha=0.7, label='L3 Cache (~4.5M)')
+plt.axvline(x=l1_size, color='gray', linestyle='--', alpha=0.7, label=f'L1 Cache (~{topology.format_count(l1_size)})')
+plt.axvline(x=l2_size, color='gray', linestyle=':', alpha=0.7, label=f'L2 Cache (~{topology.format_count(l2_size)})')
+plt.axvline(x=l3_size, color='gray', linestyle='-.', alpha=0.7, label=f'L3 Cache (~{topology.format_count(l3_size)})')
 
 # 设置y轴刻度为算法名称
 time_cols = [col for col in df.columns if 'μs' in col]
@@ -230,59 +229,43 @@ plt.savefig('sum_analysis_charts/fastest_algorithm_by_size.png', dpi=300)
 plt.close()
 
 # ========== 5. 算法性能可扩展性分析 ==========
-plt.figure(figsize=(14, 8))
+# 对每条 时间-数据量 曲线做分段线性拟合，断点自动检测（不再手工挑选 1K/64K/4M/64M），
+# 每段的斜率就是该区间每个元素的边际耗时，误差线为 95% 置信区间
+fig, (ax_cost, ax_bw) = plt.subplots(2, 1, figsize=(14, 12), sharex=True)
+segment_rows = []
 
-# 计算执行时间增长率
-growth_data = {}
 for i, algo in enumerate([col for col in df.columns if 'μs' in col]):
-    # 选择几个不同规模的数据点计算增长率
-    sizes = [1024, 65536, 4000000, 67108864]  # 1K, 64K, 4M, 64M
-    
-    # 查找最近的数据点
-    times = []
-    actual_sizes = []
-    for size in sizes:
-        closest_idx = (df['数据大小'] - size).abs().idxmin()
-        times.append(df.loc[closest_idx, algo])
-        actual_sizes.append(df.loc[closest_idx, '数据大小'])
-    
-    # 计算不同规模间的增长率
-    growth_rates = []
-    for j in range(1, len(times)):
-        growth = times[j] / times[j-1]
-        size_ratio = actual_sizes[j] / actual_sizes[j-1]
-        normalized_growth = growth / size_ratio  # 归一化为"每翻倍数据量的增长"
-        growth_rates.append(normalized_growth)
-    
-    growth_data[algorithm_names[algo]] = growth_rates
-
-# 创建分组条形图
-n_regions = len(growth_data[list(growth_data.keys())[0]])
-bar_width = 0.12
-index = np.arange(n_regions)
-comparison_labels = ['1K→64K', '64K→4M', '4M→64M']
-
-for i, (algo, rates) in enumerate(growth_data.items()):
-    pos = index + (i - len(growth_data)/2 + 0.5) * bar_width
-    bars = plt.bar(pos, rates, bar_width, label=algo, color=colors[i])
-    
-    # 添加数据标签
-    for bar in bars:
-        height = bar.get_height()
-        plt.text(bar.get_x() + bar.get_width()/2., height + 0.02,
-                 f'{height:.2f}', ha='center', va='bottom', rotation=0, fontsize=8)
-
-# 添加理想增长线
-plt.axhline(y=1.0, color='r', linestyle='--', alpha=0.5, label='Linear Scaling (1.0)')
-
-plt.title('Algorithm Scaling Efficiency (Lower is Better)', fontsize=16)
-plt.xlabel('Size Comparison', fontsize=14)
-plt.ylabel('Normalized Growth Rate', fontsize=14)
-plt.xticks(index, comparison_labels)
-plt.legend(loc='upper left', fontsize=10)
-plt.grid(axis='y', linestyle='--', alpha=0.3)
+    model = costmodel.fit_cost_model(df['数据大小'] * bytes_per_double, df[algo] * 1000, bytes_per_double)
+    segment_rows.extend(costmodel.model_rows(algorithm_names[algo], model))
+    for j, segment in enumerate(model['segments']):
+        span = [segment['start_bytes'] / bytes_per_double, segment['end_bytes'] / bytes_per_double]
+        label = algorithm_names[algo] if j == 0 else None
+        low, high = segment['ns_per_element_ci']
+        ax_cost.plot(span, [segment['ns_per_element']] * 2, color=colors[i], linewidth=3, label=label)
+        ax_cost.fill_between(span, low, high, color=colors[i], alpha=0.15)
+        ax_bw.plot(span, [segment['gbps']] * 2, color=colors[i], linewidth=3, label=label)
+    for breakpoint in model['breakpoints_bytes']:
+        ax_cost.axvline(x=breakpoint / bytes_per_double, color=colors[i], linestyle=':', alpha=0.4)
+    breaks = ', '.join(topology.format_size(value) for value in model['breakpoints_bytes'])
+    print(f"{algorithm_names[algo]}: 断点 [{breaks}]")
+
+for ax in (ax_cost, ax_bw):
+    for boundary, label in [(l1_size, 'L1'), (l2_size, 'L2'), (l3_size, 'L3')]:
+        ax.axvline(x=boundary, color='gray', linestyle='--', alpha=0.6)
+        ax.text(boundary, ax.get_ylim()[1] * 0.95, label, ha='center', fontsize=10, color='gray')
+    ax.set_xscale('log')
+    ax.grid(True, which='both', linestyle='--', alpha=0.3)
+
+ax_cost.set_title('Per-Region Cost from Piecewise-Linear Fit (95% CI, Lower is Better)', fontsize=16)
+ax_cost.set_ylabel('ns per Element', fontsize=14)
+ax_cost.legend(loc='upper left', fontsize=10)
+ax_bw.set_title('Effective Bandwidth per Region', fontsize=16)
+ax_bw.set_xlabel('Data Size (Elements)', fontsize=14)
+ax_bw.set_ylabel('Effective Bandwidth (GB/s)', fontsize=14)
 plt.tight_layout()
 plt.savefig('sum_analysis_charts/scaling_efficiency.png', dpi=300)
 plt.close()
 
+pd.DataFrame(segment_rows).to_csv('sum_analysis_charts/cost_model_segments.csv', index=False)
+
 print("所有图表已生成在 sum_analysis_charts 目录中")
\ No newline at end of file
@@ -1,41 +1,43 @@
-import re
+import os
+import sys
 import glob
 import csv
 
-def parse_value(val):
-    try:
-        return float(val.replace(",", "").strip())
-    except ValueError:
-        return 0
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from perfkit import perf_parser, ingest
+from perfkit.cache import default_cache_path
 
-def extract_data(file):
+def sum_event(record, event):
+    # 合并 cpu_core、cpu_atom 以及不带 PMU 前缀的同名计数器
+    return sum(record.get(key, 0) for key in (event, f"cpu_core_{event}", f"cpu_atom_{event}"))
+
+def extract_data(file, record=None):
+    if record is None:
+        record = perf_parser.parse_perf_file(file)
+
+    # 非混合架构机器上 perf 记录的是不带 PMU 前缀的 cycles 等计数器，一并累加
     data = {
-        "program": file.replace("_perf.txt", ""),
-        "instructions": 0,
-        "cycles": 0,
-        "task_clock": 0,
-        "cache_references": 0,
-        "cache_misses": 0,
-        "L1_misses": 0,
-        "L3_misses": 0
+        "program": ingest.program_name(os.path.basename(file)),
+        "instructions": sum_event(record, "instructions"),
+        "cycles": sum_event(record, "cycles"),
+        "task_clock": sum_event(record, "task_clock"),
+        "cache_references": sum_event(record, "cache_references"),
+        "cache_misses": sum_event(record, "cache_misses"),
+        "L1_misses": sum_event(record, "L1_dcache_load_misses"),
+        "L3_misses": sum_event(record, "LLC_load_misses")
     }
 
-    with open(file) as f:
-        for line in f:
-            if 'instructions' in line:
-                data['instructions'] += parse_value(line.split()[0])
-            elif re.search(r'\bcpu_.*?/cycles/', line):
-                data['cycles'] += parse_value(line.split()[0])
-            elif 'task-clock' in line:
-                data['task_clock'] += parse_value(line.split()[0])
-            elif 'cache-references' in line:
-                data['cache_references'] += parse_value(line.split()[0])
-            elif 'cache-misses' in line:
-                data['cache_misses'] += parse_value(line.split()[0])
-            elif 'L1-dcache-load-misses' in line:
-                data['L1_misses'] += parse_value(line.split()[0])
-            elif 'LLC-load-misses' in line:
-                data['L3_misses'] += parse_value(line.split()[0])
+    # 缺失的计数器不再悄悄记为0，给出提示
+    events = ("instructions", "cycles", "task_clock", "cache_references", "cache_misses",
+              "L1_dcache_load_misses", "LLC_load_misses")
+    missing = [event for event in events
+               if not any(key in record for key in (event, f"cpu_core_{event}", f"cpu_atom_{event}"))]
+    if missing:
+        print(f"警告: {file} 中没有找到 {', '.join(missing)}，按0处理")
+
+    multiplexed = perf_parser.multiplexed_events(record)
+    if multiplexed:
+        print(f"警告: {file} 中 {', '.join(multiplexed)} 只在部分运行时间内计数，计数值是按比例放大的估计")
 
     return data
 
@@ -66,11 +68,13 @@ def compute_metrics(d):
     return metrics
 
 def main():
-    files = glob.glob("*_perf.txt")
+    files = sorted(f for suffix in ingest.PERF_FILE_SUFFIXES for f in glob.glob(f"*{suffix}"))
     all_metrics = []
 
-    for file in files:
-        data = extract_data(file)
+    # 只重新解析新增或修改过的文件
+    records = ingest.parse_files(files, cache_path=default_cache_path("."))
+    for file, record in zip(files, records):
+        data = extract_data(file, record)
         metrics = compute_metrics(data)
         all_metrics.append(metrics)
 
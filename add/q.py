@@ -1,8 +1,12 @@
 import os
+import sys
 import csv
-import re
 
-def parse_perf_file(file_path):
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from perfkit import perf_parser, ingest
+from perfkit.cache import default_cache_path
+
+def build_stats(record):
     # 存储解析后的统计数据 - 增加了cpu_atom相关字段
     stats = {
         'file_name': '',
@@ -24,87 +28,38 @@ def parse_perf_file(file_path):
         'cpu_atom_LLC_load_misses': 0
     }
 
-    # 读取文件并解析
-    with open(file_path, 'r') as file:
-        content = file.read()
-        
-        # 提取文件名
-        stats['file_name'] = os.path.basename(file_path)
-        
-        # cpu_core指标解析
-        # 1. CPU 指令数
-        match = re.search(r'([0-9,]+)\s+cpu_core/instructions/', content)
-        if match:
-            stats['cpu_core_instructions'] = int(match.group(1).replace(',', ''))
-            
-        # 2. CPU 周期数
-        match = re.search(r'([0-9,]+)\s+cpu_core/cycles/', content)
-        if match:
-            stats['cpu_core_cycles'] = int(match.group(1).replace(',', ''))
-            
-        # 3. 任务时钟时间
-        match = re.search(r'([0-9.]+)\s+msec\s+task-clock', content)
-        if match:
-            stats['task_clock'] = float(match.group(1))
-            
-        # 4. 缓存引用次数
-        match = re.search(r'([0-9,]+)\s+cpu_core/cache-references/', content)
-        if match:
-            stats['cpu_core_cache_references'] = int(match.group(1).replace(',', ''))
-            
-        # 5. 缓存未命中次数
-        match = re.search(r'([0-9,]+)\s+cpu_core/cache-misses/', content)
-        if match:
-            stats['cpu_core_cache_misses'] = int(match.group(1).replace(',', ''))
-            
-        # 6. L1 数据缓存加载未命中次数
-        match = re.search(r'([0-9,]+)\s+cpu_core/L1-dcache-load-misses/', content)
-        if match:
-            stats['cpu_core_L1_dcache_load_misses'] = int(match.group(1).replace(',', ''))
-            
-        # 7. LLC 加载未命中次数
-        match = re.search(r'([0-9,]+)\s+cpu_core/LLC-load-misses/', content)
-        if match:
-            stats['cpu_core_LLC_load_misses'] = int(match.group(1).replace(',', ''))
-            
-        # 8. CPU 时间
-        match = re.search(r'([0-9.]+)\s+seconds time elapsed', content)
-        if match:
-            stats['cpu_time'] = float(match.group(1))
-
-        # cpu_atom指标解析 - 新增
-        # 1. CPU Atom 指令数
-        match = re.search(r'([0-9,]+)\s+cpu_atom/instructions/', content)
-        if match:
-            stats['cpu_atom_instructions'] = int(match.group(1).replace(',', ''))
-            
-        # 2. CPU Atom 周期数
-        match = re.search(r'([0-9,]+)\s+cpu_atom/cycles/', content)
-        if match:
-            stats['cpu_atom_cycles'] = int(match.group(1).replace(',', ''))
-            
-        # 3. CPU Atom 缓存引用次数
-        match = re.search(r'([0-9,]+)\s+cpu_atom/cache-references/', content)
-        if match:
-            stats['cpu_atom_cache_references'] = int(match.group(1).replace(',', ''))
-            
-        # 4. CPU Atom 缓存未命中次数
-        match = re.search(r'([0-9,]+)\s+cpu_atom/cache-misses/', content)
-        if match:
-            stats['cpu_atom_cache_misses'] = int(match.group(1).replace(',', ''))
-            
-        # 5. CPU Atom L1 数据缓存加载未命中次数
-        match = re.search(r'([0-9,]+)\s+cpu_atom/L1-dcache-load-misses/', content)
-        if match:
-            stats['cpu_atom_L1_dcache_load_misses'] = int(match.group(1).replace(',', ''))
-            
-        # 6. CPU Atom LLC 加载未命中次数
-        match = re.search(r'([0-9,]+)\s+cpu_atom/LLC-load-misses/', content)
-        if match:
-            stats['cpu_atom_LLC_load_misses'] = int(match.group(1).replace(',', ''))
+    # 从单遍解析得到的扁平记录中取出需要的计数器
+    missing = []
+    for key in stats:
+        value = perf_parser.lookup_counter(record, key)
+        if value is not None:
+            stats[key] = value
+        elif key.startswith('cpu_core_'):
+            missing.append(key)
+
+    # 缺失的计数器不再悄悄记为0，给出提示
+    if missing:
+        print(f"警告: {record['file_name']} 中没有找到 {', '.join(missing)}，按0处理")
+
+    # 每个计数器附带实际计数时间占比，低于100%说明计数值是按比例放大的估计
+    for key in list(stats):
+        if key.startswith(('cpu_core_', 'cpu_atom_')):
+            run_pct = perf_parser.lookup_counter(record, f'{key}_run_pct')
+            stats[f'{key}_run_pct'] = run_pct if run_pct is not None else 0
+
+    multiplexed = perf_parser.multiplexed_events(record)
+    if multiplexed:
+        print(f"警告: {record['file_name']} 中 {', '.join(multiplexed)} 只在部分运行时间内计数，计数值是按比例放大的估计")
+
+    # CPU 时间取自 time elapsed；perf stat -x/-j 的输出没有这一行，退回到 task-clock
+    stats['cpu_time'] = record.get('elapsed_time', stats['task_clock'] / 1000)
+    stats['file_name'] = record['file_name']
 
     return stats
 
+def parse_perf_file(file_path):
+    return build_stats(perf_parser.parse_perf_file(file_path))
+
 def calculate_ipc(instructions, cycles):
     if cycles == 0:
         return 0
@@ -131,29 +86,32 @@ def calculate_total_instructions(atom_instr, core_instr):
 def process_perf_data(directory_path):
     all_stats = []
     
-    # 遍历目录中的所有 *_perf.txt 文件
-    for file_name in os.listdir(directory_path):
-        if file_name.endswith('_perf.txt'):
-            file_path = os.path.join(directory_path, file_name)
-            print(f"Processing file: {file_path}")
-            stats = parse_perf_file(file_path)
-            
-            # 计算性能指标 - core
-            stats['core_IPC'] = calculate_ipc(stats['cpu_core_instructions'], stats['cpu_core_cycles'])
-            stats['core_Cache_miss_rate'] = calculate_cache_miss_rate(stats['cpu_core_cache_references'], stats['cpu_core_cache_misses'])
-            stats['core_L1_miss_rate'] = calculate_l1_miss_rate(stats['cpu_core_cache_references'], stats['cpu_core_L1_dcache_load_misses'])
-            stats['core_LLC_miss_rate'] = calculate_llc_miss_rate(stats['cpu_core_cache_references'], stats['cpu_core_LLC_load_misses'])
-            
-            # 计算性能指标 - atom (新增)
-            stats['atom_IPC'] = calculate_ipc(stats['cpu_atom_instructions'], stats['cpu_atom_cycles'])
-            stats['atom_Cache_miss_rate'] = calculate_cache_miss_rate(stats['cpu_atom_cache_references'], stats['cpu_atom_cache_misses'])
-            stats['atom_L1_miss_rate'] = calculate_l1_miss_rate(stats['cpu_atom_cache_references'], stats['cpu_atom_L1_dcache_load_misses'])
-            stats['atom_LLC_miss_rate'] = calculate_llc_miss_rate(stats['cpu_atom_cache_references'], stats['cpu_atom_LLC_load_misses'])
-            
-            # 计算总指令数
-            stats['total_instructions'] = calculate_total_instructions(stats['cpu_atom_instructions'], stats['cpu_core_instructions'])
+    # 收集目录中的所有 *_perf.txt / *_perf.csv / *_perf.json 文件，交给进程池并行解析
+    # 未变化的文件直接使用缓存中的解析结果
+    file_paths = [os.path.join(directory_path, file_name)
+                  for file_name in sorted(os.listdir(directory_path))
+                  if file_name.endswith(ingest.PERF_FILE_SUFFIXES)]
+    records = ingest.parse_files(file_paths, cache_path=default_cache_path(directory_path))
+    for file_path, record in zip(file_paths, records):
+        print(f"Processing file: {file_path}")
+        stats = build_stats(record)
+        
+        # 计算性能指标 - core
+        stats['core_IPC'] = calculate_ipc(stats['cpu_core_instructions'], stats['cpu_core_cycles'])
+        stats['core_Cache_miss_rate'] = calculate_cache_miss_rate(stats['cpu_core_cache_references'], stats['cpu_core_cache_misses'])
+        stats['core_L1_miss_rate'] = calculate_l1_miss_rate(stats['cpu_core_cache_references'], stats['cpu_core_L1_dcache_load_misses'])
+        stats['core_LLC_miss_rate'] = calculate_llc_miss_rate(stats['cpu_core_cache_references'], stats['cpu_core_LLC_load_misses'])
+        
+        # 计算性能指标 - atom (新增)
+        stats['atom_IPC'] = calculate_ipc(stats['cpu_atom_instructions'], stats['cpu_atom_cycles'])
+        stats['atom_Cache_miss_rate'] = calculate_cache_miss_rate(stats['cpu_atom_cache_references'], stats['cpu_atom_cache_misses'])
+        stats['atom_L1_miss_rate'] = calculate_l1_miss_rate(stats['cpu_atom_cache_references'], stats['cpu_atom_L1_dcache_load_misses'])
+        stats['atom_LLC_miss_rate'] = calculate_llc_miss_rate(stats['cpu_atom_cache_references'], stats['cpu_atom_LLC_load_misses'])
+        
+        # 计算总指令数
+        stats['total_instructions'] = calculate_total_instructions(stats['cpu_atom_instructions'], stats['cpu_core_instructions'])
 
-            all_stats.append(stats)
+        all_stats.append(stats)
     
     return all_stats
 
@@ -189,6 +147,9 @@ def save_to_csv(data, output_file):
         'task_clock'
     ]
     
+    # 每个计数器的实际计数时间占比
+    fieldnames += [f'{name}_run_pct' for name in fieldnames if name.startswith(('cpu_core_', 'cpu_atom_'))]
+
     # 将数据写入 CSV 文件
     with open(output_file, mode='w', newline='') as file:
         writer = csv.DictWriter(file, fieldnames=fieldnames)
@@ -3,6 +3,9 @@ import matplotlib.pyplot as plt
 import numpy as np
 import os
 import matplotlib.ticker as ticker
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from perfkit import topology
 
 # 设置输出目录
 output_dir = 'add/图片/platform_comparison'
@@ -27,16 +30,18 @@ plt.rcParams['axes.unicode_minus'] = False  # 解决负号显示问题
 plt.style.use('ggplot')
 
 # 设置缓存边界（以数据元素个数表示）
+# 两个平台各自查找产生数据的机器的拓扑记录（<数据文件名>.topology.json）。
+# Windows 机器还没有记录时会退回到目录级的 Linux 记录并给出警告，此时 Windows 的边界线只是占位
 bytes_per_double = 8
-# Windows 机器
-win_l1_size = 4600    # L1 缓存大小约37KB，约4600个double
-win_l2_size = 330000  # L2 缓存大小约2.67MB，约333K个double
-win_l3_size = 4500000 # L3 缓存大小约36MB，约4.5M个double
-
-# Linux 机器 (假设与Windows不同，可以根据实际情况调整)
-linux_l1_size = 4600    # 同样假设为4600个double
-linux_l2_size = 330000  # 同样假设为333K个double
-linux_l3_size = 4500000 # 同样假设为4.5M个double
+win_bounds = topology.boundaries(topology.load_for(win_file_path, system='Windows'), bytes_per_double)
+win_l1_size = win_bounds['L1']
+win_l2_size = win_bounds['L2']
+win_l3_size = win_bounds['L3']
+
+linux_bounds = topology.boundaries(topology.load_for(linux_file_path, system='Linux'), bytes_per_double)
+linux_l1_size = linux_bounds['L1']
+linux_l2_size = linux_bounds['L2']
+linux_l3_size = linux_bounds['L3']
 
 # 创建图形：各算法在Windows和Linux上的执行时间比较
 algorithms = [
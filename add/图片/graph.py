@@ -1,9 +1,14 @@
 import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from perfkit import topology
 
 # 读取CSV文件
-df = pd.read_csv('/home/gump/pall/add/sum_algorithm_results.csv')
+data_file = '/home/gump/pall/add/sum_algorithm_results.csv'
+df = pd.read_csv(data_file)
 
 # 重命名列为英文
 df = df.rename(columns={
@@ -22,21 +27,17 @@ plt.rcParams['font.size'] = 12
 plt.style.use('seaborn-v0_8-whitegrid')
 
 # 设置缓存边界
-# 基于实际系统信息设置精确的缓存边界
+# 使用产生这份数据的机器记录下来的缓存拓扑（sysfs / lscpu，每个实例的大小）
 # 每个double占用8字节
 bytes_per_double = 8
-
-# L1d: 896 KiB 分布在24个实例上 (每实例约37.33 KiB)
-l1_size_bytes = (896 * 1024) / 24  # 每核心L1d大小(字节)
-l1_size = int(l1_size_bytes / bytes_per_double)  # 可容纳的double数量 ≈ 4667个double
-
-# L2: 32 MiB 分布在12个实例上 (每实例约2.67 MiB)
-l2_size_bytes = (32 * 1024 * 1024) / 12  # 每L2单元大小(字节)
-l2_size = int(l2_size_bytes / bytes_per_double)  # 可容纳的double数量 ≈ 333,333个double
-
-# L3: 36 MiB (全部核心共享)
-l3_size_bytes = 36 * 1024 * 1024  # L3总大小(字节)
-l3_size = int(l3_size_bytes / bytes_per_double)  # 可容纳的double数量 ≈ 4,500,000个double
+cache_topology = topology.load_for(data_file)
+cache_bytes = topology.cache_sizes(cache_topology)
+l1_size_bytes = cache_bytes['L1']
+l2_size_bytes = cache_bytes['L2']
+l3_size_bytes = cache_bytes['L3']
+l1_size = int(l1_size_bytes / bytes_per_double)
+l2_size = int(l2_size_bytes / bytes_per_double)
+l3_size = int(l3_size_bytes / bytes_per_double)
 
 # 输出精确的缓存大小信息
 print(f"Cache size boundaries (in number of doubles):")
@@ -57,9 +58,9 @@ plt.axvline(x=l2_size, color='gray', linestyle='--', alpha=0.7)
 plt.axvline(x=l3_size, color='gray', linestyle='--', alpha=0.7)
 
 # 标记缓存边界
-plt.text(l1_size*1.1, plt.ylim()[0]*1.5, 'L1 Cache (37KB)', rotation=90, alpha=0.7)
-plt.text(l2_size*1.1, plt.ylim()[0]*1.5, 'L2 Cache (2.67MB)', rotation=90, alpha=0.7)
-plt.text(l3_size*1.1, plt.ylim()[0]*1.5, 'L3 Cache (36MB)', rotation=90, alpha=0.7)
+plt.text(l1_size*1.1, plt.ylim()[0]*1.5, f'L1 Cache ({topology.format_size(l1_size_bytes)})', rotation=90, alpha=0.7)
+plt.text(l2_size*1.1, plt.ylim()[0]*1.5, f'L2 Cache ({topology.format_size(l2_size_bytes)})', rotation=90, alpha=0.7)
+plt.text(l3_size*1.1, plt.ylim()[0]*1.5, f'L3 Cache ({topology.format_size(l3_size_bytes)})', rotation=90, alpha=0.7)
 
 plt.title('Execution Time Comparison (Log Scale)')
 plt.xlabel('Data Size (number of doubles)')
@@ -102,7 +103,7 @@ axes[0].plot(df.loc[l1_mask, 'Data Size'], df.loc[l1_mask, 'Two-way Speedup'], '
 axes[0].plot(df.loc[l1_mask, 'Data Size'], df.loc[l1_mask, 'Recursive Speedup'], 'b-o', label='Recursive')
 axes[0].plot(df.loc[l1_mask, 'Data Size'], df.loc[l1_mask, 'In-place Speedup'], 'm-o', label='In-place')
 axes[0].axvline(x=l1_size, color='red', linestyle='--', alpha=0.7)
-axes[0].set_title('L1 Cache Boundary (37KB)')
+axes[0].set_title(f'L1 Cache Boundary ({topology.format_size(l1_size_bytes)})')
 axes[0].set_xlabel('Data Size')
 axes[0].set_ylabel('Speedup Ratio')
 axes[0].legend()
@@ -114,7 +115,7 @@ axes[1].plot(df.loc[l2_mask, 'Data Size'], df.loc[l2_mask, 'Two-way Speedup'], '
 axes[1].plot(df.loc[l2_mask, 'Data Size'], df.loc[l2_mask, 'Recursive Speedup'], 'b-o', label='Recursive')
 axes[1].plot(df.loc[l2_mask, 'Data Size'], df.loc[l2_mask, 'In-place Speedup'], 'm-o', label='In-place')
 axes[1].axvline(x=l2_size, color='red', linestyle='--', alpha=0.7)
-axes[1].set_title('L2 Cache Boundary (2.67MB)')
+axes[1].set_title(f'L2 Cache Boundary ({topology.format_size(l2_size_bytes)})')
 axes[1].set_xlabel('Data Size')
 axes[1].legend()
 axes[1].grid(True)
@@ -125,7 +126,7 @@ axes[2].plot(df.loc[l3_mask, 'Data Size'], df.loc[l3_mask, 'Two-way Speedup'], '
 axes[2].plot(df.loc[l3_mask, 'Data Size'], df.loc[l3_mask, 'Recursive Speedup'], 'b-o', label='Recursive')
 axes[2].plot(df.loc[l3_mask, 'Data Size'], df.loc[l3_mask, 'In-place Speedup'], 'm-o', label='In-place')
 axes[2].axvline(x=l3_size, color='red', linestyle='--', alpha=0.7)
-axes[2].set_title('L3 Cache Boundary (36MB)')
+axes[2].set_title(f'L3 Cache Boundary ({topology.format_size(l3_size_bytes)})')
 axes[2].set_xlabel('Data Size')
 axes[2].legend()
 axes[2].grid(True)
@@ -2,6 +2,9 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
 import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from perfkit import topology
 
 # 设置输出目录
 output_dir = 'd:/my_study_program/code_25Spring/Parallel/add/图片/output'
@@ -17,11 +20,12 @@ plt.rcParams['font.size'] = 12
 plt.rcParams['axes.unicode_minus'] = False  # 解决负号显示问题
 plt.style.use('ggplot')
 
-# 设置缓存边界（以数据元素个数表示）
+# 设置缓存边界（以数据元素个数表示），取自产生这份数据的机器的拓扑记录
 bytes_per_double = 8
-l1_size = 4600    # L1 缓存大小约37KB，约4600个double
-l2_size = 330000  # L2 缓存大小约2.67MB，约333K个double
-l3_size = 4500000 # L3 缓存大小约36MB，约4.5M个double
+cache_bytes = topology.cache_sizes(topology.load_for(file_path, system='Windows'))
+l1_size = int(cache_bytes['L1'] / bytes_per_double)
+l2_size = int(cache_bytes['L2'] / bytes_per_double)
+l3_size = int(cache_bytes['L3'] / bytes_per_double)
 
 # 1. 执行时间比较图 (对数尺度)
 plt.figure(figsize=(14, 10))
@@ -39,9 +43,9 @@ plt.axvline(x=l3_size, color='gray', linestyle='--', alpha=0.7)
 
 # 标记缓存边界
 ymin, ymax = plt.ylim()
-plt.text(l1_size*1.1, ymin*2, 'L1缓存 (37KB)', rotation=90, alpha=0.8)
-plt.text(l2_size*1.1, ymin*2, 'L2缓存 (2.67MB)', rotation=90, alpha=0.8)
-plt.text(l3_size*1.1, ymin*2, 'L3缓存 (36MB)', rotation=90, alpha=0.8)
+plt.text(l1_size*1.1, ymin*2, f"L1缓存 ({topology.format_size(cache_bytes['L1'])})", rotation=90, alpha=0.8)
+plt.text(l2_size*1.1, ymin*2, f"L2缓存 ({topology.format_size(cache_bytes['L2'])})", rotation=90, alpha=0.8)
+plt.text(l3_size*1.1, ymin*2, f"L3缓存 ({topology.format_size(cache_bytes['L3'])})", rotation=90, alpha=0.8)
 
 plt.title('各算法执行时间比较 (对数尺度)', fontsize=16)
 plt.xlabel('数据大小 (double元素个数)', fontsize=14)
@@ -67,9 +71,9 @@ plt.axvline(x=l3_size, color='gray', linestyle='--', alpha=0.7)
 
 # 标记缓存边界
 ymin, ymax = plt.ylim()
-plt.text(l1_size*1.1, ymin*1.2, 'L1缓存 (37KB)', rotation=90, alpha=0.8)
-plt.text(l2_size*1.1, ymin*1.2, 'L2缓存 (2.67MB)', rotation=90, alpha=0.8)
-plt.text(l3_size*1.1, ymin*1.2, 'L3缓存 (36MB)', rotation=90, alpha=0.8)
+plt.text(l1_size*1.1, ymin*1.2, f"L1缓存 ({topology.format_size(cache_bytes['L1'])})", rotation=90, alpha=0.8)
+plt.text(l2_size*1.1, ymin*1.2, f"L2缓存 ({topology.format_size(cache_bytes['L2'])})", rotation=90, alpha=0.8)
+plt.text(l3_size*1.1, ymin*1.2, f"L3缓存 ({topology.format_size(cache_bytes['L3'])})", rotation=90, alpha=0.8)
 
 plt.title('各算法相对于平凡算法的加速比', fontsize=16)
 plt.xlabel('数据大小 (double元素个数)', fontsize=14)
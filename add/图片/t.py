@@ -1,9 +1,14 @@
 import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
+import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from perfkit import topology
 
 # 读取CSV文件 - 确保文件名称正确
-df = pd.read_csv('D:/my_study_program/code_25Spring/Parallel/add/sum_algorithm_results_win.csv')
+data_file = 'D:/my_study_program/code_25Spring/Parallel/add/sum_algorithm_results_win.csv'
+df = pd.read_csv(data_file)
 
 # 重命名列为英文
 df = df.rename(columns={
@@ -21,13 +26,14 @@ df = df.rename(columns={
 plt.rcParams['font.size'] = 12
 plt.style.use('seaborn-v0_8-whitegrid')
 
-# 设置缓存边界
+# 设置缓存边界（产生这份数据的机器记录下来的缓存大小）
 bytes_per_double = 8
-l1_size_bytes = (896 * 1024) / 24
+cache_bytes = topology.cache_sizes(topology.load_for(data_file, system='Windows'))
+l1_size_bytes = cache_bytes['L1']
 l1_size = int(l1_size_bytes / bytes_per_double)
-l2_size_bytes = (32 * 1024 * 1024) / 12
+l2_size_bytes = cache_bytes['L2']
 l2_size = int(l2_size_bytes / bytes_per_double)
-l3_size_bytes = 36 * 1024 * 1024
+l3_size_bytes = cache_bytes['L3']
 l3_size = int(l3_size_bytes / bytes_per_double)
 
 # 1. 执行时间比较图 (对数尺度)
@@ -43,9 +49,9 @@ plt.axvline(x=l2_size, color='gray', linestyle='--', alpha=0.7)
 plt.axvline(x=l3_size, color='gray', linestyle='--', alpha=0.7)
 
 # 标记缓存边界
-plt.text(l1_size*1.1, plt.ylim()[0]*1.5, 'L1 Cache (37KB)', rotation=90, alpha=0.7)
-plt.text(l2_size*1.1, plt.ylim()[0]*1.5, 'L2 Cache (2.67MB)', rotation=90, alpha=0.7)
-plt.text(l3_size*1.1, plt.ylim()[0]*1.5, 'L3 Cache (36MB)', rotation=90, alpha=0.7)
+plt.text(l1_size*1.1, plt.ylim()[0]*1.5, f'L1 Cache ({topology.format_size(l1_size_bytes)})', rotation=90, alpha=0.7)
+plt.text(l2_size*1.1, plt.ylim()[0]*1.5, f'L2 Cache ({topology.format_size(l2_size_bytes)})', rotation=90, alpha=0.7)
+plt.text(l3_size*1.1, plt.ylim()[0]*1.5, f'L3 Cache ({topology.format_size(l3_size_bytes)})', rotation=90, alpha=0.7)
 
 plt.title('Execution Time Comparison (Log Scale)')
 plt.xlabel('Data Size (number of doubles)')
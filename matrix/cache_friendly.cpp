@@ -5,15 +5,15 @@
 #include <random>
 #include <iomanip>
 #include <algorithm>
+#include <string>
+#include "../perfkit/native/matrix_storage.h"
+#include "../perfkit/native/measure.h"
+#include "../perfkit/native/timing.h"
 
 using namespace std;
-constexpr int MAXN = 10000;
 
-double A[MAXN][MAXN];
-double v[MAXN];
-double result_naive[MAXN], result_opt[MAXN];
-
-void fill_random(int n) {
+void fill_random(AlignedMatrix& A, AlignedVector& v) {
+    const int n = A.n;
     // 使用C++随机数生成器
     random_device rd;
     mt19937 gen(rd());
@@ -21,20 +21,22 @@ void fill_random(int n) {
     
     for (int i = 0; i < n; ++i) {
         v[i] = dist(gen);
+        double* row = A.row(i);
         for (int j = 0; j < n; ++j) {
-            A[i][j] = dist(gen);
+            row[j] = dist(gen);
         }
     }
 }
 
 
-void cache_friendly_column_dot(int n, double A[][MAXN], double v[], double result[]) {
+void cache_friendly_column_dot(int n, const double* A, size_t lda, const double* v, double* result) {
     memset(result, 0, n * sizeof(double));
 
     for (int i = 0; i < n; ++i) {
         const double vi = v[i];
+        const double* row = A + i * lda;
         for (int j = 0; j < n; ++j) {
-            result[j] += A[i][j] * vi;
+            result[j] += row[j] * vi;
         }
     }
 }
@@ -42,9 +44,38 @@ void cache_friendly_column_dot(int n, double A[][MAXN], double v[], double resul
 int main(int argc, char *argv[]) {
     int n = 1024;
     int repeat = 100;
+    bool adaptive = false;   // --adaptive: 重复到中位数置信区间足够窄为止，而不是固定次数
+    MeasureOptions options;
+
+    for (int i = 1; i < argc; ++i) {
+        string arg = argv[i];
+        if (arg == "--adaptive") {
+            adaptive = true;
+        } else if (arg.rfind("--rel-width=", 0) == 0) {
+            options.rel_width = stod(arg.substr(12));
+        } else if (arg.rfind("--budget=", 0) == 0) {
+            options.budget_us = stod(arg.substr(9)) * 1e6; // 参数单位为秒
+        }
+    }
     
-    cout << "重复" << repeat << " 规模" << n <<endl;
-    fill_random(n);
+    if (adaptive) {
+        cout << "自适应重复(目标相对宽度" << options.rel_width << ") 规模" << n << endl;
+    } else {
+        cout << "重复" << repeat << " 规模" << n <<endl;
+    }
+    // 行跨度为 n 的堆上矩阵
+    AlignedMatrix A(n);
+    AlignedVector v(n), result_opt(n);
+    fill_random(A, v);
+
+    if (adaptive) {
+        // 与 common.cpp 相同：CLOCK_MONOTONIC_RAW 计时，结果取中位数
+        MeasureResult stat = measure_adaptive(now_raw_us, [&]() { cache_friendly_column_dot(n, A.data, A.lda, v.data, result_opt.data); }, options);
+        cout << fixed << setprecision(2);
+        cout << "中位数时间: " << stat.median << " us" << endl;
+        cout << "95%置信区间: [" << stat.ci_low << ", " << stat.ci_high << "] us, 样本数: " << stat.samples << endl;
+        return 0;
+    }
 
     // 保留gettimeofday计时
     struct timeval start, end;
@@ -57,7 +88,7 @@ int main(int argc, char *argv[]) {
     
     for (int r = 0; r < repeat; ++r) {
         gettimeofday(&start, nullptr);
-        cache_friendly_column_dot(n, A, v, result_opt);
+        cache_friendly_column_dot(n, A.data, A.lda, v.data, result_opt.data);
         gettimeofday(&end, nullptr);
         
         elapsed = (end.tv_sec - start.tv_sec) * 1e6;
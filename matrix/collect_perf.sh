@@ -1,15 +1,45 @@
 #!/bin/bash
 
-# 更通用的事件组合
-EVENTS="instructions,cycles,task-clock,cache-references,cache-misses,L1-dcache-load-misses,LLC-load-misses"
+# 更通用的事件组合：硬件事件需要占用 PMU 计数器，软件事件（task-clock）不需要
+HW_EVENTS="instructions,cycles,cache-references,cache-misses,L1-dcache-load-misses,LLC-load-misses"
+SW_EVENTS="task-clock"
+
+# 每组硬件事件不超过 PMU 的通用计数器个数（开启超线程的 Intel 核心为 4），
+# 一组事件用 {} 绑定同时计数，避免分时复用；事件较多时分多轮运行，结果追加到同一个文件
+PERF_GROUP_SIZE=${PERF_GROUP_SIZE:-4}
+IFS=',' read -ra hw_events <<< "$HW_EVENTS"
+EVENT_GROUPS=()
+for ((i = 0; i < ${#hw_events[@]}; i += PERF_GROUP_SIZE)); do
+    group=$(IFS=','; echo "${hw_events[*]:i:PERF_GROUP_SIZE}")
+    EVENT_GROUPS+=("{$group},$SW_EVENTS")
+done
+
+# 输出格式: text（默认，perf 的可读输出）、csv（perf stat -x,）或 json（perf stat -j）
+# 机器可读格式直接按字段解析，并带有计数器运行占比和 -r 时的波动
+PERF_FORMAT=${PERF_FORMAT:-text}
+case "$PERF_FORMAT" in
+    csv)  FORMAT_ARGS=(-x,); EXT="csv" ;;
+    json) FORMAT_ARGS=(-j);  EXT="json" ;;
+    *)    FORMAT_ARGS=();    EXT="txt" ;;
+esac
+
+# 混合架构上程序会在 cpu_core/cpu_atom 之间迁移，两类核心各自只统计一部分运行时间；
+# 设置 PERF_CPU（例如 PERF_CPU=0）把程序固定在一个核心上，计数器就能全程计数
+RUN_PREFIX=()
+if [[ -n "$PERF_CPU" ]]; then
+    RUN_PREFIX=(taskset -c "$PERF_CPU")
+fi
 
 PROGRAMS=("native" "cache_friendly")
 
 for prog in "${PROGRAMS[@]}"; do
     if [[ -x "./$prog" ]]; then
         echo "正在收集 $prog 的性能数据..."
-        perf stat -e $EVENTS -o "${prog}_perf.txt" ./$prog
-        echo "$prog 数据已保存到 ${prog}_perf.txt"
+        rm -f "${prog}_perf.${EXT}"
+        for group in "${EVENT_GROUPS[@]}"; do
+            perf stat "${FORMAT_ARGS[@]}" -e "$group" --append -o "${prog}_perf.${EXT}" "${RUN_PREFIX[@]}" ./$prog
+        done
+        echo "$prog 数据已保存到 ${prog}_perf.${EXT}"
     else
         echo "警告：找不到可执行文件 $prog 或其不可执行"
     fi
@@ -7,15 +7,21 @@
 #include <vector>
 #include <algorithm>
 #include <fstream>
+#include "../perfkit/native/measure.h"
+#include "../perfkit/native/timing.h"
+#include "../perfkit/native/matrix_storage.h"
 
 using namespace std;
-constexpr int MAXN = 10000;
 
-double A[MAXN][MAXN];
-double v[MAXN];
-double result_naive[MAXN], result_opt[MAXN];
+// 获取当前时间（微秒级）
+double get_time() {
+    struct timeval tv;
+    gettimeofday(&tv, nullptr);
+    return tv.tv_sec * 1000000.0 + tv.tv_usec;
+}
 
-void fill_random(int n) {
+void fill_random(AlignedMatrix& A, AlignedVector& v) {
+    const int n = A.n;
     // 使用C++随机数生成器
     random_device rd;
     mt19937 gen(rd());
@@ -23,29 +29,32 @@ void fill_random(int n) {
     
     for (int i = 0; i < n; ++i) {
         v[i] = dist(gen);
+        double* row = A.row(i);
         for (int j = 0; j < n; ++j) {
-            A[i][j] = dist(gen);
+            row[j] = dist(gen);
         }
     }
 }
 
-void naive_column_dot(int n, double A[][MAXN], double v[], double result[]) {
+// 矩阵行跨度为 lda（元素个数）
+void naive_column_dot(int n, const double* A, size_t lda, const double* v, double* result) {
     memset(result, 0, n * sizeof(double));
     
     for (int j = 0; j < n; ++j) {
         for (int i = 0; i < n; ++i) {
-            result[j] += A[i][j] * v[i];
+            result[j] += A[i * lda + j] * v[i];
         }
     }
 }
 
-void cache_friendly_column_dot(int n, double A[][MAXN], double v[], double result[]) {
+void cache_friendly_column_dot(int n, const double* A, size_t lda, const double* v, double* result) {
     memset(result, 0, n * sizeof(double));
 
     for (int i = 0; i < n; ++i) {
         const double vi = v[i];
+        const double* row = A + i * lda;
         for (int j = 0; j < n; ++j) {
-            result[j] += A[i][j] * vi;
+            result[j] += row[j] * vi;
         }
     }
 }
@@ -53,71 +62,131 @@ void cache_friendly_column_dot(int n, double A[][MAXN], double v[], double resul
 int main(int argc, char *argv[]) {
     int n = 1024;
     int repeat = 100;
+    bool csv_output = false; // --csv: 只向标准输出打印一行CSV结果（供调度脚本读取）
+    bool adaptive = false;   // --adaptive: 重复到中位数置信区间足够窄为止，而不是固定次数
+    int padding = 0;         // --pad=: 每行末尾多出的元素个数，行跨度为 n + padding
+    MeasureOptions options;
     
     // 修正命令行参数处理
-    if(argc > 1) {
-        n = stoi(argv[1]);
+    for (int i = 1; i < argc; ++i) {
+        string arg = argv[i];
+        if (arg == "--csv") {
+            csv_output = true;
+        } else if (arg == "--adaptive") {
+            adaptive = true;
+        } else if (arg.rfind("--rel-width=", 0) == 0) {
+            options.rel_width = stod(arg.substr(12));
+        } else if (arg.rfind("--budget=", 0) == 0) {
+            options.budget_us = stod(arg.substr(9)) * 1e6; // 参数单位为秒
+        } else if (arg.rfind("--pad=", 0) == 0) {
+            padding = stoi(arg.substr(6));
+        } else {
+            n = stoi(arg);
+        }
     }
     
-    cout << "重复" << repeat << " 规模" << n <<endl;
-    fill_random(n);
+    if (!csv_output) {
+        if (adaptive) {
+            cout << "自适应重复(目标相对宽度" << options.rel_width << ") 规模" << n << endl;
+        } else {
+            cout << "重复" << repeat << " 规模" << n <<endl;
+        }
+        cout << "行跨度 " << n + padding << " (填充 " << padding << ")" << endl;
+    }
+    // 按规模在堆上分配，不再预留固定的 MAXN×MAXN 静态数组
+    AlignedMatrix A(n, padding);
+    AlignedVector v(n), result_naive(n), result_opt(n);
+    fill_random(A, v);
 
-    // 保留gettimeofday计时
-    struct timeval start, end;
-    double elapsed;
+    double naive_avg = 0.0;
+    double opt_avg = 0.0;
+    MeasureResult naive_stat = {}, opt_stat = {};
 
-    // 记录每次运行的时间
-    vector<double> naive_times;
-    vector<double> opt_times;
+    if (adaptive) {
+        // 自适应模式：结果取中位数，并记录置信区间和样本数；
+        // 用 CLOCK_MONOTONIC_RAW 计时，小规模时多次调用合成一个样本（gettimeofday 会量化成 0）
+        naive_stat = measure_adaptive(now_raw_us, [&]() { naive_column_dot(n, A.data, A.lda, v.data, result_naive.data); }, options);
+        opt_stat = measure_adaptive(now_raw_us, [&]() { cache_friendly_column_dot(n, A.data, A.lda, v.data, result_opt.data); }, options);
+        naive_avg = naive_stat.median;
+        opt_avg = opt_stat.median;
+    } else {
+        // 保留gettimeofday计时
+        double start, elapsed;
 
-    // 计时naive算法
-    double naive_total = 0.0;
-    
-    for (int r = 0; r < repeat; ++r) {
-        gettimeofday(&start, nullptr);
-        naive_column_dot(n, A, v, result_naive);
-        gettimeofday(&end, nullptr);
+        // 计时naive算法
+        double naive_total = 0.0;
         
-        elapsed = (end.tv_sec - start.tv_sec) * 1e6;
-        elapsed = (elapsed + (end.tv_usec - start.tv_usec)); // 不再除以1e6，保持微秒单位
+        for (int r = 0; r < repeat; ++r) {
+            start = get_time();
+            naive_column_dot(n, A.data, A.lda, v.data, result_naive.data);
+            elapsed = get_time() - start; // 微秒单位
+            
+            naive_total += elapsed;
+        }
         
-        naive_times.push_back(elapsed);
-        naive_total += elapsed;
-    }
-    
-    double naive_avg = naive_total / repeat;
-    
-    // 计时优化算法
-    double opt_total = 0.0;
-    
-    for (int r = 0; r < repeat; ++r) {
-        gettimeofday(&start, nullptr);
-        cache_friendly_column_dot(n, A, v, result_opt);
-        gettimeofday(&end, nullptr);
+        naive_avg = naive_total / repeat;
         
-        elapsed = (end.tv_sec - start.tv_sec) * 1e6;
-        elapsed = (elapsed + (end.tv_usec - start.tv_usec)); // 不再除以1e6，保持微秒单位
+        // 计时优化算法
+        double opt_total = 0.0;
         
-        opt_times.push_back(elapsed);
-        opt_total += elapsed;
+        for (int r = 0; r < repeat; ++r) {
+            start = get_time();
+            cache_friendly_column_dot(n, A.data, A.lda, v.data, result_opt.data);
+            elapsed = get_time() - start; // 微秒单位
+            
+            opt_total += elapsed;
+        }
+        
+        opt_avg = opt_total / repeat;
+    }
+    // 固定次数模式下小规模可能测得 0 微秒，此时没有加速比
+    double speedup = opt_avg > 0 ? naive_avg / opt_avg : 0.0;
+
+    // 自适应模式额外输出的列
+    const string header = adaptive
+        ? "规模,朴素算法(us),优化算法(us),加速比,朴素样本数,朴素CI下限(us),朴素CI上限(us),优化样本数,优化CI下限(us),优化CI上限(us)"
+        : "规模,朴素算法(us),优化算法(us),加速比";
+    auto write_row = [&](ostream& out) {
+        out << n << "," << fixed << setprecision(2) << naive_avg << ","
+            << opt_avg << "," << speedup;
+        if (adaptive) {
+            out << "," << naive_stat.samples << "," << naive_stat.ci_low << "," << naive_stat.ci_high
+                << "," << opt_stat.samples << "," << opt_stat.ci_low << "," << opt_stat.ci_high;
+        }
+        out << endl;
+    };
+
+    // 结构化输出：表头 + 一行结果，不写共享的CSV文件（并行运行时避免多个进程同时追加）
+    if (csv_output) {
+        cout << header << endl;
+        write_row(cout);
+        return 0;
     }
-    
-    double opt_avg = opt_total / repeat;
-    double speedup = naive_avg / opt_avg;
 
     // 打印统计信息
     cout << fixed << setprecision(2); // 减少小数位数，因为微秒单位足够小
     cout << "\n=== Naive 算法统计 ===" << endl;
-    cout << "平均时间: " << naive_avg << " us" << endl;
+    if (adaptive) {
+        cout << "中位数时间: " << naive_avg << " us" << endl;
+        cout << "95%置信区间: [" << naive_stat.ci_low << ", " << naive_stat.ci_high << "] us, 样本数: " << naive_stat.samples << endl;
+    } else {
+        cout << "平均时间: " << naive_avg << " us" << endl;
+    }
     
     cout << "\n=== 优化算法统计 ===" << endl;
-    cout << "平均时间: " << opt_avg << " us" << endl;
+    if (adaptive) {
+        cout << "中位数时间: " << opt_avg << " us" << endl;
+        cout << "95%置信区间: [" << opt_stat.ci_low << ", " << opt_stat.ci_high << "] us, 样本数: " << opt_stat.samples << endl;
+    } else {
+        cout << "平均时间: " << opt_avg << " us" << endl;
+    }
     
     cout << "\n=== 性能比较 ===" << endl;
     cout << "加速比(Naive/Optimized): " << speedup << "x" << endl;
 
     // 将结果保存到CSV文件
-    const string csv_filename = "matrix_performance_results.csv";
+    // 自适应模式的列不同，写入单独的文件
+    const string csv_filename = adaptive ? "matrix_performance_adaptive.csv" : "matrix_performance_results.csv";
     
     // 检查文件是否存在
     bool file_exists = false;
@@ -133,12 +202,11 @@ int main(int argc, char *argv[]) {
     
     // 如果文件不存在，写入表头
     if (!file_exists) {
-        csv_file << "规模,朴素算法(us),优化算法(us),加速比" << endl;
+        csv_file << header << endl;
     }
     
     // 写入当前测试结果
-    csv_file << n << "," << fixed << setprecision(2) << naive_avg << "," 
-             << opt_avg << "," << speedup << endl;
+    write_row(csv_file);
     
     csv_file.close();
     
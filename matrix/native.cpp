@@ -5,15 +5,12 @@
 #include <random>
 #include <iomanip>
 #include <algorithm>
+#include "../perfkit/native/matrix_storage.h"
 
 using namespace std;
-constexpr int MAXN = 10000;
 
-double A[MAXN][MAXN];
-double v[MAXN];
-double result_naive[MAXN], result_opt[MAXN];
-
-void fill_random(int n) {
+void fill_random(AlignedMatrix& A, AlignedVector& v) {
+    const int n = A.n;
     // 使用C++随机数生成器
     random_device rd;
     mt19937 gen(rd());
@@ -21,18 +18,19 @@ void fill_random(int n) {
     
     for (int i = 0; i < n; ++i) {
         v[i] = dist(gen);
+        double* row = A.row(i);
         for (int j = 0; j < n; ++j) {
-            A[i][j] = dist(gen);
+            row[j] = dist(gen);
         }
     }
 }
 
-void naive_column_dot(int n, double A[][MAXN], double v[], double result[]) {
+void naive_column_dot(int n, const double* A, size_t lda, const double* v, double* result) {
     memset(result, 0, n * sizeof(double));
     
     for (int j = 0; j < n; ++j) {
         for (int i = 0; i < n; ++i) {
-            result[j] += A[i][j] * v[i];
+            result[j] += A[i * lda + j] * v[i];
         }
     }
 }
@@ -42,7 +40,10 @@ int main(int argc, char *argv[]) {
     int repeat = 100;
 
     cout << "重复: " << repeat << " 规模: " << n << endl;
-    fill_random(n);
+    // 行跨度为 n 的堆上矩阵
+    AlignedMatrix A(n);
+    AlignedVector v(n), result_naive(n);
+    fill_random(A, v);
 
     // 保留gettimeofday计时
     struct timeval start, end;
@@ -53,7 +54,7 @@ int main(int argc, char *argv[]) {
     
     for (int r = 0; r < repeat; ++r) {
         gettimeofday(&start, nullptr);
-        naive_column_dot(n, A, v, result_naive);
+        naive_column_dot(n, A.data, A.lda, v.data, result_naive.data);
         gettimeofday(&end, nullptr);
         
         elapsed = (end.tv_sec - start.tv_sec) * 1e6;
@@ -1,10 +1,13 @@
 import pandas as pd
 import matplotlib.pyplot as plt
-import numpy as np
 import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from perfkit import topology
 
 # Read CSV file
-df = pd.read_csv('/home/gump/pall/matrix/matrix_performance_results.csv')
+data_file = '/home/gump/pall/matrix/matrix_performance_results.csv'
+df = pd.read_csv(data_file)
 
 # Rename columns 
 df_eng = df.rename(columns={
@@ -18,15 +21,18 @@ df_eng = df.rename(columns={
 df_eng['memory_bytes'] = df_eng['size'].apply(lambda n: (n*n*8) + (n*8) + (n*8))
 df_eng['memory_MB'] = df_eng['memory_bytes'] / (1024*1024)
 
-# CPU cache information
-L1d_size_per_core = 896 / 24  # KB (~37.33KB)
-L2_size_per_unit = 32 / 12    # MB (~2.67MB)
-L3_size_total = 36           # MB
+# CPU cache information (recorded topology of the machine that produced the data)
+cache_topology = topology.load_for(data_file)
+cache_bytes = topology.cache_sizes(cache_topology)
+L1d_size_per_core = cache_bytes['L1'] / 1024          # KB
+L2_size_per_unit = cache_bytes['L2'] / (1024 * 1024)  # MB
+L3_size_total = cache_bytes['L3'] / (1024 * 1024)     # MB
 
 # Calculate matrix dimensions at cache boundaries
-L1d_matrix_dim = int(np.sqrt((L1d_size_per_core * 1024) / 8))
-L2_matrix_dim = int(np.sqrt((L2_size_per_unit * 1024 * 1024) / 8))
-L3_matrix_dim = int(np.sqrt((L3_size_total * 1024 * 1024) / 8))
+matrix_dims = topology.matrix_boundaries(cache_topology)
+L1d_matrix_dim = matrix_dims['L1']
+L2_matrix_dim = matrix_dims['L2']
+L3_matrix_dim = matrix_dims['L3']
 
 # Find best speedup
 best_speedup_idx = df_eng['speedup'].idxmax()
@@ -46,7 +52,7 @@ plt.axvline(x=L3_matrix_dim, color='gray', linestyle='-.', alpha=0.7, label=f'L3
 # Add text labels for cache boundaries
 plt.text(L1d_matrix_dim*1.05, plt.ylim()[1]*0.95, f'L1d: {L1d_size_per_core:.1f}KB/core', rotation=90, fontsize=10)
 plt.text(L2_matrix_dim*1.05, plt.ylim()[1]*0.95, f'L2: {L2_size_per_unit:.1f}MB/unit', rotation=90, fontsize=10)
-plt.text(L3_matrix_dim*1.05, plt.ylim()[1]*0.95, f'L3: {L3_size_total}MB (shared)', rotation=90, fontsize=10)
+plt.text(L3_matrix_dim*1.05, plt.ylim()[1]*0.95, f'L3: {L3_size_total:.0f}MB (shared)', rotation=90, fontsize=10)
 
 # Mark best speedup point
 plt.plot([best_size], [df_eng.loc[best_speedup_idx, 'naive_time']], 'r*', markersize=15)
@@ -81,7 +87,7 @@ plt.axvline(x=L3_matrix_dim, color='gray', linestyle='-.', alpha=0.7, label=f'L3
 # Add text labels for cache boundaries
 plt.text(L1d_matrix_dim*1.05, plt.ylim()[1]*0.95, f'L1d: {L1d_size_per_core:.1f}KB/core', rotation=90, fontsize=10)
 plt.text(L2_matrix_dim*1.05, plt.ylim()[1]*0.95, f'L2: {L2_size_per_unit:.1f}MB/unit', rotation=90, fontsize=10)
-plt.text(L3_matrix_dim*1.05, plt.ylim()[1]*0.95, f'L3: {L3_size_total}MB (shared)', rotation=90, fontsize=10)
+plt.text(L3_matrix_dim*1.05, plt.ylim()[1]*0.95, f'L3: {L3_size_total:.0f}MB (shared)', rotation=90, fontsize=10)
 
 # Mark best speedup point
 plt.plot([best_size], [best_speedup], 'r*', markersize=15)
@@ -9,47 +9,18 @@ PROGRAM="./common"
 # 创建结果文件
 RESULTS_CSV="common.csv"
 
-# 写入CSV表头
-echo "规模,朴素算法(us),优化算法(us),加速比" > $RESULTS_CSV
-
-# 显示进度条函数
-progress() {
-    local current=$1
-    local total=$2
-    local width=50
-    local percent=$((current * 100 / total))
-    local completed=$((width * current / total))
-    local remaining=$((width - completed))
-    
-    printf "\r["
-    printf "%${completed}s" | tr ' ' '#'
-    printf "%${remaining}s" | tr ' ' ' '
-    printf "] %3d%% (%d/%d)" $percent $current $total
-}
-
-total=${#params[@]}
-count=0
+# 交给 Python 调度器：每个规模一个任务，按物理核心并行、绑核运行，
+# 程序以 --csv 模式输出结构化结果，不再从文本里 grep "平均时间:"
+# 额外参数会原样传给调度器，例如 ./run_perf_all.sh --cpus 2-11
+SIZES=$(IFS=','; echo "${params[*]}")
+export PYTHONPATH="$(dirname "$0")/..${PYTHONPATH:+:$PYTHONPATH}"
+
+# PLAN_SIZES=1 时不用上面的固定列表，改为按本机缓存拐点规划规模（n×n 矩阵，每个元素 8 字节，
+# 不超过 10000，即 800MB 的矩阵）
+if [[ "$PLAN_SIZES" == "1" ]]; then
+    SIZES=$(python3 -m perfkit.planner --matrix --bytes-per-element 8 --max-size 10000)
+fi
 
 echo "📊 开始收集所有规模的测试结果..."
 
-for param in "${params[@]}"; do
-    count=$((count + 1))
-    progress $count $total
-    
-    # 运行程序并提取结果
-    output=$($PROGRAM $param)
-    
-    # 提取朴素算法时间
-    naive_time=$(echo "$output" | grep "平均时间:" | head -1 | awk '{print $2}')
-    
-    # 提取优化算法时间
-    opt_time=$(echo "$output" | grep "平均时间:" | tail -1 | awk '{print $2}')
-    
-    # 提取加速比
-    speedup=$(echo "$output" | grep "加速比" | awk '{print $2}' | sed 's/x//')
-    
-    # 将结果写入CSV
-    echo "$param,$naive_time,$opt_time,$speedup" >> $RESULTS_CSV
-done
-
-echo -e "\n✅ 所有测试完成！结果已保存到 $RESULTS_CSV"
\ No newline at end of file
+python3 -m perfkit.orchestrator --program "$PROGRAM" --sizes "$SIZES" -o "$RESULTS_CSV" "$@"
@@ -2,6 +2,9 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
 import os
+import sys
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from perfkit import costmodel
 
 # 读取CSV文件
 df = pd.read_csv('/home/gump/pall/matrix/matrix_performance.csv')
@@ -77,16 +80,22 @@ plt.close()  # 关闭当前图表
 # 4. 关键区域的加速比变化
 plt.figure(figsize=(10, 6))
 
-# 定义关键区域
-key_regions = [
-    (0, 100, 'Small Size'),
-    (300, 600, 'L1 Cache Boundary'),
-    (1500, 3000, 'L3 Cache Boundary'),
-    (5000, 9000, 'Large Size')
-]
+# 关键区域由朴素算法 时间-数据量 曲线的分段线性拟合自动得到（矩阵占用 n² 个 double）
+bytes_per_double = 8
+model = costmodel.fit_cost_model(df_eng['size'] ** 2 * bytes_per_double,
+                                 df_eng['naive_time'] * 1000, bytes_per_double)
+key_regions = []
+for segment in model['segments']:
+    start = int(round(np.sqrt(segment['start_bytes'] / bytes_per_double)))
+    end = int(round(np.sqrt(segment['end_bytes'] / bytes_per_double)))
+    key_regions.append((start, end, f"n={start}-{end}: {segment['ns_per_element']:.2f} ns/elem, "
+                                    f"{segment['gbps']:.2f} GB/s"))
+    print(f"区域 n={start}-{end}: {segment['ns_per_element']:.3f} ns/元素 "
+          f"[{segment['ns_per_element_ci'][0]:.3f}, {segment['ns_per_element_ci'][1]:.3f}], "
+          f"{segment['gbps']:.2f} GB/s")
 
 # 设置颜色
-colors = ['#FF9999', '#66B2FF', '#99FF99', '#FFCC99']
+colors = plt.cm.tab10(np.arange(len(key_regions)))
 
 # 为每个关键区域绘制不同颜色的加速比
 for i, (start, end, label) in enumerate(key_regions):
@@ -97,7 +106,7 @@ for i, (start, end, label) in enumerate(key_regions):
 plt.title('Speedup Ratio in Different Cache Regions', fontsize=16)
 plt.xlabel('Matrix Size (n)', fontsize=14)
 plt.ylabel('Speedup Ratio', fontsize=14)
-plt.legend(fontsize=12)
+plt.legend(fontsize=10)
 plt.grid(True, linestyle='--', alpha=0.7)
 plt.tight_layout()
 plt.savefig('matrix_speedup_by_regions.png', dpi=300)
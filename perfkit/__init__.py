@@ -0,0 +1 @@
+# perfkit: add/ 和 matrix/ 共用的性能数据采集与分析工具
@@ -0,0 +1,122 @@
+import sys
+import json
+import argparse
+
+import numpy as np
+
+from perfkit import ingest, roofline, tiling, topology
+from perfkit.gemm import max_relative_error, verify
+from perfkit.harness import time_batched, summarize
+from perfkit.kernels import aligned_matrix, buffer_address, batched_matvec, batched_matvec_batch_timer
+
+# 批量矩阵向量：同一个 A 一次乘 k 个向量，扫描 k
+# 逐个向量调用 tiled 内核时每个向量都要把 A 从内存完整读一遍；批量内核每读入一段 A 就用于全部 k 个向量，
+# 算术强度（只计 A 的流量）从 2 FLOP / 8 字节增加到 2k FLOP / 8 字节，大规模下吞吐接近 k 倍，
+# 直到碰到浮点峰值或结果段放不进缓存。speedup_vs_single 为相对 k 次 k=1 批量调用（同一内核、同样的分块）
+# 的加速比，只反映 A 在 k 个向量间的复用，不混入内核实现或分块的差别；
+# 给出 --ceilings 时按 roofline 给出每个点的上限和达到上限的比例。
+# 结果与 numpy 不一致（误差超过 perfkit.gemm 的容差）的行标记为未通过，命令行最后以非零状态退出。
+
+DEFAULT_SIZES = [1000, 4000, 8000]
+DEFAULT_VECTORS = [1, 2, 4, 8, 16, 32, 64]
+
+
+def sweep(sizes, vector_counts, repeats=5, min_sample_ns=1e6, seed=0):
+    topo = topology.detect()
+    timer = batched_matvec_batch_timer()
+    rows = []
+    for size in sizes:
+        rng = np.random.default_rng((seed, size))
+        matrix, lda = aligned_matrix(size)
+        matrix[:] = rng.random((size, size))
+        a = buffer_address(matrix)
+
+        # 基准：同一个批量内核在 k=1 时的耗时，每种分块测一次（扫描中有 k=1 时直接用那一行）
+        vector = rng.random(size)
+        result = np.zeros(size)
+        single_addresses = (a, lda, buffer_address(vector), size, buffer_address(result), size)
+        single_ns = {}
+
+        for vectors in vector_counts:
+            tile = tiling.batched_matvec_tiles(topo, vectors)
+            col_block, row_block = tile
+            if vectors != 1 and tile not in single_ns:
+                single_ns[tile] = summarize(*time_batched(
+                    lambda batch: timer(size, 1, *single_addresses, col_block, row_block, batch),
+                    repeats, min_sample_ns))['median_ns']
+            v = rng.random((vectors, size))
+            r = np.zeros((vectors, size))
+            addresses = (a, lda, buffer_address(v), size, buffer_address(r), size)
+            batched_matvec(size, vectors, *addresses, col_block, row_block)
+            expected = v @ matrix
+            row = {'size': size, 'vectors': vectors, 'col_block': col_block, 'row_block': row_block,
+                   'max_relative_error': max_relative_error(r, expected)}
+            verify(row, size, f'k={vectors}')
+            row.update(summarize(*time_batched(
+                lambda batch: timer(size, vectors, *addresses, col_block, row_block, batch),
+                repeats, min_sample_ns)))
+            if vectors == 1:
+                single_ns[tile] = row['median_ns']
+            row['ns_per_vector'] = row['median_ns'] / vectors
+            row['intensity'] = 2 * vectors / 8
+            row['gflops'] = 2 * size * size * vectors / row['median_ns']
+            row['matrix_gbps'] = size * size * 8 / row['median_ns']
+            row['speedup_vs_single'] = vectors * single_ns[tile] / row['median_ns']
+            rows.append(row)
+            print(f"n={size:<6} k={vectors:<4} 强度 {row['intensity']:.2f} FLOP/B, {row['gflops']:.2f} GFLOP/s, "
+                  f"{row['speedup_vs_single']:.2f}x 逐个调用")
+        del matrix
+    return rows
+
+
+def attach_roof(rows, roof, topo):
+    # 上限 = min(浮点峰值, 强度 × A 所在层级的带宽)；上限文件中没有该层级时不给出上限
+    missing = set()
+    for row in rows:
+        level = topology.level_for(row['size'] * row['size'] * 8, topo)
+        row['level'] = level
+        gbps = roofline.memory_roof(roof, level, missing)
+        if gbps is None:
+            row['roof_gflops'] = row['fraction_of_roof'] = None
+            continue
+        row['roof_gflops'] = min(roof['peak_gflops'], row['intensity'] * gbps)
+        row['fraction_of_roof'] = row['gflops'] / row['roof_gflops']
+    roofline.warn_above_roof([row for row in rows if row['roof_gflops']], 'vectors')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='批量矩阵向量：同一个矩阵一次乘 k 个向量，扫描 k')
+    parser.add_argument('--sizes', default=None, help='逗号分隔的矩阵边长，默认 1000,4000,8000')
+    parser.add_argument('--vectors', default=None, help='逗号分隔的向量个数 k，默认 1,2,4,...,64')
+    parser.add_argument('-r', '--repeats', type=int, default=5, help='每个数据点的重复次数')
+    parser.add_argument('--min-sample-us', type=float, default=1000.0, help='每个样本的最短时长（微秒）')
+    parser.add_argument('--ceilings', default=None, help='perfkit.roofline 的上限 JSON，给出每个点的 roofline 上限')
+    parser.add_argument('-o', '--output', default='batched_matvec.csv', help='输出 CSV 文件')
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',') if size] if args.sizes else DEFAULT_SIZES
+    vector_counts = [int(item) for item in args.vectors.split(',') if item] if args.vectors else DEFAULT_VECTORS
+
+    rows = sweep(sizes, vector_counts, args.repeats, args.min_sample_us * 1e3)
+
+    if args.ceilings:
+        with open(args.ceilings, encoding='utf-8') as file:
+            results = json.load(file)
+        attach_roof(rows, roofline.ceilings(results), results['topology'])
+        for row in rows:
+            if row['roof_gflops'] is None:
+                continue
+            print(f"n={row['size']:<6} k={row['vectors']:<4} {row['level']:>4} 上限 {row['roof_gflops']:.2f} GFLOP/s，"
+                  f"达到 {row['fraction_of_roof']:.0%}")
+
+    ingest.save_to_csv(rows, args.output, ingest.table_fields(rows, leading=('size', 'vectors')))
+    topology.record(args.output)
+    print(f"✅ 共 {len(rows)} 个数据点，已保存到 {args.output}")
+    failed = [row for row in rows if not row['verified']]
+    if failed:
+        print(f"❌ {len(failed)} 个数据点的结果与 numpy 不一致")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+import os
+import json
+import sqlite3
+
+from perfkit import perf_parser
+
+# 解析结果的增量缓存（SQLite）
+# 以 文件绝对路径 + 文件大小 + mtime 为键保存 perf_parser 的解析结果，
+# 再次运行时只重新解析新增或被修改过的文件，其余直接从缓存合并。
+
+CACHE_FILE_NAME = '.perf_cache.sqlite'
+
+
+def default_cache_path(directory):
+    return os.path.join(directory, CACHE_FILE_NAME)
+
+
+class ParseCache:
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS files ('
+            'path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, record TEXT)'
+        )
+        self.conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+
+        # 解析器输出格式变化后，旧缓存全部作废
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'parser_version'").fetchone()
+        if row is None or row[0] != str(perf_parser.PARSER_VERSION):
+            self.conn.execute('DELETE FROM files')
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('parser_version', ?)",
+                (str(perf_parser.PARSER_VERSION),)
+            )
+            self.conn.commit()
+
+        # 一次性读入全部条目，避免每个文件一次查询
+        self.entries = {
+            path: (size, mtime_ns, record)
+            for path, size, mtime_ns, record in self.conn.execute(
+                'SELECT path, size, mtime_ns, record FROM files')
+        }
+
+    def get(self, path, stat):
+        entry = self.entries.get(path)
+        if entry is None or entry[0] != stat.st_size or entry[1] != stat.st_mtime_ns:
+            return None
+        return json.loads(entry[2])
+
+    def put(self, path, stat, record):
+        text = json.dumps(record, ensure_ascii=False)
+        self.entries[path] = (stat.st_size, stat.st_mtime_ns, text)
+        self.conn.execute(
+            'INSERT OR REPLACE INTO files (path, size, mtime_ns, record) VALUES (?, ?, ?, ?)',
+            (path, stat.st_size, stat.st_mtime_ns, text)
+        )
+
+    def prune(self, keep):
+        # 删除已经不存在于磁盘上的文件条目
+        removed = [path for path in self.entries
+                   if path not in keep and not os.path.exists(path)]
+        for path in removed:
+            del self.entries[path]
+        self.conn.executemany('DELETE FROM files WHERE path = ?', [(path,) for path in removed])
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
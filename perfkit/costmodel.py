@@ -0,0 +1,237 @@
+import csv
+import sys
+import math
+import argparse
+
+import numpy as np
+
+from perfkit import topology
+
+# 时间-数据量曲线的分段线性代价模型
+# 在 time = a + b * bytes 的分段模型中自动寻找断点：对每个可能的分段数用动态规划求最小残差
+# （加权最小二乘，权重 1/time²，即按相对误差拟合，小规模不会被大规模淹没），再用 BIC 选出分段数。
+# 每段的斜率 b 就是该缓存层级下每字节的边际耗时，换算成 ns/元素 和有效带宽 GB/s（= 1/b），
+# 并由斜率的标准误给出 95% 置信区间。取代手工挑选的规模点和手写的缓存区间。
+# 拓扑记录中有 perfkit.latency 测得的加载延迟时，每段还给出所在层级和 每元素耗时 / 延迟 的比值。
+
+# 小自由度时 95% 双侧 t 分位数，更大的自由度用正态近似
+_T95 = {1: 12.706, 2: 4.303, 3: 3.182, 4: 2.776, 5: 2.571, 6: 2.447, 7: 2.365, 8: 2.306,
+        9: 2.262, 10: 2.228, 12: 2.179, 15: 2.131, 20: 2.086, 30: 2.042}
+
+
+def t_quantile(df):
+    if df <= 0:
+        return float('inf')
+    for key in sorted(_T95):
+        if df <= key:
+            return _T95[key]
+    return 1.96
+
+
+class _Sums:
+    # 前缀和，O(1) 求任意连续区间 [i, j) 的加权线性回归
+    def __init__(self, x, y, w):
+        def prefix(values):
+            return np.concatenate(([0.0], np.cumsum(values)))
+        self.w = prefix(w)
+        self.wx = prefix(w * x)
+        self.wy = prefix(w * y)
+        self.wxx = prefix(w * x * x)
+        self.wxy = prefix(w * x * y)
+        self.wyy = prefix(w * y * y)
+
+    def fit(self, i, j):
+        # 返回 (截距, 斜率, 加权残差平方和, 斜率方差的分母 Sxx)
+        sw = self.w[j] - self.w[i]
+        sx = self.wx[j] - self.wx[i]
+        sy = self.wy[j] - self.wy[i]
+        sxx = (self.wxx[j] - self.wxx[i]) - sx * sx / sw
+        sxy = (self.wxy[j] - self.wxy[i]) - sx * sy / sw
+        syy = (self.wyy[j] - self.wyy[i]) - sy * sy / sw
+        slope = sxy / sxx if sxx > 0 else 0.0
+        intercept = (sy - slope * sx) / sw
+        rss = max(syy - slope * sxy, 0.0)
+        return intercept, slope, rss, sxx
+
+
+def segment_partitions(x, y, w, max_segments=6, min_points=3):
+    # 动态规划：best[k][j] 为前 j 个点分成 k 段的最小残差；返回 {k: (残差, 各段起点列表)}
+    n = len(x)
+    sums = _Sums(x, y, w)
+    max_segments = min(max_segments, n // min_points)
+    inf = float('inf')
+    best = [[inf] * (n + 1) for _ in range(max_segments + 1)]
+    start = [[0] * (n + 1) for _ in range(max_segments + 1)]
+    best[0][0] = 0.0
+    for k in range(1, max_segments + 1):
+        for j in range(k * min_points, n + 1):
+            for i in range((k - 1) * min_points, j - min_points + 1):
+                if best[k - 1][i] == inf:
+                    continue
+                cost = best[k - 1][i] + sums.fit(i, j)[2]
+                if cost < best[k][j]:
+                    best[k][j] = cost
+                    start[k][j] = i
+
+    partitions = {}
+    for k in range(1, max_segments + 1):
+        if best[k][n] == inf:
+            continue
+        starts = []
+        j = n
+        for level in range(k, 0, -1):
+            i = start[level][j]
+            starts.append(i)
+            j = i
+        partitions[k] = (best[k][n], sorted(starts))
+    return partitions, sums
+
+
+def bic(rss, n, segments):
+    # 每段 截距 + 斜率，段间还有一个断点位置
+    params = 3 * segments - 1
+    return n * math.log(max(rss, 1e-300) / n) + params * math.log(n)
+
+
+def fit_cost_model(nbytes, times_ns, bytes_per_element=8, max_segments=6, min_points=3):
+    order = np.argsort(nbytes)
+    x = np.asarray(nbytes, dtype=float)[order]
+    y = np.asarray(times_ns, dtype=float)[order]
+    keep = y > 0
+    x, y = x[keep], y[keep]
+    w = 1.0 / (y * y)
+    n = len(x)
+
+    partitions, sums = segment_partitions(x, y, w, max_segments, min_points)
+    if not partitions:
+        return {'segments': [], 'breakpoints_bytes': [], 'points': n}
+    scores = {k: bic(rss, n, k) for k, (rss, _) in partitions.items()}
+    chosen = min(scores, key=scores.get)
+    starts = partitions[chosen][1] + [n]
+
+    segments = []
+    for i, j in zip(starts, starts[1:]):
+        intercept, slope, rss, sxx = sums.fit(i, j)
+        dof = j - i - 2
+        # 加权回归的斜率标准误: sqrt(残差方差 / Sxx)
+        se = math.sqrt(rss / dof / sxx) if dof > 0 and sxx > 0 else float('inf')
+        half = t_quantile(dof) * se
+        low, high = slope - half, slope + half
+        segments.append({
+            'start_bytes': x[i],
+            'end_bytes': x[j - 1],
+            'points': j - i,
+            'intercept_ns': intercept,
+            'ns_per_byte': slope,
+            'ns_per_element': slope * bytes_per_element,
+            'ns_per_element_ci': (low * bytes_per_element, high * bytes_per_element),
+            # bytes/ns 即 GB/s；斜率区间的上界对应带宽区间的下界
+            'gbps': 1.0 / slope if slope > 0 else float('inf'),
+            'gbps_ci': (1.0 / high if high > 0 else float('inf'), 1.0 / low if low > 0 else float('inf')),
+        })
+
+    # 断点取相邻两段端点的几何中点
+    breakpoints = [math.sqrt(a['end_bytes'] * b['start_bytes']) for a, b in zip(segments, segments[1:])]
+    return {'segments': segments, 'breakpoints_bytes': breakpoints, 'points': n, 'bic': scores[chosen]}
+
+
+def annotate(model, topo):
+    # 每段按结束点的工作集对应到缓存层级，并附上该层级的加载延迟（perfkit.latency 写入拓扑记录）。
+    # latency_ratio = 每元素耗时 / 加载延迟：接近 1 说明每个元素一次串行的加载，受延迟限制，
+    # 增加独立的累加链或预取才有用；远小于 1 说明加载已经重叠，受带宽限制
+    latencies = topology.latencies(topo)
+    for segment in model['segments']:
+        segment['level'] = topology.level_for(segment['end_bytes'], topo)
+        latency = latencies.get(segment['level'])
+        segment['latency_ns'] = latency
+        segment['latency_ratio'] = segment['ns_per_element'] / latency if latency else None
+    return model
+
+
+def read_curves(path, time_unit='us'):
+    # 返回 {算法: (规模列表, 时间ns列表)}
+    # 长表（perfkit.harness 输出: kernel,size,median_ns）或宽表（deep.cpp / common.cpp: 规模 + "xxx(μs)" 列）
+    with open(path, newline='', encoding='utf-8') as file:
+        rows = list(csv.DictReader(file))
+    curves = {}
+    if not rows:
+        return curves
+    if 'kernel' in rows[0]:
+        for row in rows:
+            sizes, times = curves.setdefault(row['kernel'], ([], []))
+            sizes.append(float(row['size']))
+            times.append(float(row['median_ns']))
+        return curves
+
+    scale = {'ns': 1.0, 'us': 1e3, 'ms': 1e6}[time_unit]
+    size_col = list(rows[0])[0]
+    for col in rows[0]:
+        if '(μs)' in col or '(us)' in col:
+            curves[col] = ([float(row[size_col]) for row in rows],
+                           [float(row[col]) * scale for row in rows])
+    return curves
+
+
+def model_rows(name, model):
+    rows = []
+    for index, segment in enumerate(model['segments'], 1):
+        rows.append({
+            'algorithm': name,
+            'segment': index,
+            'start_bytes': int(segment['start_bytes']),
+            'end_bytes': int(segment['end_bytes']),
+            'points': segment['points'],
+            'ns_per_element': round(segment['ns_per_element'], 4),
+            'ns_per_element_ci_low': round(segment['ns_per_element_ci'][0], 4),
+            'ns_per_element_ci_high': round(segment['ns_per_element_ci'][1], 4),
+            'gbps': round(segment['gbps'], 3),
+            'gbps_ci_low': round(segment['gbps_ci'][0], 3),
+            'gbps_ci_high': round(segment['gbps_ci'][1], 3),
+        })
+        if 'level' in segment:
+            rows[-1]['level'] = segment['level']
+            rows[-1]['latency_ns'] = segment['latency_ns']
+            rows[-1]['latency_ratio'] = (round(segment['latency_ratio'], 4)
+                                         if segment['latency_ratio'] is not None else None)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='对时间-数据量曲线做分段线性拟合，自动检测缓存层级的断点')
+    parser.add_argument('data', help='结果 CSV（harness 长表或 deep.cpp / common.cpp 宽表）')
+    parser.add_argument('--bytes-per-element', type=int, default=8, help='每个元素占用的字节数')
+    parser.add_argument('--matrix', action='store_true', help='规模为 n×n 矩阵的边长，数据量按 n² 个元素计算')
+    parser.add_argument('--time-unit', default='us', choices=['ns', 'us', 'ms'], help='宽表中时间列的单位')
+    parser.add_argument('--max-segments', type=int, default=6, help='最多分几段')
+    parser.add_argument('-o', '--output', default='cost_model.csv', help='输出 CSV 文件')
+    args = parser.parse_args()
+
+    # 产生这份数据的机器的缓存容量和加载延迟
+    topo = topology.load_for(args.data)
+    rows = []
+    for name, (sizes, times) in read_curves(args.data, args.time_unit).items():
+        elements = [size * size if args.matrix else size for size in sizes]
+        model = fit_cost_model([count * args.bytes_per_element for count in elements], times,
+                               args.bytes_per_element, args.max_segments)
+        annotate(model, topo)
+        breaks = ', '.join(f'{value / 1024:.0f}KB' for value in model['breakpoints_bytes'])
+        print(f"{name}: {len(model['segments'])} 段，断点 [{breaks}]")
+        for row in model_rows(name, model):
+            print(f"  {row['start_bytes']:>12} - {row['end_bytes']:<12} {row['ns_per_element']:.3f} ns/元素 "
+                  f"[{row['ns_per_element_ci_low']:.3f}, {row['ns_per_element_ci_high']:.3f}]  {row['gbps']:.2f} GB/s"
+                  + (f"  {row['level']} 延迟比 {row['latency_ratio']:.2f}" if row['latency_ratio'] is not None else ''))
+        rows.extend(model_rows(name, model))
+
+    if not rows:
+        print(f"❌ {args.data} 中没有能拟合的曲线（每条曲线至少需要几个有效数据点）")
+        sys.exit(1)
+
+    with open(args.output, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.DictWriter(file, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"✅ 已保存到 {args.output}")
+
+
+if __name__ == '__main__':
+    main()
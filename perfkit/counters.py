@@ -0,0 +1,109 @@
+import ctypes
+import argparse
+
+from perfkit import perf_parser
+from perfkit.native_lib import load_library
+
+# 进程内硬件计数器：libperfkit.so 中 perf_event_open 封装的 Python 接口
+# 只在被测函数调用前后开关计数器，每次重复单独读出一组计数，
+# 字段名与 perf_parser 的解析结果一致（instructions、L1_dcache_load_misses、task_clock 等），
+# 可以直接交给 add/q.py、matrix/parse_perf.py 的 build_stats 计算 IPC 和缺失率。
+# 从 Python 调用时 ctypes 的调用开销（几千条指令）也会计入，被测内核应远大于此。
+# inherit=True 时还统计打开计数器之后创建的线程，多线程内核的线程池要在此之后创建。
+
+DEFAULT_EVENTS = ('instructions', 'cycles', 'cache-references', 'cache-misses',
+                  'L1-dcache-load-misses', 'LLC-load-misses', 'task-clock')
+
+
+def _bind(lib):
+    lib.pk_counters_open.argtypes = [ctypes.c_char_p, ctypes.c_int, ctypes.c_int]
+    lib.pk_counters_open.restype = ctypes.c_void_p
+    lib.pk_counters_available.argtypes = [ctypes.c_void_p, ctypes.c_int]
+    lib.pk_counters_start.argtypes = [ctypes.c_void_p]
+    lib.pk_counters_stop.argtypes = [ctypes.c_void_p]
+    lib.pk_counters_read.argtypes = [ctypes.c_void_p, ctypes.POINTER(ctypes.c_double),
+                                     ctypes.POINTER(ctypes.c_double)]
+    lib.pk_counters_close.argtypes = [ctypes.c_void_p]
+    lib.pk_last_error.restype = ctypes.c_char_p
+    return lib
+
+
+class Counters:
+    def __init__(self, events=DEFAULT_EVENTS, group_size=4, inherit=False):
+        self.lib = _bind(load_library())
+        self.events = list(events)
+        self.handle = self.lib.pk_counters_open(','.join(self.events).encode(), group_size, int(inherit))
+        if not self.handle:
+            raise OSError(f'无法打开计数器: {self.lib.pk_last_error().decode()}'
+                          '（检查 /proc/sys/kernel/perf_event_paranoid 或是否在虚拟机中）')
+        self.available = [bool(self.lib.pk_counters_available(self.handle, i))
+                          for i in range(len(self.events))]
+        self.keys = [perf_parser.event_key(event) for event in self.events]
+        self._values = (ctypes.c_double * len(self.events))()
+        self._run_pct = (ctypes.c_double * len(self.events))()
+
+    def unavailable(self):
+        return [event for event, ok in zip(self.events, self.available) if not ok]
+
+    def start(self):
+        self.lib.pk_counters_start(self.handle)
+
+    def stop(self):
+        self.lib.pk_counters_stop(self.handle)
+
+    def read(self):
+        if self.lib.pk_counters_read(self.handle, self._values, self._run_pct) != 0:
+            raise OSError(self.lib.pk_last_error().decode())
+        record = {}
+        for key, ok, value, run_pct in zip(self.keys, self.available, self._values, self._run_pct):
+            if not ok:
+                continue
+            # task-clock 以纳秒计数，换算成与 perf stat 一致的毫秒
+            record[key] = value / 1e6 if key == 'task_clock' else round(value)
+            record[f'{key}_run_pct'] = run_pct
+        return record
+
+    def measure(self, func, repeats=1):
+        # 每次重复返回一条记录，计数只覆盖 func() 本身
+        records = []
+        for _ in range(repeats):
+            self.start()
+            func()
+            self.stop()
+            records.append(self.read())
+        return records
+
+    def close(self):
+        if self.handle:
+            self.lib.pk_counters_close(self.handle)
+            self.handle = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def measure(func, events=DEFAULT_EVENTS, repeats=1, group_size=4):
+    with Counters(events, group_size) as counters:
+        return counters.measure(func, repeats)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='检查进程内硬件计数器是否可用，并测量空调用的基线计数')
+    parser.add_argument('--events', default=','.join(DEFAULT_EVENTS), help='逗号分隔的事件名，支持 r04d2 形式的原始事件')
+    parser.add_argument('--group-size', type=int, default=4, help='每组硬件事件个数')
+    parser.add_argument('-r', '--repeats', type=int, default=5, help='重复次数')
+    args = parser.parse_args()
+
+    with Counters(args.events.split(','), args.group_size) as counters:
+        for event in counters.unavailable():
+            print(f'警告: 事件 {event} 不可用')
+        for index, record in enumerate(counters.measure(lambda: None, args.repeats), 1):
+            print(f'[{index}] ' + ', '.join(f'{key}={value}' for key, value in record.items()
+                                            if not key.endswith('_run_pct')))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+import argparse
+
+import numpy as np
+
+from perfkit import ingest, topology
+from perfkit.counters import Counters
+from perfkit.harness import time_batched, summarize
+from perfkit.kernels import accumulator_layouts, accumulator_sum, accumulator_batch_timer, buffer_address, release_pools
+from perfkit.scaling import default_thread_counts
+
+# 伪共享基准：同一个多线程求和，部分和分别紧挨着存放（packed）、按 64/128 字节填充、放在线程局部变量里。
+# 每个线程对自己的槽位每个元素读-改-写一次，packed 时多个线程写同一缓存行，缓存行在核心之间来回迁移。
+# 计数器以 inherit 方式打开，统计线程池中所有线程；默认事件中 r04d2 为 Intel 的
+# MEM_LOAD_L3_HIT_RETIRED.XSNP_HITM（读到其他核心修改过的行），其他处理器用 --counters 换成对应的事件。
+# 报告中每种布局相对 padded64 的耗时比就是伪共享的代价，HITM 计数给出直接的证据；
+# 填充之后扩展性仍然差，说明瓶颈在带宽而不是争用。
+
+DEFAULT_SIZES = [1048576, 8388608]
+DEFAULT_EVENTS = ('r04d2', 'cache-misses', 'L1-dcache-load-misses', 'task-clock')
+
+# 原始事件在报告中的名字
+EVENT_ALIASES = {'r04d2': 'hitm'}
+
+
+def sweep(sizes, thread_counts, layouts=None, repeats=5, min_sample_ns=1e6, counters=None, seed=0):
+    layouts = layouts or accumulator_layouts()
+    data = np.random.default_rng(seed).uniform(-100.0, 100.0, max(sizes))
+    address = buffer_address(data)
+    rows = []
+    for size in sizes:
+        exact = float(np.sum(data[:size]))
+        for threads in thread_counts:
+            for layout in layouts:
+                timer = accumulator_batch_timer(layout)
+                row = {'layout': layout, 'threads': threads, 'size': size,
+                       'result_error': abs(accumulator_sum(layout, address, size, threads) - exact)}
+                row.update(summarize(*time_batched(lambda batch: timer(address, size, threads, batch),
+                                                   repeats, min_sample_ns, counters)))
+                for key, alias in EVENT_ALIASES.items():
+                    if key in row:
+                        row[alias] = row.pop(key)
+                        row[f'{alias}_run_pct'] = row.pop(f'{key}_run_pct')
+                row['gbps'] = size * 8 / row['median_ns']
+                rows.append(row)
+                hitm = f", hitm {row['hitm']:.0f}" if 'hitm' in row else ''
+                print(f"{layout:>12} p={threads:<3} n={size:<9} {row['median_ns'] / 1e3:.1f} us{hitm}")
+
+    # 以同一 (规模, 线程数) 下 padded64 的耗时为基准
+    base = {(row['size'], row['threads']): row['median_ns'] for row in rows if row['layout'] == 'padded64'}
+    for row in rows:
+        reference = base.get((row['size'], row['threads']))
+        row['slowdown_vs_padded64'] = row['median_ns'] / reference if reference else None
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='比较紧挨着 / 填充 / 线程局部的部分和，测量伪共享的代价')
+    parser.add_argument('--sizes', default=None, help='逗号分隔的规模列表')
+    parser.add_argument('--threads', default=None, help='逗号分隔的线程数，默认 1,2,4,... 直到物理核心数')
+    parser.add_argument('--layouts', default=None, help='逗号分隔的布局，默认全部')
+    parser.add_argument('--counters', default=','.join(DEFAULT_EVENTS), help='计数器事件，逗号分隔；空字符串表示不采集')
+    parser.add_argument('-r', '--repeats', type=int, default=5, help='每个数据点的重复次数')
+    parser.add_argument('--min-sample-us', type=float, default=1000.0, help='每个样本的最短时长（微秒）')
+    parser.add_argument('-o', '--output', default='false_sharing.csv', help='输出 CSV 文件')
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',') if size] if args.sizes else DEFAULT_SIZES
+    thread_counts = ([int(item) for item in args.threads.split(',')] if args.threads
+                     else [count for count in default_thread_counts() if count > 1] or [1])
+    counters = None
+    if args.counters:
+        # 先回收已有的线程池，计数器打开之后创建的线程才会被 inherit 统计
+        release_pools()
+        counters = Counters(args.counters.split(','), inherit=True)
+        for event in counters.unavailable():
+            print(f'警告: 事件 {event} 不可用')
+
+    rows = sweep(sizes, thread_counts, args.layouts.split(',') if args.layouts else None,
+                 args.repeats, args.min_sample_us * 1e3, counters)
+    if counters:
+        counters.close()
+
+    for row in rows:
+        if row['layout'] == 'packed' and row['slowdown_vs_padded64']:
+            print(f"n={row['size']:<9} p={row['threads']:<3} packed 比 padded64 慢 {row['slowdown_vs_padded64']:.2f}x")
+
+    ingest.save_to_csv(rows, args.output, ingest.table_fields(rows, leading=('layout', 'threads', 'size')))
+    topology.record(args.output)
+    print(f"✅ 共 {len(rows)} 个数据点，已保存到 {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+import sys
+import json
+import argparse
+
+import numpy as np
+
+from perfkit import ingest, roofline, tiling, topology
+from perfkit.harness import time_batched, summarize
+from perfkit.kernels import (aligned_matrix, buffer_address, gemm_kernels, gemm_threaded, gemm_kernel,
+                             gemm_batch_timer, set_gemm_tiles, release_pools)
+from perfkit.orchestrator import default_cpus, physical_cores
+
+# 稠密矩阵乘内核族：naive (ijk) / interchanged (ikj) / blocked / micro（打包 + 寄存器微内核）/ parallel
+# 矩阵使用与矩阵向量相同的 64 字节对齐存储（行跨度 n + padding），计时用 harness 的批量计时。
+# 每个 (内核, 规模) 先与 numpy.matmul 的结果比较（最大相对误差），再报告 GFLOP/s（2n³ 次浮点运算）
+# 以及达到实测峰值的比例；峰值取 perfkit.roofline 在相同线程数下测得的最高浮点吞吐（支持时为 FMA），
+# 不给 --ceilings 时现场测量。矩阵乘是计算受限的，分块和寄存器复用的效果在这里能完整体现出来。
+# 误差超过 TOLERANCE_PER_N × n 的行标记为未通过（verified = False）并给出警告，不参与峰值比例，
+# 命令行在保存结果后以非零状态退出。
+
+DEFAULT_SIZES = [64, 128, 256, 512, 1024]
+# naive 在大规模下每次调用要数秒，超过该规模跳过
+DEFAULT_MAX_NAIVE = 1024
+# 允许的最大相对误差为 TOLERANCE_PER_N × n（n 项乘积累加的舍入误差随 n 增长）
+TOLERANCE_PER_N = 1e-12
+
+
+def random_operands(size, padding=0, seed=0):
+    rng = np.random.default_rng((seed, size))
+    a, lda = aligned_matrix(size, padding)
+    b, ldb = aligned_matrix(size, padding)
+    c, ldc = aligned_matrix(size, padding)
+    a[:, :size] = rng.random((size, size))
+    b[:, :size] = rng.random((size, size))
+    return (a, lda), (b, ldb), (c, ldc)
+
+
+def max_relative_error(result, expected):
+    return float(np.max(np.abs(result - expected) / np.maximum(np.abs(expected), np.finfo(float).tiny)))
+
+
+def verify(row, size, label):
+    # 检查 row['max_relative_error']，超过容差时标记并警告，返回是否通过
+    row['verified'] = row['max_relative_error'] <= TOLERANCE_PER_N * size
+    if not row['verified']:
+        print(f"警告: {label} n={size} 的最大相对误差 {row['max_relative_error']:.1e} 超过容差 "
+              f"{TOLERANCE_PER_N * size:.1e}，结果不正确")
+    return row['verified']
+
+
+def sweep(sizes, names=None, threads=1, padding=0, repeats=5, min_sample_ns=1e6, max_naive=DEFAULT_MAX_NAIVE,
+          seed=0):
+    names = names or gemm_kernels()
+    rows = []
+    try:
+        for size in sizes:
+            (a, lda), (b, ldb), (c, ldc) = random_operands(size, padding, seed)
+            expected = np.matmul(a[:, :size], b[:, :size])
+            addresses = (buffer_address(a), lda, buffer_address(b), ldb, buffer_address(c), ldc)
+            for name in names:
+                if name == 'naive' and size > max_naive:
+                    continue
+                kernel_threads = threads if gemm_threaded(name) else 1
+                c[:] = 0.0
+                gemm_kernel(name)(size, *addresses, kernel_threads)
+                row = {'kernel': name, 'size': size, 'threads': kernel_threads, 'padding': padding,
+                       'max_relative_error': max_relative_error(c[:, :size], expected)}
+                verify(row, size, name)
+                timer = gemm_batch_timer(name)
+                row.update(summarize(*time_batched(lambda batch: timer(size, *addresses, kernel_threads, batch),
+                                                   repeats, min_sample_ns)))
+                row['gflops'] = 2 * size ** 3 / row['median_ns']
+                rows.append(row)
+                print(f"{name:>12} n={size:<6} p={kernel_threads:<3} {row['gflops']:.2f} GFLOP/s, "
+                      f"误差 {row['max_relative_error']:.1e}")
+    finally:
+        release_pools()
+    return rows
+
+
+def attach_peaks(rows, peaks):
+    # peaks: {线程数: GFLOP/s}
+    for row in rows:
+        peak = peaks.get(row['threads'])
+        row['peak_gflops'] = peak
+        row['fraction_of_peak'] = row['gflops'] / peak if peak and row['verified'] else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='矩阵乘内核族的规模扫描：与 numpy.matmul 校验，报告 GFLOP/s 和达到峰值的比例')
+    parser.add_argument('--sizes', default=None, help='逗号分隔的矩阵边长')
+    parser.add_argument('--kernels', default=None, help='逗号分隔的内核名，默认全部')
+    parser.add_argument('--threads', type=int, default=None, help='parallel 内核的线程数，默认为物理核心数')
+    parser.add_argument('--tiles', default=None, help='分块 MCxKCxNC，默认由 perfkit.tiling 按本机缓存推出')
+    parser.add_argument('--padding', type=int, default=0, help='每行末尾的填充元素个数')
+    parser.add_argument('--max-naive', type=int, default=DEFAULT_MAX_NAIVE, help='naive 内核的最大规模')
+    parser.add_argument('-r', '--repeats', type=int, default=5, help='每个数据点的重复次数')
+    parser.add_argument('--min-sample-us', type=float, default=1000.0, help='每个样本的最短时长（微秒）')
+    parser.add_argument('--ceilings', default=None, help='perfkit.roofline 的上限 JSON，默认现场测量浮点峰值')
+    parser.add_argument('-o', '--output', default='gemm.csv', help='输出 CSV 文件')
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',') if size] if args.sizes else DEFAULT_SIZES
+    threads = args.threads or len(physical_cores(default_cpus()))
+    tiles = (tuple(int(item) for item in args.tiles.lower().split('x')) if args.tiles
+             else tiling.gemm_tiles(topology.detect()))
+    set_gemm_tiles(*tiles)
+    print(f"分块 MC×KC×NC = {'×'.join(map(str, tiles))}")
+
+    rows = sweep(sizes, args.kernels.split(',') if args.kernels else None, threads, args.padding,
+                 args.repeats, args.min_sample_us * 1e3, args.max_naive)
+
+    thread_counts = sorted({row['threads'] for row in rows})
+    if args.ceilings:
+        with open(args.ceilings, encoding='utf-8') as file:
+            results = json.load(file)
+    else:
+        results = {'flops': [flops for count in thread_counts for flops in roofline.measure_peak_flops(count)]}
+    peaks = {}
+    for count in thread_counts:
+        try:
+            peaks[count] = roofline.peak_gflops(results, count)
+        except ValueError:
+            print(f"警告: 上限文件中没有 {count} 个线程的浮点峰值")
+    attach_peaks(rows, peaks)
+
+    for row in rows:
+        if row['kernel'] in ('micro', 'parallel') and row['fraction_of_peak'] is not None:
+            print(f"{row['kernel']:>12} n={row['size']:<6} 达到峰值的 {row['fraction_of_peak']:.0%}")
+
+    ingest.save_to_csv(rows, args.output, ingest.table_fields(rows, leading=('kernel', 'size', 'threads')))
+    topology.record(args.output)
+    print(f"✅ 共 {len(rows)} 个数据点，已保存到 {args.output}")
+    failed = [row for row in rows if not row['verified']]
+    if failed:
+        print(f"❌ {len(failed)} 个数据点的结果与 numpy.matmul 不一致")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,246 @@
+import time
+import ctypes
+import argparse
+import statistics
+import functools
+
+import numpy as np
+
+from perfkit import ingest, planner, tiling, topology
+from perfkit.counters import Counters
+from perfkit.kernels import (sum_kernels, matvec_kernels, sum_kernel, matvec_kernel, buffer_address,
+                             aligned_matrix, set_matvec_tiles, sum_batch_timer, matvec_batch_timer, simd_isa)
+from perfkit.orchestrator import DEFAULT_SIZES as DEFAULT_MATVEC_SIZES
+
+# 进程内计时：在同一个 Python 进程中通过 ctypes 调用 libperfkit.so 的内核，
+# 用 time.perf_counter_ns 计时。整轮扫描只分配一次最大规模的缓冲区并填充一次随机数，
+# 各规模使用它的前 n 个元素，省去了每个数据点一次进程启动和重新生成随机数组的开销。
+# 矩阵则按规模单独分配（64 字节对齐，行跨度 n + padding，与 matrix/common.cpp 相同），
+# --paddings 扫描每行的填充元素个数，用来暴露 2 的幂行跨度造成的缓存组冲突；
+# 分块内核 tiled 默认使用 perfkit.tiling 按本机缓存推出的分块大小，--tiles 可指定或扫描（sweep）。
+# --batched 时改由 C++ 内部连续调用一批并用 CLOCK_MONOTONIC_RAW 计时，批大小自动加倍到
+# 每个样本不少于 --min-sample-us（默认 100us），结果是每次调用的纳秒数，适合 L1 范围的小规模。
+# --plan 时规模由 perfkit.planner 按本机缓存拐点生成，并在 --budget 秒内按测得曲线的斜率变化继续加密。
+
+# add/deep.cpp 的规模列表
+DEFAULT_SUM_SIZES = [1024, 2048, 3000, 4000, 4600, 5000, 6000, 8192,
+                     65536, 131072, 200000, 262144, 330000, 350000, 400000, 524288,
+                     1048576, 2097152, 3000000, 4000000, 4500000, 5000000, 6000000, 8388608,
+                     16777216, 33554432, 67108864]
+
+
+def time_calls(func, repeats, counters=None):
+    # 先调用一次预热（不计时），然后每次调用单独计时；指定 counters 时计数器也只包住这一次调用
+    func()
+    times_ns = []
+    counts = []
+    for _ in range(repeats):
+        if counters:
+            counters.start()
+        start = time.perf_counter_ns()
+        func()
+        elapsed = time.perf_counter_ns() - start
+        if counters:
+            counters.stop()
+            counts.append(counters.read())
+        times_ns.append(elapsed)
+    return times_ns, counts
+
+
+def calibrate_batch(run_batch, min_sample_ns):
+    # 批大小从 1 开始加倍，直到一批的耗时不少于 min_sample_ns
+    batch = 1
+    while run_batch(batch) < min_sample_ns:
+        batch *= 2
+    return batch
+
+
+def time_batched(run_batch, repeats, min_sample_ns, counters=None):
+    # run_batch(batch) 返回连续调用 batch 次的总纳秒数；结果和计数都换算为每次调用
+    batch = calibrate_batch(run_batch, min_sample_ns)
+    times_ns = []
+    counts = []
+    for _ in range(repeats):
+        if counters:
+            counters.start()
+        elapsed = run_batch(batch)
+        if counters:
+            counters.stop()
+            counts.append({key: value if key.endswith('_run_pct') else value / batch
+                           for key, value in counters.read().items()})
+        times_ns.append(elapsed / batch)
+    return times_ns, counts, batch
+
+
+def summarize(times_ns, counts, batch=1):
+    row = {
+        'repeats': len(times_ns),
+        'batch': batch,
+        'median_ns': statistics.median(times_ns),
+        'mean_ns': statistics.fmean(times_ns),
+        'min_ns': min(times_ns),
+    }
+    # 计数器取各次重复的中位数
+    for key in counts[0] if counts else ():
+        row[key] = statistics.median(count[key] for count in counts)
+    return row
+
+
+@functools.lru_cache(maxsize=4)
+def _random_buffers(suite, capacity, seed):
+    # 同一轮扫描（包括规划模式下的多批加密）共用同一组缓冲区
+    rng = np.random.default_rng(seed)
+    if suite == 'sum':
+        data = rng.uniform(-100.0, 100.0, capacity)
+        return data, np.empty_like(data)
+    return rng.random(capacity), np.zeros(capacity)
+
+
+def sum_sweep(sizes, names=None, repeats=10, counters=None, seed=0, min_sample_ns=None, capacity=None):
+    names = names or sum_kernels()
+    data, scratch = _random_buffers('sum', capacity or max(sizes), seed)
+    data_address = buffer_address(data)
+    scratch_address = buffer_address(scratch)
+
+    rows = []
+    for size in sizes:
+        for name in names:
+            kernel = sum_kernel(name)
+            if name == 'in_place':
+                # 原地算法会改写数据，每次先复制一份（与 add/deep.cpp 一样计入时间）
+                def call(kernel=kernel, size=size):
+                    ctypes.memmove(scratch_address, data_address, size * 8)
+                    return kernel(scratch_address, size)
+            else:
+                def call(kernel=kernel, size=size):
+                    return kernel(data_address, size)
+            row = {'kernel': name, 'size': size, 'result': call()}
+            if min_sample_ns:
+                timer = sum_batch_timer(name)
+                scratch_arg = scratch_address if name == 'in_place' else None
+                row.update(summarize(*time_batched(
+                    lambda batch: timer(data_address, scratch_arg, size, batch),
+                    repeats, min_sample_ns, counters)))
+            else:
+                row.update(summarize(*time_calls(call, repeats, counters)))
+            rows.append(row)
+            print(f"{name:>10} n={size:<9} 中位数 {row['median_ns']:.1f} ns")
+    return rows
+
+
+def matvec_configurations(names, tiles):
+    # [(内核名, 分块大小或 None)]；只有 tiled 有分块大小
+    for name in names:
+        if name == 'tiled':
+            for tile in tiles:
+                yield name, tile
+        else:
+            yield name, None
+
+
+def matvec_sweep(sizes, names=None, repeats=10, counters=None, seed=0, min_sample_ns=None, capacity=None,
+                 paddings=(0,), tiles=None):
+    names = names or matvec_kernels()
+    tiles = tiles or [tiling.matvec_tiles(topology.detect())]
+    vector, result = _random_buffers('matvec', capacity or max(sizes), seed)
+
+    rows = []
+    for size in sizes:
+        # 同一规模的各个填充使用相同的矩阵元素
+        values = np.random.default_rng((seed, size)).random((size, size))
+        for padding in paddings:
+            matrix, lda = aligned_matrix(size, padding)
+            matrix[:, :size] = values
+            addresses = (buffer_address(matrix), lda, buffer_address(vector), buffer_address(result))
+            for name, tile in matvec_configurations(names, tiles):
+                row = {'kernel': name, 'size': size, 'padding': padding, 'lda': lda}
+                if tile:
+                    set_matvec_tiles(*tile)
+                    row['col_block'], row['row_block'] = tile
+                if min_sample_ns:
+                    timer = matvec_batch_timer(name)
+                    row.update(summarize(*time_batched(
+                        lambda batch: timer(size, *addresses, batch), repeats, min_sample_ns, counters)))
+                else:
+                    kernel = matvec_kernel(name)
+                    row.update(summarize(*time_calls(lambda: kernel(size, *addresses), repeats, counters)))
+                rows.append(row)
+                label = f"{name}({tiling.format_tiles([tile])})" if tile else name
+                print(f"{label:>16} n={size:<6} 填充={padding:<3} 中位数 {row['median_ns']:.1f} ns")
+            del matrix
+    return rows
+
+
+def planned_sweep(sweep, sizes, budget_s, **kwargs):
+    # 先测规划出的规模，再由 planner.refine 在斜率变化大的区间插入新规模，缓冲区按最大规模分配一次
+    rows = []
+
+    def measure(batch_sizes):
+        new_rows = sweep(batch_sizes, capacity=max(sizes), **kwargs)
+        rows.extend(new_rows)
+        curves = {}
+        for row in new_rows:
+            # 矩阵向量的每个填充、每种分块是一条单独的曲线
+            curve = (row['kernel'], row.get('padding'), row.get('col_block'), row.get('row_block'))
+            curves.setdefault(row['size'], {})[curve] = row['median_ns']
+        return curves
+
+    planner.refine(measure, sizes, budget_s)
+    rows.sort(key=lambda row: row['size'])
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='在一个进程内扫描全部规模，计时 libperfkit.so 中的内核')
+    parser.add_argument('suite', choices=['sum', 'matvec'], help='求和内核或矩阵向量内核')
+    parser.add_argument('--sizes', default=None, help='逗号分隔的规模列表，默认与 deep.cpp / run_perf_all.sh 相同')
+    parser.add_argument('--kernels', default=None, help='逗号分隔的内核名，默认全部')
+    parser.add_argument('-r', '--repeats', type=int, default=10, help='每个 (内核, 规模) 的重复次数')
+    parser.add_argument('--counters', default=None, help='同时记录的硬件计数器事件，逗号分隔')
+    parser.add_argument('--batched', action='store_true', help='在 C++ 内部批量调用并用 CLOCK_MONOTONIC_RAW 计时')
+    parser.add_argument('--min-sample-us', type=float, default=100.0, help='批量模式下每个样本的最短时长（微秒）')
+    parser.add_argument('--paddings', default='0', help='矩阵向量：逗号分隔的每行填充元素个数，行跨度为 n + 填充')
+    parser.add_argument('--tiles', default=None,
+                        help='矩阵向量 tiled 内核的分块，如 1024x4,512x8；sweep 为扫描候选，默认按本机缓存推出')
+    parser.add_argument('--plan', action='store_true', help='按本机缓存拐点规划规模，并自适应加密')
+    parser.add_argument('--budget', type=float, default=60.0, help='规划模式下的时间预算（秒）')
+    parser.add_argument('-o', '--output', default=None, help='输出 CSV 文件，默认 harness_<suite>.csv')
+    args = parser.parse_args()
+
+    default_sizes = DEFAULT_SUM_SIZES if args.suite == 'sum' else DEFAULT_MATVEC_SIZES
+    if args.sizes:
+        sizes = [int(size) for size in args.sizes.split(',') if size]
+    elif args.plan:
+        sizes = planner.plan(topology.detect(), matrix=args.suite == 'matvec')
+        print(planner.describe_plan(sizes, default_sizes))
+    else:
+        sizes = default_sizes
+    names = args.kernels.split(',') if args.kernels else None
+    counters = Counters(args.counters.split(',')) if args.counters else None
+
+    if args.suite == 'sum':
+        print(f"simd4 / simd8 使用的指令集: {simd_isa()}")
+    sweep = sum_sweep if args.suite == 'sum' else matvec_sweep
+    min_sample_ns = args.min_sample_us * 1e3 if args.batched else None
+    options = dict(names=names, repeats=args.repeats, counters=counters, min_sample_ns=min_sample_ns)
+    if args.suite == 'matvec':
+        options['paddings'] = [int(padding) for padding in args.paddings.split(',') if padding]
+        if args.tiles == 'sweep':
+            options['tiles'] = tiling.matvec_tile_candidates(topology.detect())
+        elif args.tiles:
+            options['tiles'] = tiling.parse_tiles(args.tiles)
+    if args.plan:
+        rows = planned_sweep(sweep, sizes, args.budget, **options)
+    else:
+        rows = sweep(sizes, **options)
+    if counters:
+        counters.close()
+
+    output = args.output or f'harness_{args.suite}.csv'
+    ingest.save_to_csv(rows, output, ingest.table_fields(rows, leading=('kernel', 'size')))
+    topology.record(output)
+    print(f"✅ 共 {len(rows)} 个数据点，已保存到 {output}")
+
+
+if __name__ == '__main__':
+    main()
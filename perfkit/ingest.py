@@ -0,0 +1,131 @@
+import os
+import re
+import csv
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+from perfkit import perf_parser
+from perfkit.cache import CACHE_FILE_NAME, ParseCache, default_cache_path
+
+# perf_results 整棵目录树的并行导入
+# 目录结构: <root>/<program>/perf_<size>.txt，程序名和规模直接从路径得到；
+# 也兼容 add/ 下的 <program>_perf.txt（没有规模）；后缀 .csv/.json 对应 perf stat -x, / -j 的输出。
+# 文件按块分发到 ProcessPoolExecutor 的各个进程解析，最后合并为一张表。
+# 指定 cache_path 时只解析新增或修改过的文件，其余记录取自 SQLite 缓存。
+
+_PERF_FILE_RE = re.compile(r'^perf_(?P<size>\d+)\.(?:txt|csv|json)$')
+PERF_FILE_SUFFIXES = ('_perf.txt', '_perf.csv', '_perf.json')
+
+# 文件数少于该值时直接在当前进程解析，省去进程池的启动开销
+_INLINE_LIMIT = 16
+
+
+def find_perf_files(root):
+    tasks = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        program = os.path.basename(os.path.normpath(dirpath))
+        for name in sorted(filenames):
+            match = _PERF_FILE_RE.match(name)
+            if match:
+                tasks.append((os.path.join(dirpath, name), program, int(match.group('size'))))
+            elif name.endswith(PERF_FILE_SUFFIXES):
+                tasks.append((os.path.join(dirpath, name), program_name(name), None))
+    return tasks
+
+
+def program_name(file_name):
+    # four_perf.txt / four_perf.csv / four_perf.json -> four
+    return file_name[:file_name.rindex('_perf.')]
+
+
+def map_files(func, items, workers=None):
+    # 把 items 分片交给进程池，结果顺序与输入一致
+    items = list(items)
+    if len(items) < _INLINE_LIMIT or workers == 1:
+        return [func(item) for item in items]
+
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(items) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(func, items, chunksize=chunksize))
+
+
+def parse_files(file_paths, workers=None, cache_path=None):
+    # 返回与 file_paths 顺序一致的原始解析记录
+    if cache_path is None:
+        return map_files(perf_parser.parse_perf_file, file_paths, workers)
+
+    file_paths = [os.path.abspath(path) for path in file_paths]
+    with ParseCache(cache_path) as cache:
+        records = []
+        stale = []
+        for index, path in enumerate(file_paths):
+            stat = os.stat(path)
+            record = cache.get(path, stat)
+            if record is None:
+                stale.append((index, stat))
+            records.append(record)
+
+        parsed = map_files(perf_parser.parse_perf_file, [file_paths[index] for index, _ in stale], workers)
+        for (index, stat), record in zip(stale, parsed):
+            records[index] = record
+            cache.put(file_paths[index], stat, record)
+        cache.prune(set(file_paths))
+    return records
+
+
+def sort_key(record):
+    size = record.get('size')
+    return (record.get('program') or '', size is None, size or 0)
+
+
+def ingest(root, workers=None, cache_path=None):
+    tasks = find_perf_files(root)
+    records = parse_files([file_path for file_path, _, _ in tasks], workers, cache_path)
+    for record, (_, program, size) in zip(records, tasks):
+        record['program'] = program
+        record['size'] = size
+        # 实际计数时间占比不足的事件，它们的计数值是分时复用下的估计
+        record['multiplexed_events'] = ';'.join(perf_parser.multiplexed_events(record))
+    records.sort(key=sort_key)
+    return records
+
+
+def table_fields(records, leading=('program', 'size', 'file_name')):
+    # 合并所有记录的字段，前几列固定，其余按首次出现的顺序排列
+    fieldnames = list(leading)
+    seen = set(fieldnames)
+    for record in records:
+        for key in record:
+            if key not in seen:
+                seen.add(key)
+                fieldnames.append(key)
+    return fieldnames
+
+
+def save_to_csv(records, output_file, fieldnames=None):
+    fieldnames = fieldnames or table_fields(records)
+    with open(output_file, mode='w', newline='', encoding='utf-8') as file:
+        writer = csv.DictWriter(file, fieldnames=fieldnames, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(records)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='并行导入 perf_results/<program>/perf_<size>.txt 目录树')
+    parser.add_argument('root', help='perf_results 目录')
+    parser.add_argument('-o', '--output', default='perf_results.csv', help='输出 CSV 文件')
+    parser.add_argument('-j', '--workers', type=int, default=None, help='解析进程数，默认使用全部核心')
+    parser.add_argument('--cache', default=None, help=f'解析缓存文件，默认 <root>/{CACHE_FILE_NAME}')
+    parser.add_argument('--no-cache', action='store_true', help='忽略缓存，重新解析全部文件')
+    args = parser.parse_args()
+
+    cache_path = None if args.no_cache else (args.cache or default_cache_path(args.root))
+    records = ingest(args.root, args.workers, cache_path)
+    save_to_csv(records, args.output)
+    print(f"✅ 共导入 {len(records)} 个文件，已保存到 {args.output}")
+
+
+if __name__ == '__main__':
+    main()
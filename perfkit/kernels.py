@@ -0,0 +1,266 @@
+import ctypes
+
+import numpy as np
+
+from perfkit.native_lib import load_library
+
+# libperfkit.so 中求和 / 多线程求和 / 矩阵向量 / 矩阵乘内核的 ctypes 接口
+# 直接把 NumPy 数组的缓冲区指针传给 C++，不做任何复制；内核编号和名字由库中的名字表给出。
+# *_batch_timer 在 C++ 内部连续调用 batch 次并用 CLOCK_MONOTONIC_RAW 计时，用于亚微秒级的内核。
+
+_lib = None
+
+
+def _kernel_lib():
+    global _lib
+    if _lib is None:
+        lib = load_library()
+        lib.pk_sum_kernel_name.restype = ctypes.c_char_p
+        lib.pk_simd_isa.restype = ctypes.c_char_p
+        lib.pk_sum.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_size_t]
+        lib.pk_sum.restype = ctypes.c_double
+        lib.pk_matvec_kernel_name.restype = ctypes.c_char_p
+        lib.pk_matvec.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_void_p, ctypes.c_size_t,
+                                  ctypes.c_void_p, ctypes.c_void_p]
+        lib.pk_time_sum.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_void_p, ctypes.c_size_t,
+                                    ctypes.c_size_t]
+        lib.pk_time_sum.restype = ctypes.c_double
+        lib.pk_time_matvec.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_void_p, ctypes.c_size_t,
+                                       ctypes.c_void_p, ctypes.c_void_p, ctypes.c_size_t]
+        lib.pk_time_matvec.restype = ctypes.c_double
+        lib.pk_set_matvec_tiles.argtypes = [ctypes.c_int, ctypes.c_int]
+        lib.pk_batched_matvec.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_void_p, ctypes.c_size_t,
+                                          ctypes.c_void_p, ctypes.c_size_t, ctypes.c_void_p, ctypes.c_size_t,
+                                          ctypes.c_int, ctypes.c_int]
+        lib.pk_time_batched_matvec.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_void_p, ctypes.c_size_t,
+                                               ctypes.c_void_p, ctypes.c_size_t, ctypes.c_void_p, ctypes.c_size_t,
+                                               ctypes.c_int, ctypes.c_int, ctypes.c_size_t]
+        lib.pk_time_batched_matvec.restype = ctypes.c_double
+        lib.pk_gemm_kernel_name.restype = ctypes.c_char_p
+        lib.pk_gemm.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_void_p, ctypes.c_size_t, ctypes.c_void_p,
+                                ctypes.c_size_t, ctypes.c_void_p, ctypes.c_size_t, ctypes.c_int]
+        lib.pk_time_gemm.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_void_p, ctypes.c_size_t, ctypes.c_void_p,
+                                     ctypes.c_size_t, ctypes.c_void_p, ctypes.c_size_t, ctypes.c_int, ctypes.c_size_t]
+        lib.pk_time_gemm.restype = ctypes.c_double
+        lib.pk_set_gemm_tiles.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_int]
+        lib.pk_set_pool_affinity.argtypes = [ctypes.POINTER(ctypes.c_int), ctypes.c_int]
+        lib.pk_first_touch_columns.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_size_t, ctypes.c_int]
+        lib.pk_parallel_matvec.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_size_t, ctypes.c_void_p,
+                                           ctypes.c_void_p, ctypes.c_int, ctypes.c_int, ctypes.c_int]
+        lib.pk_time_parallel_matvec.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_size_t, ctypes.c_void_p,
+                                                ctypes.c_void_p, ctypes.c_int, ctypes.c_int, ctypes.c_int,
+                                                ctypes.c_size_t]
+        lib.pk_time_parallel_matvec.restype = ctypes.c_double
+        lib.pk_parallel_sum_kernel_name.restype = ctypes.c_char_p
+        lib.pk_parallel_sum.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_size_t, ctypes.c_int]
+        lib.pk_parallel_sum.restype = ctypes.c_double
+        lib.pk_time_parallel_sum.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_size_t, ctypes.c_int,
+                                             ctypes.c_size_t]
+        lib.pk_time_parallel_sum.restype = ctypes.c_double
+        lib.pk_recursive_sum.argtypes = [ctypes.c_void_p, ctypes.c_size_t, ctypes.c_size_t, ctypes.c_size_t,
+                                         ctypes.c_int]
+        lib.pk_recursive_sum.restype = ctypes.c_double
+        lib.pk_time_recursive_sum.argtypes = [ctypes.c_void_p, ctypes.c_size_t, ctypes.c_size_t, ctypes.c_size_t,
+                                              ctypes.c_int, ctypes.c_size_t]
+        lib.pk_time_recursive_sum.restype = ctypes.c_double
+        lib.pk_accumulator_layout_name.restype = ctypes.c_char_p
+        lib.pk_accumulator_sum.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_size_t, ctypes.c_int]
+        lib.pk_accumulator_sum.restype = ctypes.c_double
+        lib.pk_time_accumulator_sum.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_size_t, ctypes.c_int,
+                                                ctypes.c_size_t]
+        lib.pk_time_accumulator_sum.restype = ctypes.c_double
+        _lib = lib
+    return _lib
+
+
+def sum_kernels(supported_only=True):
+    # 默认只列出本机支持的内核（avx512_* 等需要对应的指令集）；名字到编号的映射始终用完整列表
+    lib = _kernel_lib()
+    return [lib.pk_sum_kernel_name(i).decode() for i in range(lib.pk_sum_kernel_count())
+            if not supported_only or lib.pk_sum_kernel_supported(i)]
+
+
+def simd_isa():
+    # simd4 / simd8 在本机选用的指令集: avx512 / avx2 / scalar
+    return _kernel_lib().pk_simd_isa().decode()
+
+
+def matvec_kernels():
+    lib = _kernel_lib()
+    return [lib.pk_matvec_kernel_name(i).decode() for i in range(lib.pk_matvec_kernel_count())]
+
+
+def gemm_kernels():
+    lib = _kernel_lib()
+    return [lib.pk_gemm_kernel_name(i).decode() for i in range(lib.pk_gemm_kernel_count())]
+
+
+def gemm_threaded(name):
+    # 该矩阵乘内核是否使用线程数参数
+    return bool(_kernel_lib().pk_gemm_kernel_threaded(gemm_kernels().index(name)))
+
+
+def parallel_sum_kernels():
+    lib = _kernel_lib()
+    return [lib.pk_parallel_sum_kernel_name(i).decode() for i in range(lib.pk_parallel_sum_kernel_count())]
+
+
+def buffer_address(array):
+    # 内核按连续的 double 读取，其他类型或非连续的视图直接报错，避免隐式复制
+    if array.dtype != np.float64 or not array.flags['C_CONTIGUOUS']:
+        raise ValueError('需要 C 连续的 float64 数组')
+    return array.ctypes.data
+
+
+def aligned_array(size, alignment=64):
+    # 起始地址按 alignment 字节对齐、初值为 0 的一维 float64 数组
+    raw = np.zeros(size + alignment // 8, dtype=np.float64)
+    offset = (-raw.ctypes.data % alignment) // 8
+    return raw[offset:offset + size]
+
+
+def aligned_matrix(n, padding=0, alignment=64):
+    # 起始地址按 alignment 字节对齐的 n×(n + padding) 行主序矩阵，返回 (数组, 行跨度 lda)，
+    # 与 perfkit/native/matrix_storage.h 的 AlignedMatrix 布局相同；内核只用每行的前 n 个元素
+    lda = n + padding
+    return aligned_array(n * lda, alignment).reshape(n, lda), lda
+
+
+def sum_kernel(name):
+    # 返回 f(address, n)；地址由调用方预先取好，计时循环里不再做类型检查
+    lib = _kernel_lib()
+    kernel_id = sum_kernels(supported_only=False).index(name)
+    pk_sum = lib.pk_sum
+    return lambda address, n: pk_sum(kernel_id, address, n)
+
+
+def matvec_kernel(name):
+    # 返回 f(n, A_address, lda, v_address, result_address)
+    lib = _kernel_lib()
+    kernel_id = matvec_kernels().index(name)
+    pk_matvec = lib.pk_matvec
+    return lambda n, a, lda, v, result: pk_matvec(kernel_id, n, a, lda, v, result)
+
+
+def sum_batch_timer(name):
+    # 返回 f(address, scratch_address, n, batch) -> 总纳秒数；scratch_address 为 None 时不复制
+    lib = _kernel_lib()
+    kernel_id = sum_kernels(supported_only=False).index(name)
+    pk_time_sum = lib.pk_time_sum
+    return lambda address, scratch, n, batch: pk_time_sum(kernel_id, address, scratch, n, batch)
+
+
+def matvec_batch_timer(name):
+    # 返回 f(n, A_address, lda, v_address, result_address, batch) -> 总纳秒数
+    lib = _kernel_lib()
+    kernel_id = matvec_kernels().index(name)
+    pk_time_matvec = lib.pk_time_matvec
+    return lambda n, a, lda, v, result, batch: pk_time_matvec(kernel_id, n, a, lda, v, result, batch)
+
+
+def set_matvec_tiles(col_block, row_block):
+    # 设置矩阵向量内核 tiled 的列分块（result 元素个数）和一次处理的行数（1 / 2 / 4 / 8）
+    _kernel_lib().pk_set_matvec_tiles(col_block, row_block)
+
+
+def parallel_sum_kernel(name):
+    # 返回 f(address, n, threads)
+    lib = _kernel_lib()
+    kernel_id = parallel_sum_kernels().index(name)
+    pk_parallel_sum = lib.pk_parallel_sum
+    return lambda address, n, threads: pk_parallel_sum(kernel_id, address, n, threads)
+
+
+def parallel_sum_batch_timer(name):
+    # 返回 f(address, n, threads, batch) -> 总纳秒数
+    lib = _kernel_lib()
+    kernel_id = parallel_sum_kernels().index(name)
+    pk_time_parallel_sum = lib.pk_time_parallel_sum
+    return lambda address, n, threads, batch: pk_time_parallel_sum(kernel_id, address, n, threads, batch)
+
+
+def recursive_sum(address, n, leaf, spawn_threshold, threads=1):
+    # 任务并行的递归两两相加：递归到 leaf 个元素改用 8 路展开，超过 spawn_threshold 的子树交给工作窃取线程池
+    return _kernel_lib().pk_recursive_sum(address, n, leaf, spawn_threshold, threads)
+
+
+def recursive_sum_batch_timer():
+    # 返回 f(address, n, leaf, spawn_threshold, threads, batch) -> 总纳秒数
+    return _kernel_lib().pk_time_recursive_sum
+
+
+def accumulator_layouts():
+    lib = _kernel_lib()
+    return [lib.pk_accumulator_layout_name(i).decode() for i in range(lib.pk_accumulator_layout_count())]
+
+
+def accumulator_sum(layout, address, n, threads):
+    # 部分和按 layout（packed / padded64 / padded128 / thread_local）存放的多线程求和
+    lib = _kernel_lib()
+    return lib.pk_accumulator_sum(accumulator_layouts().index(layout), address, n, threads)
+
+
+def accumulator_batch_timer(layout):
+    # 返回 f(address, n, threads, batch) -> 总纳秒数
+    lib = _kernel_lib()
+    layout_id = accumulator_layouts().index(layout)
+    pk_time_accumulator_sum = lib.pk_time_accumulator_sum
+    return lambda address, n, threads, batch: pk_time_accumulator_sum(layout_id, address, n, threads, batch)
+
+
+def batched_matvec(n, k, a, lda, v, ldv, r, ldr, col_block, row_block):
+    # k 个向量（V 的 k 行，每行 n 个元素）一起乘 A，结果写入 R 的 k 行
+    _kernel_lib().pk_batched_matvec(n, k, a, lda, v, ldv, r, ldr, col_block, row_block)
+
+
+def batched_matvec_batch_timer():
+    # 返回 f(n, k, A_address, lda, V_address, ldv, R_address, ldr, col_block, row_block, batch) -> 总纳秒数
+    return _kernel_lib().pk_time_batched_matvec
+
+
+def gemm_kernel(name):
+    # 返回 f(n, A_address, lda, B_address, ldb, C_address, ldc, threads)，计算 C = A·B
+    lib = _kernel_lib()
+    kernel_id = gemm_kernels().index(name)
+    pk_gemm = lib.pk_gemm
+    return lambda n, a, lda, b, ldb, c, ldc, threads: pk_gemm(kernel_id, n, a, lda, b, ldb, c, ldc, threads)
+
+
+def gemm_batch_timer(name):
+    # 返回 f(n, A_address, lda, B_address, ldb, C_address, ldc, threads, batch) -> 总纳秒数
+    lib = _kernel_lib()
+    kernel_id = gemm_kernels().index(name)
+    pk_time_gemm = lib.pk_time_gemm
+    return lambda n, a, lda, b, ldb, c, ldc, threads, batch: pk_time_gemm(kernel_id, n, a, lda, b, ldb, c, ldc,
+                                                                          threads, batch)
+
+
+def set_gemm_tiles(mc, kc, nc):
+    # 设置 blocked / micro / parallel 矩阵乘的分块大小（A 块行数、公共维、B 块列数）
+    _kernel_lib().pk_set_gemm_tiles(mc, kc, nc)
+
+
+def set_pool_affinity(cpus):
+    # 共享线程池的 t 号线程绑定到 cpus[t % len(cpus)]；空列表表示不绑核。下次调用多线程内核时生效
+    cpus = list(cpus)
+    _kernel_lib().pk_set_pool_affinity((ctypes.c_int * len(cpus))(*cpus), len(cpus))
+
+
+def first_touch_columns(address, n, lda, threads):
+    # 按多线程矩阵向量的列划分，由各线程先写一遍自己的条带（NUMA 首次访问分配）
+    _kernel_lib().pk_first_touch_columns(address, n, lda, threads)
+
+
+def parallel_matvec(n, a, lda, v, result, threads, col_block, row_block):
+    # 每个线程负责 result 中连续的一段列，段内用 tiled 内核
+    _kernel_lib().pk_parallel_matvec(n, a, lda, v, result, threads, col_block, row_block)
+
+
+def parallel_matvec_batch_timer():
+    # 返回 f(n, A_address, lda, v_address, result_address, threads, col_block, row_block, batch) -> 总纳秒数
+    return _kernel_lib().pk_time_parallel_matvec
+
+
+def release_pools():
+    # 回收 C++ 侧的线程池，下次调用多线程内核时重新创建线程
+    _kernel_lib().pk_release_pools()
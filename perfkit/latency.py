@@ -0,0 +1,124 @@
+import ctypes
+import argparse
+import statistics
+
+import numpy as np
+
+from perfkit import planner, topology
+from perfkit.native_lib import load_library
+
+# 随机指针追逐测量各级缓存 / 内存的加载延迟
+# 每个缓存行放一个节点，节点按随机排列连成一个环：下一次加载的地址取决于这一次的结果，
+# 硬件预取猜不到、乱序执行也无法重叠，每步的耗时就是工作集所在层级的加载延迟
+# （大工作集还包含 TLB 未命中）。工作集从 4KB 扫到 1GB，每级缓存取其容量区间中段的中位数作为平台值，
+# 连同整条曲线写进拓扑记录的 latency 字段，perfkit.costmodel 据此判断一段曲线是受延迟还是受带宽限制。
+
+MIN_BYTES = 4 * 1024
+MAX_BYTES = 1024 ** 3
+POINTS_PER_OCTAVE = 2
+
+_lib = None
+
+
+def _chase_lib():
+    global _lib
+    if _lib is None:
+        lib = load_library()
+        lib.pk_pointer_chase.argtypes = [ctypes.c_void_p, ctypes.c_size_t]
+        lib.pk_pointer_chase.restype = ctypes.c_double
+        _lib = lib
+    return _lib
+
+
+def default_sizes(min_bytes=MIN_BYTES, max_bytes=MAX_BYTES):
+    octaves = np.log2(max_bytes / min_bytes)
+    return planner.log_spaced(min_bytes, max_bytes, int(round(octaves * POINTS_PER_OCTAVE)) + 1)
+
+
+def chase_buffer(nbytes, line_size=64, seed=0):
+    # 返回 uint64 数组，next[i] 为下一个节点的下标；节点位于每个缓存行的开头，从下标 0 出发走遍所有节点
+    stride = line_size // 8
+    lines = max(2, nbytes // line_size)
+    order = np.random.default_rng(seed).permutation(lines).astype(np.uint64) * stride
+    buffer = np.zeros(lines * stride, dtype=np.uint64)
+    buffer[order] = np.roll(order, -1)
+    return buffer
+
+
+def measure(sizes, repeats=5, min_steps=100000, line_size=64, seed=0):
+    lib = _chase_lib()
+    rows = []
+    for nbytes in sizes:
+        buffer = chase_buffer(nbytes, line_size, seed)
+        address = buffer.ctypes.data
+        # 每次都从下标 0 出发，步数不少于节点数才能走遍整个工作集，否则只测到环的前一小段；
+        # 先完整走一圈预热
+        nodes = len(buffer) * 8 // line_size
+        steps = max(min_steps, nodes)
+        lib.pk_pointer_chase(address, nodes)
+        times_ns = [lib.pk_pointer_chase(address, steps) / steps for _ in range(repeats)]
+        rows.append({
+            'bytes': int(nbytes),
+            'steps': steps,
+            'ns_per_load': statistics.median(times_ns),
+            'min_ns_per_load': min(times_ns),
+        })
+        print(f"  {topology.format_size(nbytes):>10}: {rows[-1]['ns_per_load']:.2f} ns/load")
+        del buffer
+    return rows
+
+
+def plateaus(rows, topo):
+    # 每级缓存取 (2 × 上一级容量, 本级容量 / 2] 内各点的中位数，避开容量边界附近的过渡段；
+    # 区间内没有点时放宽到 (上一级容量, 本级容量]。内存层取超过最后一级缓存 2 倍的点
+    result = {}
+    lower = 0
+    for level, capacity in sorted(topology.cache_sizes(topo).items()):
+        values = [row['ns_per_load'] for row in rows if 2 * lower < row['bytes'] <= capacity / 2]
+        values = values or [row['ns_per_load'] for row in rows if lower < row['bytes'] <= capacity]
+        if values:
+            result[level] = statistics.median(values)
+        lower = capacity
+    values = ([row['ns_per_load'] for row in rows if row['bytes'] > 2 * lower]
+              or [row['ns_per_load'] for row in rows if row['bytes'] > lower])
+    if values:
+        result['DRAM'] = statistics.median(values)
+    return result
+
+
+def attach(topo, rows, line_size=64):
+    # 把测量结果写进拓扑记录
+    topo['latency'] = {
+        'line_size': line_size,
+        'curve': [[row['bytes'], row['ns_per_load']] for row in rows],
+        'plateau_ns': plateaus(rows, topo),
+    }
+    return topo
+
+
+def main():
+    parser = argparse.ArgumentParser(description='随机指针追逐测量各级缓存和内存的加载延迟，并保存到拓扑记录中')
+    parser.add_argument('--for', dest='data_file', default=None, help='保存到该数据文件的拓扑记录（<文件名>.topology.json）')
+    parser.add_argument('-o', '--output', default=None, help='直接指定输出的拓扑 JSON 文件')
+    parser.add_argument('--cpu', type=int, default=None, help='读取哪个 CPU 的缓存信息，默认当前进程可用的第一个')
+    parser.add_argument('--min-bytes', type=int, default=MIN_BYTES, help='最小工作集（字节）')
+    parser.add_argument('--max-bytes', type=int, default=MAX_BYTES, help='最大工作集（字节）')
+    parser.add_argument('-r', '--repeats', type=int, default=5, help='每个工作集的重复次数')
+    args = parser.parse_args()
+
+    topo = topology.detect(args.cpu)
+    print(topology.describe(topo))
+    line_size = next((cache['line_size'] for cache in topo['caches'] if cache['line_size']), 64)
+    rows = measure(default_sizes(args.min_bytes, args.max_bytes), args.repeats, line_size=line_size)
+    attach(topo, rows, line_size)
+    for level, value in topology.latencies(topo).items():
+        print(f"{level:>4}: {value:.2f} ns")
+
+    output = args.output or (topology.topology_path(args.data_file) if args.data_file else None)
+    if output:
+        topology.save(topo, output)
+        print(f"✅ 拓扑和延迟已保存到 {output}")
+
+
+if __name__ == '__main__':
+    main()
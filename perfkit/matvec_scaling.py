@@ -0,0 +1,127 @@
+import sys
+import json
+import argparse
+
+import numpy as np
+
+from perfkit import ingest, tiling, topology
+from perfkit.gemm import max_relative_error, verify
+from perfkit.harness import time_batched, summarize
+from perfkit.kernels import (aligned_matrix, buffer_address, first_touch_columns, parallel_matvec,
+                             parallel_matvec_batch_timer, release_pools, set_pool_affinity)
+from perfkit.orchestrator import default_cpus, physical_cores, numa_spread
+from perfkit.scaling import default_thread_counts, fit_amdahl
+
+# 多线程矩阵向量乘的线程数 × 规模扫描
+# 每个线程负责 result 中连续的一段列（A 的一个列条带），段内用单线程的 tiled 内核，线程之间没有写冲突。
+# 绑核方式: numa 按 NUMA 节点轮流分配物理核心（线程少时也分散到每个节点的内存通道），
+# compact 按编号顺序使用物理核心，none 不绑核。每个线程数都重新分配矩阵并由各线程首次写入自己的条带，
+# 页面落在读取它的线程所在的节点上。报告 GB/s（只计矩阵 A 的流量）、相对单线程的加速比和并行效率；
+# 给出 perfkit.roofline 的上限 JSON 时，再给出相对实测最高内存带宽（全部线程数中的最大值）的比例。
+# 结果与 numpy 不一致（误差超过 perfkit.gemm 的容差）的行标记为未通过，命令行最后以非零状态退出。
+
+# matrix/perf_results 中的大规模区间
+DEFAULT_SIZES = [3000, 5000, 7000, 9000]
+PIN_MODES = ('numa', 'compact', 'none')
+
+
+def pin_order(mode):
+    cpus = physical_cores(default_cpus())
+    if mode == 'numa':
+        return numa_spread(cpus)
+    if mode == 'compact':
+        return cpus
+    return []
+
+
+def sweep(sizes, thread_counts, tile, pin='numa', repeats=5, min_sample_ns=1e6, seed=0):
+    col_block, row_block = tile
+    timer = parallel_matvec_batch_timer()
+    set_pool_affinity(pin_order(pin))
+    rows = []
+    try:
+        for size in sizes:
+            rng = np.random.default_rng((seed, size))
+            values = rng.random((size, size))
+            vector = rng.random(size)
+            result = np.zeros(size)
+            expected = values.T @ vector
+            for threads in thread_counts:
+                matrix, lda = aligned_matrix(size)
+                first_touch_columns(buffer_address(matrix), size, lda, threads)
+                matrix[:, :size] = values
+                addresses = (buffer_address(matrix), lda, buffer_address(vector), buffer_address(result))
+                parallel_matvec(size, *addresses, threads, col_block, row_block)
+                row = {'size': size, 'threads': threads, 'pin': pin, 'col_block': col_block, 'row_block': row_block,
+                       'max_relative_error': max_relative_error(result, expected)}
+                verify(row, size, f'p={threads}')
+                row.update(summarize(*time_batched(
+                    lambda batch: timer(size, *addresses, threads, col_block, row_block, batch),
+                    repeats, min_sample_ns)))
+                row['gbps'] = size * size * 8 / row['median_ns']
+                rows.append(row)
+                print(f"n={size:<6} p={threads:<3} 中位数 {row['median_ns'] / 1e6:.2f} ms, {row['gbps']:.2f} GB/s")
+                del matrix
+    finally:
+        release_pools()
+        set_pool_affinity([])
+
+    base = {row['size']: row['median_ns'] for row in rows if row['threads'] == 1}
+    for row in rows:
+        row['speedup'] = base[row['size']] / row['median_ns']
+        row['efficiency'] = row['speedup'] / row['threads']
+    return rows
+
+
+def peak_bandwidth(results, stream_kernel='read'):
+    # perfkit.roofline 测得的内存层带宽，取所有线程数中的最大值
+    return max(row['gbps'] for row in results['bandwidth']
+               if row['level'] == 'DRAM' and row['kernel'] == stream_kernel)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='多线程矩阵向量乘的线程数 × 规模扫描，报告带宽和并行效率')
+    parser.add_argument('--sizes', default=None, help='逗号分隔的矩阵边长，默认 3000,5000,7000,9000')
+    parser.add_argument('--threads', default=None, help='逗号分隔的线程数，默认 1,2,4,... 直到物理核心数')
+    parser.add_argument('--pin', choices=PIN_MODES, default='numa', help='绑核方式')
+    parser.add_argument('--tiles', default=None, help='每个线程内 tiled 内核的分块，如 1024x4，默认按本机缓存推出')
+    parser.add_argument('-r', '--repeats', type=int, default=5, help='每个数据点的重复次数')
+    parser.add_argument('--min-sample-us', type=float, default=1000.0, help='每个样本的最短时长（微秒）')
+    parser.add_argument('--ceilings', default=None, help='perfkit.roofline 的上限 JSON，用于给出达到内存带宽的比例')
+    parser.add_argument('-o', '--output', default='matvec_scaling.csv', help='输出 CSV 文件')
+    args = parser.parse_args()
+
+    thread_counts = [int(item) for item in args.threads.split(',')] if args.threads else default_thread_counts()
+    if 1 not in thread_counts:
+        thread_counts.insert(0, 1)
+    sizes = [int(size) for size in args.sizes.split(',') if size] if args.sizes else DEFAULT_SIZES
+    tile = tiling.parse_tiles(args.tiles)[0] if args.tiles else tiling.matvec_tiles(topology.detect())
+
+    rows = sweep(sizes, thread_counts, tile, args.pin, args.repeats, args.min_sample_us * 1e3)
+
+    for size in sizes:
+        serial = fit_amdahl([(row['threads'], row['speedup']) for row in rows if row['size'] == size])
+        if serial is not None:
+            print(f"Amdahl n={size:<6} 串行比例 s={serial:.3f}")
+
+    if args.ceilings:
+        with open(args.ceilings, encoding='utf-8') as file:
+            ceiling = peak_bandwidth(json.load(file))
+        for row in rows:
+            row['fraction_of_peak_bandwidth'] = row['gbps'] / ceiling
+        best = max((row for row in rows if row['verified']), key=lambda row: row['gbps'], default=None)
+        if best:
+            print(f"实测最高内存带宽 {ceiling:.2f} GB/s，矩阵向量最高 {best['gbps']:.2f} GB/s"
+                  f"（n={best['size']} p={best['threads']}，{best['fraction_of_peak_bandwidth']:.0%}）")
+
+    ingest.save_to_csv(rows, args.output, ingest.table_fields(rows, leading=('size', 'threads', 'pin')))
+    topology.record(args.output)
+    print(f"✅ 共 {len(rows)} 个数据点，已保存到 {args.output}")
+    failed = [row for row in rows if not row['verified']]
+    if failed:
+        print(f"❌ {len(failed)} 个数据点的结果与 numpy 不一致")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,303 @@
+// 稠密矩阵乘 C = A·B（n×n，行主序，行跨度分别为 lda / ldb / ldc）
+// naive:       ijk 三重循环，内层按列读 B，跨度 ldb
+// interchanged: ikj，内层按行读 B、写 C（与 cache_friendly_column_dot 相同的换序）
+// blocked:     按 (MC, KC, NC) 分块的 ikj，每块的 B 留在缓存里被 A 的多行复用
+// micro:       分块 + 打包 + 寄存器微内核：A 块按 MR 行、B 块按 NR 列打包成连续的面板，
+//              微内核把 MR×NR 的 C 块放在寄存器里，每读一次 A / B 做 MR×NR 次乘加
+// parallel:    micro 按 C 的行分给各线程，每个线程打包自己的 A / B 块，线程之间不写同一行
+#include "kernels.h"
+#include "thread_pool.h"
+#include "timing.h"
+#include <algorithm>
+#include <cstdlib>
+#include <cstring>
+
+#if defined(__x86_64__) || defined(__i386__)
+#include <immintrin.h>
+#define PERFKIT_X86 1
+#endif
+
+// 微内核的 C 块大小
+constexpr int MR = 6;
+constexpr int NR = 8;
+
+struct GemmTiles {
+    int mc;
+    int kc;
+    int nc;
+};
+
+// 分块大小由 pk_set_gemm_tiles 设置（perfkit.tiling 按本机缓存推出）
+static GemmTiles gemm_tiles = {240, 256, 2048};
+
+static void gemm_naive(int n, const double* A, size_t lda, const double* B, size_t ldb, double* C, size_t ldc,
+                       int) {
+    for (int i = 0; i < n; ++i) {
+        for (int j = 0; j < n; ++j) {
+            double sum = 0.0;
+            for (int k = 0; k < n; ++k) {
+                sum += A[i * lda + k] * B[k * ldb + j];
+            }
+            C[i * ldc + j] = sum;
+        }
+    }
+}
+
+static void gemm_interchanged(int n, const double* A, size_t lda, const double* B, size_t ldb, double* C,
+                              size_t ldc, int) {
+    for (int i = 0; i < n; ++i) {
+        double* __restrict c = C + i * ldc;
+        std::memset(c, 0, n * sizeof(double));
+        for (int k = 0; k < n; ++k) {
+            const double aik = A[i * lda + k];
+            const double* __restrict b = B + k * ldb;
+            for (int j = 0; j < n; ++j) {
+                c[j] += aik * b[j];
+            }
+        }
+    }
+}
+
+static void gemm_blocked(int n, const double* A, size_t lda, const double* B, size_t ldb, double* C, size_t ldc,
+                         int) {
+    const GemmTiles tiles = gemm_tiles;
+    for (int i = 0; i < n; ++i) {
+        std::memset(C + i * ldc, 0, n * sizeof(double));
+    }
+    for (int jc = 0; jc < n; jc += tiles.nc) {
+        const int je = std::min(n, jc + tiles.nc);
+        for (int pc = 0; pc < n; pc += tiles.kc) {
+            const int pe = std::min(n, pc + tiles.kc);
+            for (int ic = 0; ic < n; ic += tiles.mc) {
+                const int ie = std::min(n, ic + tiles.mc);
+                for (int i = ic; i < ie; ++i) {
+                    double* __restrict c = C + i * ldc;
+                    for (int k = pc; k < pe; ++k) {
+                        const double aik = A[i * lda + k];
+                        const double* __restrict b = B + k * ldb;
+                        for (int j = jc; j < je; ++j) {
+                            c[j] += aik * b[j];
+                        }
+                    }
+                }
+            }
+        }
+    }
+}
+
+// 把 A[0:mc, 0:kc] 打包成 MR 行一组的面板：面板内按 k 排列，每个 k 连续存 MR 个元素，不足 MR 行补 0
+static void pack_a(int mc, int kc, const double* A, size_t lda, double* packed) {
+    for (int ir = 0; ir < mc; ir += MR) {
+        const int rows = std::min(MR, mc - ir);
+        for (int p = 0; p < kc; ++p) {
+            for (int r = 0; r < MR; ++r) {
+                *packed++ = r < rows ? A[(ir + r) * lda + p] : 0.0;
+            }
+        }
+    }
+}
+
+// 把 B[0:kc, 0:nc] 打包成 NR 列一组的面板：面板内按 k 排列，每个 k 连续存 NR 个元素，不足 NR 列补 0
+static void pack_b(int kc, int nc, const double* B, size_t ldb, double* packed) {
+    for (int jr = 0; jr < nc; jr += NR) {
+        const int cols = std::min(NR, nc - jr);
+        for (int p = 0; p < kc; ++p) {
+            const double* b = B + p * ldb + jr;
+            for (int c = 0; c < NR; ++c) {
+                *packed++ = c < cols ? b[c] : 0.0;
+            }
+        }
+    }
+}
+
+// 微内核：out[MR][NR] = Ap·Bp（kc 步），MR×NR 的累加器放在寄存器里，调用方再把 out 加到 C 上。
+// 与 simd_sum.cpp 一样按 CPU 支持的指令集选择版本：AVX-512 每行一个 zmm，AVX2+FMA 每行两个 ymm（12 个累加器），
+// 基线版本用 16 字节向量分两遍各算 4 列（每遍 12 个 xmm 累加器）
+typedef double v2d __attribute__((vector_size(16)));
+typedef void (*MicroKernel)(int, const double*, const double*, double*);
+
+static void micro_kernel_baseline(int kc, const double* __restrict a, const double* __restrict b,
+                                  double* __restrict out) {
+    for (int half = 0; half < NR; half += 4) {
+        v2d acc[MR][2] = {};
+        for (int p = 0; p < kc; ++p) {
+            v2d b0, b1;
+            std::memcpy(&b0, b + p * NR + half, sizeof(v2d));
+            std::memcpy(&b1, b + p * NR + half + 2, sizeof(v2d));
+            #pragma GCC unroll 6
+            for (int r = 0; r < MR; ++r) {
+                const double ar = a[p * MR + r];
+                const v2d av = {ar, ar};
+                acc[r][0] += av * b0;
+                acc[r][1] += av * b1;
+            }
+        }
+        for (int r = 0; r < MR; ++r) {
+            std::memcpy(out + r * NR + half, acc[r], sizeof(acc[r]));
+        }
+    }
+}
+
+#ifdef PERFKIT_X86
+
+__attribute__((target("avx2,fma")))
+static void micro_kernel_avx2(int kc, const double* __restrict a, const double* __restrict b,
+                              double* __restrict out) {
+    __m256d acc[MR][2];
+    for (int r = 0; r < MR; ++r) {
+        acc[r][0] = _mm256_setzero_pd();
+        acc[r][1] = _mm256_setzero_pd();
+    }
+    for (int p = 0; p < kc; ++p) {
+        const __m256d b0 = _mm256_load_pd(b + p * NR);
+        const __m256d b1 = _mm256_load_pd(b + p * NR + 4);
+        #pragma GCC unroll 6
+        for (int r = 0; r < MR; ++r) {
+            const __m256d av = _mm256_broadcast_sd(a + p * MR + r);
+            acc[r][0] = _mm256_fmadd_pd(av, b0, acc[r][0]);
+            acc[r][1] = _mm256_fmadd_pd(av, b1, acc[r][1]);
+        }
+    }
+    for (int r = 0; r < MR; ++r) {
+        _mm256_storeu_pd(out + r * NR, acc[r][0]);
+        _mm256_storeu_pd(out + r * NR + 4, acc[r][1]);
+    }
+}
+
+__attribute__((target("avx512f")))
+static void micro_kernel_avx512(int kc, const double* __restrict a, const double* __restrict b,
+                                double* __restrict out) {
+    __m512d acc[MR];
+    for (int r = 0; r < MR; ++r) {
+        acc[r] = _mm512_setzero_pd();
+    }
+    for (int p = 0; p < kc; ++p) {
+        const __m512d bv = _mm512_load_pd(b + p * NR);
+        #pragma GCC unroll 6
+        for (int r = 0; r < MR; ++r) {
+            acc[r] = _mm512_fmadd_pd(_mm512_set1_pd(a[p * MR + r]), bv, acc[r]);
+        }
+    }
+    for (int r = 0; r < MR; ++r) {
+        _mm512_storeu_pd(out + r * NR, acc[r]);
+    }
+}
+
+static MicroKernel pick_micro_kernel() {
+    const char* isa = simd_isa();
+    if (std::strcmp(isa, "avx512") == 0) {
+        return micro_kernel_avx512;
+    }
+    // simd_isa 的 avx2 不检查 FMA，这里单独确认
+    if (std::strcmp(isa, "avx2") == 0 && __builtin_cpu_supports("fma")) {
+        return micro_kernel_avx2;
+    }
+    return micro_kernel_baseline;
+}
+
+#else
+
+static MicroKernel pick_micro_kernel() {
+    return micro_kernel_baseline;
+}
+
+#endif
+
+// C[0:rows, 0:cols] += Ap·Bp，rows ≤ MR，cols ≤ NR
+static void micro_tile(int kc, const double* a, const double* b, double* C, size_t ldc, int rows, int cols) {
+    static const MicroKernel kernel = pick_micro_kernel();
+    alignas(64) double out[MR * NR];
+    kernel(kc, a, b, out);
+    for (int r = 0; r < rows; ++r) {
+        double* c = C + r * ldc;
+        for (int j = 0; j < cols; ++j) {
+            c[j] += out[r * NR + j];
+        }
+    }
+}
+
+// 计算 C 的第 [row_begin, row_end) 行
+static void gemm_micro_rows(int n, int row_begin, int row_end, const double* A, size_t lda, const double* B,
+                            size_t ldb, double* C, size_t ldc) {
+    const GemmTiles tiles = gemm_tiles;
+    const int mc_max = (tiles.mc + MR - 1) / MR * MR;
+    const int nc_max = (tiles.nc + NR - 1) / NR * NR;
+    double* packed_a = static_cast<double*>(std::aligned_alloc(64, (size_t(mc_max) * tiles.kc * 8 + 63) / 64 * 64));
+    double* packed_b = static_cast<double*>(std::aligned_alloc(64, (size_t(nc_max) * tiles.kc * 8 + 63) / 64 * 64));
+
+    for (int i = row_begin; i < row_end; ++i) {
+        std::memset(C + i * ldc, 0, n * sizeof(double));
+    }
+    for (int jc = 0; jc < n; jc += tiles.nc) {
+        const int nc = std::min(tiles.nc, n - jc);
+        for (int pc = 0; pc < n; pc += tiles.kc) {
+            const int kc = std::min(tiles.kc, n - pc);
+            pack_b(kc, nc, B + pc * ldb + jc, ldb, packed_b);
+            for (int ic = row_begin; ic < row_end; ic += tiles.mc) {
+                const int mc = std::min(tiles.mc, row_end - ic);
+                pack_a(mc, kc, A + ic * lda + pc, lda, packed_a);
+                for (int jr = 0; jr < nc; jr += NR) {
+                    for (int ir = 0; ir < mc; ir += MR) {
+                        micro_tile(kc, packed_a + ir * kc, packed_b + jr * kc, C + (ic + ir) * ldc + jc + jr, ldc,
+                                     std::min(MR, mc - ir), std::min(NR, nc - jr));
+                    }
+                }
+            }
+        }
+    }
+    std::free(packed_a);
+    std::free(packed_b);
+}
+
+static void gemm_micro(int n, const double* A, size_t lda, const double* B, size_t ldb, double* C, size_t ldc,
+                       int) {
+    gemm_micro_rows(n, 0, n, A, lda, B, ldb, C, ldc);
+}
+
+// 行按 MR 的整数倍分给各线程
+static void gemm_parallel(int n, const double* A, size_t lda, const double* B, size_t ldb, double* C, size_t ldc,
+                          int threads) {
+    ThreadPool& pool = shared_pool(threads);
+    pool.run([&](int t) {
+        const int chunk = (n / threads + MR - 1) / MR * MR;
+        const int begin = std::min(n, chunk * t);
+        const int end = t == threads - 1 ? n : std::min(n, begin + chunk);
+        if (begin < end) {
+            gemm_micro_rows(n, begin, end, A, lda, B, ldb, C, ldc);
+        }
+    });
+}
+
+typedef void (*GemmKernel)(int, const double*, size_t, const double*, size_t, double*, size_t, int);
+
+static const char* GEMM_NAMES[] = {"naive", "interchanged", "blocked", "micro", "parallel"};
+static const GemmKernel GEMM_KERNELS[] = {gemm_naive, gemm_interchanged, gemm_blocked, gemm_micro, gemm_parallel};
+// 是否使用 threads 参数
+static const int GEMM_THREADED[] = {0, 0, 0, 0, 1};
+
+extern "C" {
+
+int pk_gemm_kernel_count() { return sizeof(GEMM_KERNELS) / sizeof(GEMM_KERNELS[0]); }
+const char* pk_gemm_kernel_name(int id) { return GEMM_NAMES[id]; }
+int pk_gemm_kernel_threaded(int id) { return GEMM_THREADED[id]; }
+
+void pk_set_gemm_tiles(int mc, int kc, int nc) {
+    gemm_tiles = {std::max(MR, mc), std::max(1, kc), std::max(NR, nc)};
+}
+
+void pk_gemm(int id, int n, const double* A, size_t lda, const double* B, size_t ldb, double* C, size_t ldc,
+             int threads) {
+    GEMM_KERNELS[id](n, A, lda, B, ldb, C, ldc, threads);
+}
+
+// 连续调用 batch 次，返回总纳秒数；多线程内核的线程池在计时前建好
+double pk_time_gemm(int id, int n, const double* A, size_t lda, const double* B, size_t ldb, double* C,
+                    size_t ldc, int threads, size_t batch) {
+    GemmKernel kernel = GEMM_KERNELS[id];
+    if (GEMM_THREADED[id]) {
+        shared_pool(threads);
+    }
+    return time_batch([&]() { kernel(n, A, lda, B, ldb, C, ldc, threads); }, batch);
+}
+
+}
@@ -0,0 +1,411 @@
+// 被测内核及其 C 接口，编译进 libperfkit.so 供 perfkit/kernels.py 调用
+#include "kernels.h"
+#include "timing.h"
+
+#include <algorithm>
+#include <cstring>
+
+// 平凡算法（链式）：逐个累加
+double naive_sum(const double* numbers, size_t size) {
+    double sum = 0.0;
+    for (size_t i = 0; i < size; ++i) {
+        sum += numbers[i];
+    }
+    return sum;
+}
+
+// 两路链式累加，减少指令依赖
+double two_way_sum(const double* numbers, size_t size) {
+    double sum1 = 0.0;
+    double sum2 = 0.0;
+
+    size_t i = 0;
+    for (; i + 1 < size; i += 2) {
+        sum1 += numbers[i];
+        sum2 += numbers[i + 1];
+    }
+    if (i < size) {
+        sum1 += numbers[i];
+    }
+    return sum1 + sum2;
+}
+
+// 递归两两相加
+static double recursive_sum_helper(const double* numbers, size_t start, size_t end) {
+    if (start > end) {
+        return 0.0;
+    }
+    if (start == end) {
+        return numbers[start];
+    }
+    if (start + 1 == end) {
+        return numbers[start] + numbers[end];
+    }
+
+    size_t mid = start + (end - start) / 2;
+    return recursive_sum_helper(numbers, start, mid) +
+           recursive_sum_helper(numbers, mid + 1, end);
+}
+
+double recursive_sum(const double* numbers, size_t size) {
+    if (size == 0) {
+        return 0.0;
+    }
+    return recursive_sum_helper(numbers, 0, size - 1);
+}
+
+// 原地两两相加（会改写 data）
+double in_place_pairwise_sum(double* data, size_t size) {
+    if (size == 0) {
+        return 0.0;
+    }
+
+    size_t n = size;
+    while (n > 1) {
+        size_t j = 0;
+        size_t i = 0;
+        for (; i + 1 < n; i += 2, ++j) {
+            data[j] = data[i] + data[i + 1];
+        }
+        if (n % 2 == 1) {
+            data[j++] = data[n - 1]; // 处理奇数
+        }
+        n = j;
+    }
+    return data[0];
+}
+
+// 循环展开（展开4次）
+double unrolled_sum4(const double* numbers, size_t size) {
+    double sum0 = 0.0, sum1 = 0.0, sum2 = 0.0, sum3 = 0.0;
+    const double* ptr = numbers;
+    const double* end = ptr + size;
+
+    for (; ptr + 3 < end; ptr += 4) {
+        sum0 += ptr[0];
+        sum1 += ptr[1];
+        sum2 += ptr[2];
+        sum3 += ptr[3];
+    }
+
+    double sum = sum0 + sum1 + sum2 + sum3;
+    for (; ptr < end; ++ptr) {
+        sum += *ptr;
+    }
+    return sum;
+}
+
+// 8路展开 + 缓存分块
+double unrolled_sum(const double* numbers, size_t size) {
+    if (size <= 16) {
+        double sum = 0.0;
+        for (size_t i = 0; i < size; ++i) {
+            sum += numbers[i];
+        }
+        return sum;
+    }
+
+    const size_t BLOCK_SIZE = 8192; // 约64KB
+    const size_t num_blocks = (size + BLOCK_SIZE - 1) / BLOCK_SIZE;
+    double total_sum = 0.0;
+
+    for (size_t block = 0; block < num_blocks; ++block) {
+        const size_t block_start = block * BLOCK_SIZE;
+        const size_t block_end = std::min(block_start + BLOCK_SIZE, size);
+
+        double sum0 = 0.0, sum1 = 0.0, sum2 = 0.0, sum3 = 0.0;
+        double sum4 = 0.0, sum5 = 0.0, sum6 = 0.0, sum7 = 0.0;
+
+        size_t i = block_start;
+        #pragma GCC ivdep
+        for (; i + 7 < block_end; i += 8) {
+            sum0 += numbers[i];
+            sum1 += numbers[i+1];
+            sum2 += numbers[i+2];
+            sum3 += numbers[i+3];
+            sum4 += numbers[i+4];
+            sum5 += numbers[i+5];
+            sum6 += numbers[i+6];
+            sum7 += numbers[i+7];
+        }
+        for (; i < block_end; ++i) {
+            sum0 += numbers[i];
+        }
+        total_sum += (sum0 + sum1) + (sum2 + sum3) + (sum4 + sum5) + (sum6 + sum7);
+    }
+    return total_sum;
+}
+
+// 朴素列点积：按列访问 A，跨度为 lda
+void naive_column_dot(int n, const double* A, size_t lda, const double* v, double* result) {
+    std::memset(result, 0, n * sizeof(double));
+    for (int j = 0; j < n; ++j) {
+        for (int i = 0; i < n; ++i) {
+            result[j] += A[i * lda + j] * v[i];
+        }
+    }
+}
+
+// 缓存友好：按行访问 A
+void cache_friendly_column_dot(int n, const double* A, size_t lda, const double* v, double* result) {
+    std::memset(result, 0, n * sizeof(double));
+    for (int i = 0; i < n; ++i) {
+        const double vi = v[i];
+        const double* row = A + i * lda;
+        for (int j = 0; j < n; ++j) {
+            result[j] += row[j] * vi;
+        }
+    }
+}
+
+// 分块：列方向每次处理 col_block 个 result 元素，这一段在整个块内留在 L1；
+// 行方向每次取 ROWS 行，result[j] 每读写一次累加 ROWS 个乘积，读写 result 的次数减少到 1/ROWS
+template <int ROWS>
+static void tiled_column_dot_rows(int rows, int cols, const double* A, size_t lda, const double* v,
+                                  double* __restrict result, int col_block) {
+    std::memset(result, 0, cols * sizeof(double));
+    for (int jb = 0; jb < cols; jb += col_block) {
+        const int je = std::min(cols, jb + col_block);
+        int i = 0;
+        for (; i + ROWS <= rows; i += ROWS) {
+            const double* __restrict row[ROWS];
+            double vs[ROWS];
+            for (int r = 0; r < ROWS; ++r) {
+                row[r] = A + (i + r) * lda;
+                vs[r] = v[i + r];
+            }
+            for (int j = jb; j < je; ++j) {
+                double acc = result[j];
+                for (int r = 0; r < ROWS; ++r) {
+                    acc += row[r][j] * vs[r];
+                }
+                result[j] = acc;
+            }
+        }
+        // 不足 ROWS 的剩余行
+        for (; i < rows; ++i) {
+            const double* __restrict last = A + i * lda;
+            const double vi = v[i];
+            for (int j = jb; j < je; ++j) {
+                result[j] += last[j] * vi;
+            }
+        }
+    }
+}
+
+// rows×cols 的子矩阵（A 指向其左上角）：result[j] = Σ_i A[i][j] v[i]，j < cols。
+// row_block 取 1 / 2 / 4 / 8，其他值向下取到最近的一个
+void tiled_column_dot_block(int rows, int cols, const double* A, size_t lda, const double* v, double* result,
+                            int col_block, int row_block) {
+    col_block = col_block > 0 ? col_block : cols;
+    if (row_block >= 8) {
+        tiled_column_dot_rows<8>(rows, cols, A, lda, v, result, col_block);
+    } else if (row_block >= 4) {
+        tiled_column_dot_rows<4>(rows, cols, A, lda, v, result, col_block);
+    } else if (row_block >= 2) {
+        tiled_column_dot_rows<2>(rows, cols, A, lda, v, result, col_block);
+    } else {
+        tiled_column_dot_rows<1>(rows, cols, A, lda, v, result, col_block);
+    }
+}
+
+void tiled_column_dot(int n, const double* A, size_t lda, const double* v, double* result,
+                      int col_block, int row_block) {
+    tiled_column_dot_block(n, n, A, lda, v, result, col_block, row_block);
+}
+
+// 批量矩阵向量：k 个向量一起乘同一个 A，R[c][j] = Σ_i A[i][j] V[c][i]。
+// V、R 各有 k 行（每个向量连续存放，即列主序的 n×k 块），行跨度 ldv / ldr。
+// 分块方式与 tiled 相同，但每取一组 ROWS 行的 A 段后依次用于全部 k 个向量：
+// 这一段 A 从内存读一次、在 L1 里复用 k 次，A 的流量分摊到 k 个向量上。
+// 向量再按 BATCH_VECTORS 个一组，A 的每个元素载入寄存器后同时乘到一组向量上，减少 L1 的载入次数
+static constexpr int BATCH_VECTORS = 4;
+
+typedef double v2d __attribute__((vector_size(16)));
+
+template <int ROWS, int VECS>
+static void batched_column_dot_group(const double* const* row, const double* V, size_t ldv, int i, double* R,
+                                     size_t ldr, int jb, int je) {
+    double vs[VECS][ROWS];
+    v2d vv[VECS][ROWS];
+    double* out[VECS];
+    for (int c = 0; c < VECS; ++c) {
+        for (int r = 0; r < ROWS; ++r) {
+            vs[c][r] = V[c * ldv + i + r];
+            vv[c][r] = v2d{vs[c][r], vs[c][r]};
+        }
+        out[c] = R + c * ldr;
+    }
+    // 每次两列：ROWS 个 A 元素对载入寄存器后乘到 VECS 个向量上（基线 SSE2 构建下编译器不会自动向量化）
+    int j = jb;
+    for (; j + 2 <= je; j += 2) {
+        v2d a[ROWS];
+        #pragma GCC unroll 8
+        for (int r = 0; r < ROWS; ++r) {
+            std::memcpy(&a[r], row[r] + j, sizeof(v2d));
+        }
+        #pragma GCC unroll 4
+        for (int c = 0; c < VECS; ++c) {
+            v2d acc;
+            std::memcpy(&acc, out[c] + j, sizeof(v2d));
+            #pragma GCC unroll 8
+            for (int r = 0; r < ROWS; ++r) {
+                acc += a[r] * vv[c][r];
+            }
+            std::memcpy(out[c] + j, &acc, sizeof(v2d));
+        }
+    }
+    for (; j < je; ++j) {
+        for (int c = 0; c < VECS; ++c) {
+            double acc = out[c][j];
+            for (int r = 0; r < ROWS; ++r) {
+                acc += row[r][j] * vs[c][r];
+            }
+            out[c][j] = acc;
+        }
+    }
+}
+
+template <int ROWS>
+static void batched_column_dot_rows(int n, int k, const double* A, size_t lda, const double* V, size_t ldv,
+                                    double* R, size_t ldr, int col_block) {
+    for (int c = 0; c < k; ++c) {
+        std::memset(R + c * ldr, 0, n * sizeof(double));
+    }
+    for (int jb = 0; jb < n; jb += col_block) {
+        const int je = std::min(n, jb + col_block);
+        int i = 0;
+        for (; i + ROWS <= n; i += ROWS) {
+            const double* row[ROWS];
+            for (int r = 0; r < ROWS; ++r) {
+                row[r] = A + (i + r) * lda;
+            }
+            int c = 0;
+            for (; c + BATCH_VECTORS <= k; c += BATCH_VECTORS) {
+                batched_column_dot_group<ROWS, BATCH_VECTORS>(row, V + c * ldv, ldv, i, R + c * ldr, ldr, jb, je);
+            }
+            for (; c < k; ++c) {
+                batched_column_dot_group<ROWS, 1>(row, V + c * ldv, ldv, i, R + c * ldr, ldr, jb, je);
+            }
+        }
+        for (; i < n; ++i) {
+            const double* last = A + i * lda;
+            for (int c = 0; c < k; ++c) {
+                batched_column_dot_group<1, 1>(&last, V + c * ldv, ldv, i, R + c * ldr, ldr, jb, je);
+            }
+        }
+    }
+}
+
+void batched_column_dot(int n, int k, const double* A, size_t lda, const double* V, size_t ldv, double* R,
+                        size_t ldr, int col_block, int row_block) {
+    col_block = col_block > 0 ? col_block : n;
+    if (row_block >= 8) {
+        batched_column_dot_rows<8>(n, k, A, lda, V, ldv, R, ldr, col_block);
+    } else if (row_block >= 4) {
+        batched_column_dot_rows<4>(n, k, A, lda, V, ldv, R, ldr, col_block);
+    } else if (row_block >= 2) {
+        batched_column_dot_rows<2>(n, k, A, lda, V, ldv, R, ldr, col_block);
+    } else {
+        batched_column_dot_rows<1>(n, k, A, lda, V, ldv, R, ldr, col_block);
+    }
+}
+
+// 矩阵向量内核表中 tiled 使用的分块大小，由 pk_set_matvec_tiles 设置
+static int matvec_col_block = 1024;
+static int matvec_row_block = 4;
+
+static void tiled_column_dot_default(int n, const double* A, size_t lda, const double* v, double* result) {
+    tiled_column_dot(n, A, lda, v, result, matvec_col_block, matvec_row_block);
+}
+
+// ---- C 接口：按编号调用内核，编号顺序与 perfkit/kernels.py 中的名字表一致 ----
+
+typedef double (*SumKernel)(double*, size_t);
+typedef void (*MatvecKernel)(int, const double*, size_t, const double*, double*);
+
+static double call_naive(double* data, size_t size) { return naive_sum(data, size); }
+static double call_two_way(double* data, size_t size) { return two_way_sum(data, size); }
+static double call_recursive(double* data, size_t size) { return recursive_sum(data, size); }
+static double call_unrolled4(double* data, size_t size) { return unrolled_sum4(data, size); }
+static double call_unrolled8(double* data, size_t size) { return unrolled_sum(data, size); }
+
+static double call_simd4(double* data, size_t size) { return simd_sum4(data, size); }
+static double call_simd8(double* data, size_t size) { return simd_sum8(data, size); }
+static double call_avx2_4(double* data, size_t size) { return avx2_sum4(data, size); }
+static double call_avx2_8(double* data, size_t size) { return avx2_sum8(data, size); }
+static double call_avx512_4(double* data, size_t size) { return avx512_sum4(data, size); }
+static double call_avx512_8(double* data, size_t size) { return avx512_sum8(data, size); }
+
+static const char* SUM_NAMES[] = {
+    "naive", "two_way", "recursive", "in_place", "unrolled4", "unrolled8",
+    "simd4", "simd8", "avx2_4", "avx2_8", "avx512_4", "avx512_8",
+};
+static const SumKernel SUM_KERNELS[] = {
+    call_naive, call_two_way, call_recursive, in_place_pairwise_sum, call_unrolled4, call_unrolled8,
+    call_simd4, call_simd8, call_avx2_4, call_avx2_8, call_avx512_4, call_avx512_8,
+};
+// 内核需要的指令集，nullptr 表示不需要
+static const char* SUM_ISAS[] = {
+    nullptr, nullptr, nullptr, nullptr, nullptr, nullptr,
+    nullptr, nullptr, "avx2", "avx2", "avx512", "avx512",
+};
+
+static const char* MATVEC_NAMES[] = {"naive", "cache_friendly", "tiled"};
+static const MatvecKernel MATVEC_KERNELS[] = {naive_column_dot, cache_friendly_column_dot, tiled_column_dot_default};
+
+extern "C" {
+
+int pk_sum_kernel_count() { return sizeof(SUM_KERNELS) / sizeof(SUM_KERNELS[0]); }
+const char* pk_sum_kernel_name(int id) { return SUM_NAMES[id]; }
+// 本机是否支持该内核需要的指令集
+int pk_sum_kernel_supported(int id) { return !SUM_ISAS[id] || simd_isa_supported(SUM_ISAS[id]); }
+// simd4 / simd8 实际使用的指令集
+const char* pk_simd_isa() { return simd_isa(); }
+
+double pk_sum(int id, double* data, size_t size) {
+    return SUM_KERNELS[id](data, size);
+}
+
+int pk_matvec_kernel_count() { return sizeof(MATVEC_KERNELS) / sizeof(MATVEC_KERNELS[0]); }
+const char* pk_matvec_kernel_name(int id) { return MATVEC_NAMES[id]; }
+
+// tiled 内核的列分块（result 元素个数）和一次处理的行数
+void pk_set_matvec_tiles(int col_block, int row_block) {
+    matvec_col_block = col_block;
+    matvec_row_block = row_block;
+}
+
+void pk_matvec(int id, int n, const double* A, size_t lda, const double* v, double* result) {
+    MATVEC_KERNELS[id](n, A, lda, v, result);
+}
+
+// 连续调用 batch 次并在 C++ 内部计时（CLOCK_MONOTONIC_RAW），返回总纳秒数，
+// 不包含 ctypes 的调用开销。scratch 非空时每次调用前先把 data 复制过去（原地算法）
+double pk_time_sum(int id, double* data, double* scratch, size_t size, size_t batch) {
+    SumKernel kernel = SUM_KERNELS[id];
+    if (scratch) {
+        return time_batch([&]() {
+            std::memcpy(scratch, data, size * sizeof(double));
+            keep(kernel(scratch, size));
+        }, batch);
+    }
+    return time_batch([&]() { keep(kernel(data, size)); }, batch);
+}
+
+void pk_batched_matvec(int n, int k, const double* A, size_t lda, const double* V, size_t ldv, double* R,
+                       size_t ldr, int col_block, int row_block) {
+    batched_column_dot(n, k, A, lda, V, ldv, R, ldr, col_block, row_block);
+}
+
+double pk_time_batched_matvec(int n, int k, const double* A, size_t lda, const double* V, size_t ldv, double* R,
+                              size_t ldr, int col_block, int row_block, size_t batch) {
+    return time_batch([&]() { batched_column_dot(n, k, A, lda, V, ldv, R, ldr, col_block, row_block); }, batch);
+}
+
+double pk_time_matvec(int id, int n, const double* A, size_t lda, const double* v, double* result, size_t batch) {
+    MatvecKernel kernel = MATVEC_KERNELS[id];
+    return time_batch([&]() { kernel(n, A, lda, v, result); }, batch);
+}
+
+}
@@ -0,0 +1,33 @@
+#pragma once
+// add/ 和 matrix/ 中被测内核的共享库版本
+// 与 add/common.cpp、add/deep.cpp、matrix/common.cpp 中的实现保持一致，
+// 矩阵按行主序存储，lda 为行跨度（元素个数），可以直接传入 NumPy 数组的缓冲区。
+#include <cstddef>
+
+double naive_sum(const double* numbers, size_t size);
+double two_way_sum(const double* numbers, size_t size);
+double recursive_sum(const double* numbers, size_t size);
+double in_place_pairwise_sum(double* data, size_t size);
+double unrolled_sum4(const double* numbers, size_t size);
+double unrolled_sum(const double* numbers, size_t size);
+
+// 显式 SIMD 版本（simd_sum.cpp）；simd_sum4 / simd_sum8 在运行时选择本机支持的最宽指令集
+double avx2_sum4(const double* numbers, size_t size);
+double avx2_sum8(const double* numbers, size_t size);
+double avx512_sum4(const double* numbers, size_t size);
+double avx512_sum8(const double* numbers, size_t size);
+double simd_sum4(const double* numbers, size_t size);
+double simd_sum8(const double* numbers, size_t size);
+bool simd_isa_supported(const char* isa);  // "avx2" / "avx512" / "scalar"
+const char* simd_isa();
+
+void naive_column_dot(int n, const double* A, size_t lda, const double* v, double* result);
+void cache_friendly_column_dot(int n, const double* A, size_t lda, const double* v, double* result);
+// 按列分块、每次处理 row_block 行的版本；_block 版本作用于 rows×cols 的子矩阵
+void tiled_column_dot(int n, const double* A, size_t lda, const double* v, double* result,
+                      int col_block, int row_block);
+void tiled_column_dot_block(int rows, int cols, const double* A, size_t lda, const double* v, double* result,
+                            int col_block, int row_block);
+// 批量版本：k 个向量（V 的 k 行）共用每次读入的 A 段，结果写入 R 的 k 行
+void batched_column_dot(int n, int k, const double* A, size_t lda, const double* V, size_t ldv, double* R,
+                        size_t ldr, int col_block, int row_block);
@@ -0,0 +1,44 @@
+#pragma once
+// 堆上分配、64 字节对齐的矩阵和向量
+// 矩阵按行主序存储，行跨度 lda = n + padding（元素个数），随 n 变化，不再是固定的 MAXN：
+// 小矩阵的各行挨在一起，不会每行落在不同的页上。padding 用于错开 2 的幂行跨度造成的缓存组冲突。
+#include <cstdlib>
+#include <cstddef>
+#include <new>
+
+constexpr size_t STORAGE_ALIGNMENT = 64;
+
+// 分配 count 个 double，起始地址按缓存行对齐；用 std::free 释放
+inline double* aligned_doubles(size_t count) {
+    size_t bytes = (count * sizeof(double) + STORAGE_ALIGNMENT - 1) / STORAGE_ALIGNMENT * STORAGE_ALIGNMENT;
+    void* memory = std::aligned_alloc(STORAGE_ALIGNMENT, bytes ? bytes : STORAGE_ALIGNMENT);
+    if (!memory) {
+        throw std::bad_alloc();
+    }
+    return static_cast<double*>(memory);
+}
+
+struct AlignedVector {
+    double* data;
+
+    explicit AlignedVector(size_t size) : data(aligned_doubles(size)) {}
+    ~AlignedVector() { std::free(data); }
+    AlignedVector(const AlignedVector&) = delete;
+    AlignedVector& operator=(const AlignedVector&) = delete;
+
+    double& operator[](size_t i) { return data[i]; }
+};
+
+struct AlignedMatrix {
+    int n;
+    size_t lda;
+    double* data;
+
+    AlignedMatrix(int n, int padding = 0)
+        : n(n), lda(static_cast<size_t>(n) + padding), data(aligned_doubles(static_cast<size_t>(n) * lda)) {}
+    ~AlignedMatrix() { std::free(data); }
+    AlignedMatrix(const AlignedMatrix&) = delete;
+    AlignedMatrix& operator=(const AlignedMatrix&) = delete;
+
+    double* row(int i) { return data + i * lda; }
+};
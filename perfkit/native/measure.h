@@ -0,0 +1,118 @@
+#pragma once
+// 自适应重复测量
+// 不固定重复次数：持续重复同一个 (算法, 规模)，直到中位数的 95% 置信区间
+// 相对宽度不超过目标值，或者用完时间预算。小规模会重复成千上万次，大规模只需几次。
+// 单次调用可能短于时钟分辨率（gettimeofday 为 1us），此时每个样本会量化成 0 或 1 个刻度，
+// 中位数和置信区间都是 0，宽度检验立即通过。因此先把若干次调用合成一个不短于 min_sample_us 的样本，
+// 结果换算为每次调用的时间；中位数不超过时钟分辨率时不判定收敛。
+#include <algorithm>
+#include <cmath>
+#include <cstddef>
+#include <vector>
+
+struct MeasureOptions {
+    double rel_width = 0.02;     // 目标相对宽度: (ci_high - ci_low) / median
+    double budget_us = 2e6;      // 每个 (算法, 规模) 的时间预算（微秒）
+    size_t min_samples = 10;     // 至少重复的次数
+    size_t max_samples = 100000; // 最多重复的次数
+    double min_sample_us = 10.0; // 每个样本（一批调用）的最短时长（微秒）
+};
+
+struct MeasureResult {
+    double median;   // 中位数
+    double ci_low;   // 95% 置信区间下限
+    double ci_high;  // 95% 置信区间上限
+    size_t samples;  // 样本数
+    size_t batch;    // 每个样本包含的调用次数
+};
+
+// 中位数的无分布置信区间：取次序统计量，秩由二项分布的正态近似给出
+inline MeasureResult median_ci(std::vector<double> samples) {
+    MeasureResult result = {0.0, 0.0, 0.0, samples.size(), 1};
+    if (samples.empty()) {
+        return result;
+    }
+    std::sort(samples.begin(), samples.end());
+
+    const size_t n = samples.size();
+    const double half = 1.96 * std::sqrt(static_cast<double>(n)) / 2.0;
+    long lo = static_cast<long>(std::floor(n / 2.0 - half));        // 1 起始的秩
+    long hi = static_cast<long>(std::ceil(1.0 + n / 2.0 + half));
+    lo = std::max(1L, lo);
+    hi = std::min(static_cast<long>(n), hi);
+
+    result.median = (n % 2 == 1) ? samples[n / 2]
+                                 : (samples[n / 2 - 1] + samples[n / 2]) / 2.0;
+    result.ci_low = samples[lo - 1];
+    result.ci_high = samples[hi - 1];
+    return result;
+}
+
+// now_us 的分辨率（微秒）：连续读取直到数值变化，取几次中最小的跳变
+inline double clock_resolution_us(double (*now_us)()) {
+    double resolution = 0.0;
+    for (int trial = 0; trial < 5; ++trial) {
+        const double start = now_us();
+        double next = now_us();
+        while (next == start) {
+            next = now_us();
+        }
+        if (resolution == 0.0 || next - start < resolution) {
+            resolution = next - start;
+        }
+    }
+    return resolution;
+}
+
+// now_us: 返回当前时间（微秒）的函数；func: 被测代码
+// 每当样本数增长约 10% 时检查一次置信区间，避免每次都排序。
+// 返回的中位数和置信区间为每次调用的时间（微秒），batch 为每个样本的调用次数
+template<typename Func>
+MeasureResult measure_adaptive(double (*now_us)(), Func&& func, const MeasureOptions& options) {
+    const double resolution = clock_resolution_us(now_us);
+    auto run_batch = [&](size_t batch) {
+        const double start = now_us();
+        for (size_t k = 0; k < batch; ++k) {
+            func();
+        }
+        return now_us() - start;
+    };
+
+    // 批大小加倍，直到一批不短于 min_sample_us，也不短于时钟分辨率的 100 倍
+    const double min_sample = std::max(options.min_sample_us, 100.0 * resolution);
+    size_t batch = 1;
+    while (batch < (size_t(1) << 30) && run_batch(batch) < min_sample) {
+        batch *= 2;
+    }
+
+    std::vector<double> samples;
+    size_t next_check = options.min_samples;
+    const double deadline = now_us() + options.budget_us;
+    auto per_call = [&]() {
+        MeasureResult result = median_ci(samples);
+        result.median /= batch;
+        result.ci_low /= batch;
+        result.ci_high /= batch;
+        result.batch = batch;
+        return result;
+    };
+
+    while (samples.size() < options.max_samples) {
+        const double elapsed = run_batch(batch);
+        samples.push_back(elapsed);
+
+        // 预算用完时即使不足 min_samples 也停止（单次运行很长的大规模），但至少保留 3 个样本
+        if (now_us() >= deadline && samples.size() >= 3) {
+            break;
+        }
+        if (samples.size() >= next_check) {
+            MeasureResult result = median_ci(samples);
+            // 中位数在时钟分辨率以内时区间宽度没有意义，继续采样直到预算用完
+            if (result.median > resolution && result.ci_high - result.ci_low <= options.rel_width * result.median) {
+                return per_call();
+            }
+            next_check = samples.size() + std::max<size_t>(1, samples.size() / 10);
+        }
+    }
+    return per_call();
+}
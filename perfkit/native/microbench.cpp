@@ -0,0 +1,277 @@
+// 微基准：STREAM 风格的带宽内核和浮点加法 / 乘加峰值吞吐（perfkit/roofline.py），
+// 以及随机指针追逐的访存延迟（perfkit/latency.py）
+#include "kernels.h"
+#include "parallel.h"
+#include "timing.h"
+#include <cstdint>
+#include <cstring>
+
+#if defined(__x86_64__) || defined(__i386__)
+#include <immintrin.h>
+#define PERFKIT_X86 1
+#endif
+
+// 16 字节向量（SSE2，所有 x86-64 都支持），GCC 的向量扩展在其他架构上同样可用
+typedef double v2d __attribute__((vector_size(16)));
+
+// copy/scale/add/triad 与 STREAM 相同；read 只读一个数组，用 8 个向量累加器避开加法延迟，
+// 并按 simd_isa() 选择 AVX-512 / AVX2 / SSE2 版本，使它受限于加载而不是标量加法的吞吐
+static const char* STREAM_NAMES[] = {"copy", "scale", "add", "triad", "read"};
+// 每个元素读写的字节数，按 STREAM 的计法（不计写分配）
+static const int STREAM_BYTES[] = {16, 16, 24, 24, 8};
+
+// 只读内核：8 个向量累加器，每次迭代 8 个向量；剩余部分先逐个向量、最后逐个元素累加
+static double read_v2d(const double* a, size_t n) {
+    v2d s0 = {}, s1 = {}, s2 = {}, s3 = {}, s4 = {}, s5 = {}, s6 = {}, s7 = {};
+    size_t i = 0;
+    for (; i + 16 <= n; i += 16) {
+        v2d x0, x1, x2, x3, x4, x5, x6, x7;
+        std::memcpy(&x0, a + i, sizeof(v2d)); std::memcpy(&x1, a + i + 2, sizeof(v2d));
+        std::memcpy(&x2, a + i + 4, sizeof(v2d)); std::memcpy(&x3, a + i + 6, sizeof(v2d));
+        std::memcpy(&x4, a + i + 8, sizeof(v2d)); std::memcpy(&x5, a + i + 10, sizeof(v2d));
+        std::memcpy(&x6, a + i + 12, sizeof(v2d)); std::memcpy(&x7, a + i + 14, sizeof(v2d));
+        s0 += x0; s1 += x1; s2 += x2; s3 += x3; s4 += x4; s5 += x5; s6 += x6; s7 += x7;
+    }
+    for (; i + 2 <= n; i += 2) {
+        v2d x;
+        std::memcpy(&x, a + i, sizeof(v2d));
+        s0 += x;
+    }
+    v2d total = (s0 + s1) + (s2 + s3) + (s4 + s5) + (s6 + s7);
+    double sum = total[0] + total[1];
+    for (; i < n; ++i) sum += a[i];
+    return sum;
+}
+
+#ifdef PERFKIT_X86
+
+__attribute__((target("avx2")))
+static double read_avx2(const double* a, size_t n) {
+    __m256d s0 = _mm256_setzero_pd(), s1 = _mm256_setzero_pd(), s2 = _mm256_setzero_pd(), s3 = _mm256_setzero_pd();
+    __m256d s4 = _mm256_setzero_pd(), s5 = _mm256_setzero_pd(), s6 = _mm256_setzero_pd(), s7 = _mm256_setzero_pd();
+    size_t i = 0;
+    for (; i + 32 <= n; i += 32) {
+        s0 = _mm256_add_pd(s0, _mm256_loadu_pd(a + i)); s1 = _mm256_add_pd(s1, _mm256_loadu_pd(a + i + 4));
+        s2 = _mm256_add_pd(s2, _mm256_loadu_pd(a + i + 8)); s3 = _mm256_add_pd(s3, _mm256_loadu_pd(a + i + 12));
+        s4 = _mm256_add_pd(s4, _mm256_loadu_pd(a + i + 16)); s5 = _mm256_add_pd(s5, _mm256_loadu_pd(a + i + 20));
+        s6 = _mm256_add_pd(s6, _mm256_loadu_pd(a + i + 24)); s7 = _mm256_add_pd(s7, _mm256_loadu_pd(a + i + 28));
+    }
+    for (; i + 4 <= n; i += 4) {
+        s0 = _mm256_add_pd(s0, _mm256_loadu_pd(a + i));
+    }
+    double lanes[4];
+    _mm256_storeu_pd(lanes, _mm256_add_pd(_mm256_add_pd(_mm256_add_pd(s0, s1), _mm256_add_pd(s2, s3)),
+                                          _mm256_add_pd(_mm256_add_pd(s4, s5), _mm256_add_pd(s6, s7))));
+    double sum = (lanes[0] + lanes[1]) + (lanes[2] + lanes[3]);
+    for (; i < n; ++i) sum += a[i];
+    return sum;
+}
+
+__attribute__((target("avx512f")))
+static double read_avx512(const double* a, size_t n) {
+    __m512d s0 = _mm512_setzero_pd(), s1 = _mm512_setzero_pd(), s2 = _mm512_setzero_pd(), s3 = _mm512_setzero_pd();
+    __m512d s4 = _mm512_setzero_pd(), s5 = _mm512_setzero_pd(), s6 = _mm512_setzero_pd(), s7 = _mm512_setzero_pd();
+    size_t i = 0;
+    for (; i + 64 <= n; i += 64) {
+        s0 = _mm512_add_pd(s0, _mm512_loadu_pd(a + i)); s1 = _mm512_add_pd(s1, _mm512_loadu_pd(a + i + 8));
+        s2 = _mm512_add_pd(s2, _mm512_loadu_pd(a + i + 16)); s3 = _mm512_add_pd(s3, _mm512_loadu_pd(a + i + 24));
+        s4 = _mm512_add_pd(s4, _mm512_loadu_pd(a + i + 32)); s5 = _mm512_add_pd(s5, _mm512_loadu_pd(a + i + 40));
+        s6 = _mm512_add_pd(s6, _mm512_loadu_pd(a + i + 48)); s7 = _mm512_add_pd(s7, _mm512_loadu_pd(a + i + 56));
+    }
+    for (; i + 8 <= n; i += 8) {
+        s0 = _mm512_add_pd(s0, _mm512_loadu_pd(a + i));
+    }
+    double lanes[8];
+    _mm512_storeu_pd(lanes, _mm512_add_pd(_mm512_add_pd(_mm512_add_pd(s0, s1), _mm512_add_pd(s2, s3)),
+                                          _mm512_add_pd(_mm512_add_pd(s4, s5), _mm512_add_pd(s6, s7))));
+    double sum = ((lanes[0] + lanes[1]) + (lanes[2] + lanes[3])) + ((lanes[4] + lanes[5]) + (lanes[6] + lanes[7]));
+    for (; i < n; ++i) sum += a[i];
+    return sum;
+}
+
+#else
+
+static double read_avx2(const double* a, size_t n) { return read_v2d(a, n); }
+static double read_avx512(const double* a, size_t n) { return read_v2d(a, n); }
+
+#endif
+
+typedef double (*ReadKernel)(const double*, size_t);
+
+// 与 simd4 / simd8 使用同一个指令集（PERFKIT_SIMD 可强制指定），只在第一次调用时判断
+static double read_pass(const double* a, size_t n) {
+    static const ReadKernel kernel = []() {
+        const char* isa = simd_isa();
+        if (std::strcmp(isa, "avx512") == 0) {
+            return read_avx512;
+        }
+        if (std::strcmp(isa, "avx2") == 0) {
+            return read_avx2;
+        }
+        return read_v2d;
+    }();
+    return kernel(a, n);
+}
+
+static void stream_pass(int id, double* __restrict a, double* __restrict b, double* __restrict c,
+                        size_t n, double scalar) {
+    switch (id) {
+    case 0:
+        for (size_t i = 0; i < n; ++i) c[i] = a[i];
+        break;
+    case 1:
+        for (size_t i = 0; i < n; ++i) b[i] = scalar * c[i];
+        break;
+    case 2:
+        for (size_t i = 0; i < n; ++i) c[i] = a[i] + b[i];
+        break;
+    case 3:
+        for (size_t i = 0; i < n; ++i) a[i] = b[i] + scalar * c[i];
+        break;
+    default:
+        keep(read_pass(a, n));
+    }
+}
+
+// 峰值加法吞吐：8 条互相独立的加法链，足以覆盖加法延迟 × 每周期可发射的加法数。
+// 增量从 volatile 读出，编译器无法把循环折叠成乘法；不加 -ffast-math 时也不会重排加法
+static volatile double flop_step = 1e-9;
+static const int FLOP_CHAINS = 8;
+
+// 标量版本禁止自动向量化，否则 8 个累加器会被打包成向量
+__attribute__((optimize("no-tree-vectorize")))
+static double scalar_adds(size_t iterations) {
+    const double step = flop_step;
+    double s0 = 0, s1 = 1, s2 = 2, s3 = 3, s4 = 4, s5 = 5, s6 = 6, s7 = 7;
+    for (size_t i = 0; i < iterations; ++i) {
+        s0 += step; s1 += step; s2 += step; s3 += step;
+        s4 += step; s5 += step; s6 += step; s7 += step;
+    }
+    return (s0 + s1) + (s2 + s3) + (s4 + s5) + (s6 + s7);
+}
+
+static double simd_adds(size_t iterations) {
+    const v2d step = {flop_step, flop_step};
+    v2d s0 = {0, 1}, s1 = {2, 3}, s2 = {4, 5}, s3 = {6, 7};
+    v2d s4 = {8, 9}, s5 = {10, 11}, s6 = {12, 13}, s7 = {14, 15};
+    for (size_t i = 0; i < iterations; ++i) {
+        s0 += step; s1 += step; s2 += step; s3 += step;
+        s4 += step; s5 += step; s6 += step; s7 += step;
+    }
+    v2d total = (s0 + s1) + (s2 + s3) + (s4 + s5) + (s6 + s7);
+    return total[0] + total[1];
+}
+
+// 峰值乘加吞吐：8 条独立的 FMA 链（每次 2 次浮点运算），矩阵乘微内核能达到的上限。
+// 乘数从 volatile 读出（1.0），编译器无法化简
+static volatile double flop_scale = 1.0;
+
+#ifdef PERFKIT_X86
+
+__attribute__((target("avx2,fma")))
+static double avx2_fmas(size_t iterations) {
+    const __m256d step = _mm256_set1_pd(flop_step);
+    const __m256d scale = _mm256_set1_pd(flop_scale);
+    __m256d s0 = _mm256_set1_pd(0), s1 = _mm256_set1_pd(1), s2 = _mm256_set1_pd(2), s3 = _mm256_set1_pd(3);
+    __m256d s4 = _mm256_set1_pd(4), s5 = _mm256_set1_pd(5), s6 = _mm256_set1_pd(6), s7 = _mm256_set1_pd(7);
+    for (size_t i = 0; i < iterations; ++i) {
+        s0 = _mm256_fmadd_pd(s0, scale, step); s1 = _mm256_fmadd_pd(s1, scale, step);
+        s2 = _mm256_fmadd_pd(s2, scale, step); s3 = _mm256_fmadd_pd(s3, scale, step);
+        s4 = _mm256_fmadd_pd(s4, scale, step); s5 = _mm256_fmadd_pd(s5, scale, step);
+        s6 = _mm256_fmadd_pd(s6, scale, step); s7 = _mm256_fmadd_pd(s7, scale, step);
+    }
+    double lanes[4];
+    _mm256_storeu_pd(lanes, _mm256_add_pd(_mm256_add_pd(_mm256_add_pd(s0, s1), _mm256_add_pd(s2, s3)),
+                                          _mm256_add_pd(_mm256_add_pd(s4, s5), _mm256_add_pd(s6, s7))));
+    return (lanes[0] + lanes[1]) + (lanes[2] + lanes[3]);
+}
+
+__attribute__((target("avx512f")))
+static double avx512_fmas(size_t iterations) {
+    const __m512d step = _mm512_set1_pd(flop_step);
+    const __m512d scale = _mm512_set1_pd(flop_scale);
+    __m512d s0 = _mm512_set1_pd(0), s1 = _mm512_set1_pd(1), s2 = _mm512_set1_pd(2), s3 = _mm512_set1_pd(3);
+    __m512d s4 = _mm512_set1_pd(4), s5 = _mm512_set1_pd(5), s6 = _mm512_set1_pd(6), s7 = _mm512_set1_pd(7);
+    for (size_t i = 0; i < iterations; ++i) {
+        s0 = _mm512_fmadd_pd(s0, scale, step); s1 = _mm512_fmadd_pd(s1, scale, step);
+        s2 = _mm512_fmadd_pd(s2, scale, step); s3 = _mm512_fmadd_pd(s3, scale, step);
+        s4 = _mm512_fmadd_pd(s4, scale, step); s5 = _mm512_fmadd_pd(s5, scale, step);
+        s6 = _mm512_fmadd_pd(s6, scale, step); s7 = _mm512_fmadd_pd(s7, scale, step);
+    }
+    double lanes[8];
+    _mm512_storeu_pd(lanes, _mm512_add_pd(_mm512_add_pd(_mm512_add_pd(s0, s1), _mm512_add_pd(s2, s3)),
+                                          _mm512_add_pd(_mm512_add_pd(s4, s5), _mm512_add_pd(s6, s7))));
+    return ((lanes[0] + lanes[1]) + (lanes[2] + lanes[3])) + ((lanes[4] + lanes[5]) + (lanes[6] + lanes[7]));
+}
+
+static bool fma_supported() {
+    __builtin_cpu_init();
+    return __builtin_cpu_supports("fma");
+}
+
+#else
+
+// 非 x86 平台不会被选中（pk_flop_kernel_supported 返回 0）
+static double avx2_fmas(size_t iterations) { return simd_adds(iterations); }
+static double avx512_fmas(size_t iterations) { return simd_adds(iterations); }
+static bool fma_supported() { return false; }
+
+#endif
+
+typedef double (*FlopKernel)(size_t);
+
+static const char* FLOP_NAMES[] = {"scalar_add", "simd_add", "avx2_fma", "avx512_fma"};
+static const FlopKernel FLOP_KERNELS[] = {scalar_adds, simd_adds, avx2_fmas, avx512_fmas};
+// 每条链每次迭代的浮点运算次数（向量宽度 × 每条指令的运算数）
+static const int FLOP_LANES[] = {1, sizeof(v2d) / sizeof(double), 4 * 2, 8 * 2};
+// 需要的指令集，nullptr 表示不需要
+static const char* FLOP_ISAS[] = {nullptr, nullptr, "avx2", "avx512"};
+
+extern "C" {
+
+int pk_stream_kernel_count() { return sizeof(STREAM_BYTES) / sizeof(STREAM_BYTES[0]); }
+const char* pk_stream_kernel_name(int id) { return STREAM_NAMES[id]; }
+int pk_stream_kernel_bytes(int id) { return STREAM_BYTES[id]; }
+
+// 每个线程处理 a/b/c 中自己的一段 [t*n, (t+1)*n)，连续 batch 遍，返回从同时开始到最后一个线程结束的纳秒数
+double pk_time_stream(int id, double* a, double* b, double* c, size_t n, int threads, size_t batch) {
+    return time_parallel(threads, [&](int t) {
+        double* ta = a + t * n;
+        double* tb = b + t * n;
+        double* tc = c + t * n;
+        for (size_t i = 0; i < batch; ++i) {
+            stream_pass(id, ta, tb, tc, n, 3.0);
+        }
+    });
+}
+
+int pk_flop_kernel_count() { return sizeof(FLOP_KERNELS) / sizeof(FLOP_KERNELS[0]); }
+const char* pk_flop_kernel_name(int id) { return FLOP_NAMES[id]; }
+// 每次迭代的浮点运算次数
+int pk_flop_kernel_flops(int id) { return FLOP_CHAINS * FLOP_LANES[id]; }
+// 本机是否支持该内核需要的指令集
+int pk_flop_kernel_supported(int id) {
+    return !FLOP_ISAS[id] || (simd_isa_supported(FLOP_ISAS[id]) && fma_supported());
+}
+
+// 每个线程执行 iterations 次迭代，返回从同时开始到最后一个线程结束的纳秒数
+double pk_time_flops(int id, size_t iterations, int threads) {
+    FlopKernel kernel = FLOP_KERNELS[id];
+    return time_parallel(threads, [&](int) { keep(kernel(iterations)); });
+}
+
+// 指针追逐：next[i] 是下一个要访问的下标，每次加载都依赖上一次的结果，
+// 乱序执行和预取都无法重叠，测出来的就是该工作集所在层级的加载延迟。
+// 从下标 0 开始走 steps 步，返回总纳秒数
+double pk_pointer_chase(const uint64_t* next, size_t steps) {
+    uint64_t index = 0;
+    double start = now_ns();
+    for (size_t i = 0; i < steps; ++i) {
+        index = next[index];
+    }
+    double elapsed = now_ns() - start;
+    keep(static_cast<double>(index));
+    return elapsed;
+}
+
+}
@@ -0,0 +1,42 @@
+#pragma once
+// 多线程计时：每个线程执行 func(线程号)，全部线程就绪后由主线程记下开始时间并放行，
+// 返回从放行到最后一个线程结束的墙钟时间（纳秒），不包含创建和回收线程的开销。
+// 线程数超过空闲核心时，晚开始的线程等待的时间也算在内（与 parallel_sum.cpp 中线程池的计时一致）
+#include "timing.h"
+#include <algorithm>
+#include <atomic>
+#include <thread>
+#include <vector>
+
+template<typename Func>
+double time_parallel(int threads, Func&& func) {
+    if (threads <= 1) {
+        double start = now_ns();
+        func(0);
+        return now_ns() - start;
+    }
+    std::atomic<int> ready(0);
+    std::atomic<bool> go(false);
+    std::vector<double> finish(threads, 0.0);
+    std::vector<std::thread> pool;
+    pool.reserve(threads);
+    for (int t = 0; t < threads; ++t) {
+        pool.emplace_back([&, t]() {
+            ready.fetch_add(1);
+            while (!go.load(std::memory_order_acquire)) {
+                std::this_thread::yield();
+            }
+            func(t);
+            finish[t] = now_ns();
+        });
+    }
+    while (ready.load() < threads) {
+        std::this_thread::yield();
+    }
+    const double start = now_ns();
+    go.store(true, std::memory_order_release);
+    for (std::thread& thread : pool) {
+        thread.join();
+    }
+    return *std::max_element(finish.begin(), finish.end()) - start;
+}
@@ -0,0 +1,64 @@
+// 多线程矩阵向量乘：每个线程负责 result 中连续的一段列 [begin, end)，
+// 对整列条带 A[:, begin:end] 调用单线程的分块内核，各线程写 result 的不同部分，没有写冲突，也不需要合并。
+// 列边界对齐到 8 个元素（64 字节），相邻线程的 result 段不共用缓存行。
+// 绑核由共享线程池的 CPU 列表决定（pk_set_pool_affinity）；pk_first_touch_columns 让每个线程
+// 先写一遍自己的条带，首次访问时页面分配在该线程所在的 NUMA 节点上。
+#include "kernels.h"
+#include "thread_pool.h"
+#include "timing.h"
+#include <algorithm>
+#include <cstring>
+
+static void column_range(int n, int threads, int t, int& begin, int& end) {
+    const int chunk = (n / threads + 7) & ~7;
+    begin = std::min(n, chunk * t);
+    end = t == threads - 1 ? n : std::min(n, begin + chunk);
+}
+
+static void parallel_column_dot(int n, const double* A, size_t lda, const double* v, double* result,
+                                int threads, int col_block, int row_block) {
+    ThreadPool& pool = shared_pool(threads);
+    pool.run([&](int t) {
+        int begin, end;
+        column_range(n, threads, t, begin, end);
+        if (begin < end) {
+            tiled_column_dot_block(n, end - begin, A + begin, lda, v, result + begin, col_block, row_block);
+        }
+    });
+}
+
+extern "C" {
+
+// cpus 为 count 个 CPU 编号，t 号线程绑定到 cpus[t % count]；count 为 0 时不绑核
+void pk_set_pool_affinity(const int* cpus, int count) {
+    shared_pool_affinity().assign(cpus, cpus + count);
+}
+
+// 按 parallel_column_dot 的划分，由各线程把自己的列条带清零
+void pk_first_touch_columns(double* A, int n, size_t lda, int threads) {
+    ThreadPool& pool = shared_pool(threads);
+    pool.run([&](int t) {
+        int begin, end;
+        column_range(n, threads, t, begin, end);
+        if (t == threads - 1) {
+            end = static_cast<int>(lda);  // 行末的填充归最后一个线程
+        }
+        for (int i = 0; i < n; ++i) {
+            std::memset(A + i * lda + begin, 0, (end - begin) * sizeof(double));
+        }
+    });
+}
+
+void pk_parallel_matvec(int n, const double* A, size_t lda, const double* v, double* result,
+                        int threads, int col_block, int row_block) {
+    parallel_column_dot(n, A, lda, v, result, threads, col_block, row_block);
+}
+
+// 连续调用 batch 次，返回总纳秒数；线程池在计时前建好，不计入
+double pk_time_parallel_matvec(int n, const double* A, size_t lda, const double* v, double* result,
+                               int threads, int col_block, int row_block, size_t batch) {
+    shared_pool(threads);
+    return time_batch([&]() { parallel_column_dot(n, A, lda, v, result, threads, col_block, row_block); }, batch);
+}
+
+}
@@ -0,0 +1,126 @@
+// 多线程数组求和：静态分块，每个线程用单线程内核（4 路展开 / 8 路展开分块）求自己那一段的部分和，
+// 最后在调用线程上两两合并（树形合并，与两两相加算法的误差量级一致）。
+// 另有伪共享基准：同样的并行求和，部分和的存放方式分别为紧挨着（packed）、按 64/128 字节填充和线程局部。
+#include "kernels.h"
+#include "thread_pool.h"
+#include "timing.h"
+#include "work_stealing.h"
+#include <algorithm>
+#include <cstdlib>
+#include <cstring>
+#include <vector>
+
+typedef double (*ChunkKernel)(const double*, size_t);
+
+// 每个部分和独占一个缓存行，避免不同线程写同一行
+struct alignas(64) PaddedSum {
+    double value;
+};
+
+// 线程 t 处理的区间 [begin, end)，边界对齐到 8 个元素，让每段的展开循环都从整组开始
+static void chunk_range(size_t size, int threads, int t, size_t& begin, size_t& end) {
+    const size_t chunk = (size / threads + 7) & ~size_t(7);
+    begin = std::min(size, chunk * t);
+    end = t == threads - 1 ? size : std::min(size, begin + chunk);
+}
+
+static double tree_combine(std::vector<PaddedSum>& partial) {
+    const size_t count = partial.size();
+    for (size_t stride = 1; stride < count; stride *= 2) {
+        for (size_t i = 0; i + stride < count; i += 2 * stride) {
+            partial[i].value += partial[i + stride].value;
+        }
+    }
+    return partial[0].value;
+}
+
+static double parallel_sum(ChunkKernel kernel, const double* data, size_t size, int threads) {
+    ThreadPool& pool = shared_pool(threads);
+    std::vector<PaddedSum> partial(threads);
+    pool.run([&](int t) {
+        size_t begin, end;
+        chunk_range(size, threads, t, begin, end);
+        partial[t].value = kernel(data + begin, end - begin);
+    });
+    return tree_combine(partial);
+}
+
+// 伪共享基准：每个线程把每个元素直接累加到共享数组中自己的槽位（每个元素一次读-改-写内存），
+// 槽位间距决定不同线程是否写同一缓存行。packed 间距 8 字节，8 个线程挤在一行；
+// padded64 每个线程独占一行；padded128 独占两行，避开相邻行预取把邻居的行一起拉走；
+// thread_local 在寄存器里累加，最后只写一次
+static const char* ACCUMULATOR_NAMES[] = {"packed", "padded64", "padded128", "thread_local"};
+static const size_t ACCUMULATOR_STRIDES[] = {1, 8, 16, 0};  // 槽位间距（double 个数），0 表示线程局部
+
+static double accumulator_sum(int layout, const double* data, size_t size, int threads) {
+    const size_t stride = ACCUMULATOR_STRIDES[layout];
+    const size_t slot_stride = stride ? stride : 1;
+    const size_t bytes = (slot_stride * threads * sizeof(double) + 127) & ~size_t(127);
+    double* partial = static_cast<double*>(std::aligned_alloc(128, bytes));
+    std::memset(partial, 0, bytes);
+
+    ThreadPool& pool = shared_pool(threads);
+    pool.run([&](int t) {
+        size_t begin, end;
+        chunk_range(size, threads, t, begin, end);
+        if (stride == 0) {
+            double local = 0.0;
+            for (size_t i = begin; i < end; ++i) {
+                local += data[i];
+            }
+            partial[t] = local;
+        } else {
+            // volatile 保证每次累加都真正读写共享数组，而不是被编译器提升到寄存器里
+            volatile double* slot = partial + t * stride;
+            for (size_t i = begin; i < end; ++i) {
+                *slot += data[i];
+            }
+        }
+    });
+
+    std::vector<PaddedSum> sums(threads);
+    for (int t = 0; t < threads; ++t) {
+        sums[t].value = partial[t * slot_stride];
+    }
+    std::free(partial);
+    return tree_combine(sums);
+}
+
+static const char* PARALLEL_SUM_NAMES[] = {"parallel_unrolled4", "parallel_unrolled8"};
+static const ChunkKernel PARALLEL_SUM_KERNELS[] = {unrolled_sum4, unrolled_sum};
+
+extern "C" {
+
+int pk_parallel_sum_kernel_count() { return sizeof(PARALLEL_SUM_KERNELS) / sizeof(PARALLEL_SUM_KERNELS[0]); }
+const char* pk_parallel_sum_kernel_name(int id) { return PARALLEL_SUM_NAMES[id]; }
+
+double pk_parallel_sum(int id, const double* data, size_t size, int threads) {
+    return parallel_sum(PARALLEL_SUM_KERNELS[id], data, size, threads);
+}
+
+// 连续调用 batch 次，返回总纳秒数；线程池在计时前建好，不计入
+double pk_time_parallel_sum(int id, const double* data, size_t size, int threads, size_t batch) {
+    shared_pool(threads);
+    ChunkKernel kernel = PARALLEL_SUM_KERNELS[id];
+    return time_batch([&]() { keep(parallel_sum(kernel, data, size, threads)); }, batch);
+}
+
+int pk_accumulator_layout_count() { return sizeof(ACCUMULATOR_STRIDES) / sizeof(ACCUMULATOR_STRIDES[0]); }
+const char* pk_accumulator_layout_name(int layout) { return ACCUMULATOR_NAMES[layout]; }
+
+double pk_accumulator_sum(int layout, const double* data, size_t size, int threads) {
+    return accumulator_sum(layout, data, size, threads);
+}
+
+double pk_time_accumulator_sum(int layout, const double* data, size_t size, int threads, size_t batch) {
+    shared_pool(threads);
+    return time_batch([&]() { keep(accumulator_sum(layout, data, size, threads)); }, batch);
+}
+
+// 回收线程池；以 inherit 方式打开计数器之前调用，之后重新创建的线程才会被计数
+void pk_release_pools() {
+    shared_pool_slot().reset();
+    shared_stealing_pool_slot().reset();
+}
+
+}
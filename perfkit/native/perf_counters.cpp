@@ -0,0 +1,66 @@
+// perf_counters.h 的 C 接口，编译进 libperfkit.so 供 perfkit/counters.py 通过 ctypes 调用
+#include "perf_counters.h"
+
+#include <sstream>
+
+static std::string last_error;
+
+extern "C" {
+
+// events: 逗号分隔的事件名，如 "instructions,cycles,task-clock"；inherit 非 0 时同时统计之后创建的线程；失败返回 NULL
+void* pk_counters_open(const char* events, int group_size, int inherit) {
+    std::vector<std::string> names;
+    std::stringstream stream(events);
+    std::string name;
+    while (std::getline(stream, name, ',')) {
+        if (!name.empty()) {
+            names.push_back(name);
+        }
+    }
+
+    PerfCounters* counters = new PerfCounters();
+    bool ok = counters->open(names, group_size > 0 ? static_cast<size_t>(group_size) : 4, inherit != 0);
+    last_error = counters->error();
+    if (!ok) {
+        delete counters;
+        return nullptr;
+    }
+    return counters;
+}
+
+int pk_counters_available(void* handle, int index) {
+    return static_cast<PerfCounters*>(handle)->available(index) ? 1 : 0;
+}
+
+void pk_counters_start(void* handle) {
+    static_cast<PerfCounters*>(handle)->start();
+}
+
+void pk_counters_stop(void* handle) {
+    static_cast<PerfCounters*>(handle)->stop();
+}
+
+// values / run_pct 的长度为打开时的事件个数；不可用的事件值为 -1
+int pk_counters_read(void* handle, double* values, double* run_pct) {
+    PerfCounters* counters = static_cast<PerfCounters*>(handle);
+    std::vector<double> value_vec, pct_vec;
+    if (!counters->read(value_vec, pct_vec)) {
+        last_error = counters->error();
+        return -1;
+    }
+    for (size_t i = 0; i < value_vec.size(); ++i) {
+        values[i] = value_vec[i];
+        run_pct[i] = pct_vec[i];
+    }
+    return 0;
+}
+
+void pk_counters_close(void* handle) {
+    delete static_cast<PerfCounters*>(handle);
+}
+
+const char* pk_last_error() {
+    return last_error.c_str();
+}
+
+}
@@ -0,0 +1,195 @@
+#pragma once
+// 进程内硬件计数器（perf_event_open）
+// 与 collect_perf.sh 用 perf stat 包住整个程序不同，这里只在被测内核前后开关计数器，
+// 计数不包含生成随机数、分配内存和打印输出。事件按 group_size 分组，每组一个 leader，
+// 组内事件同时开关、同时读取；分时复用时按 time_enabled / time_running 比例放大，并给出运行占比。
+// 只统计用户态（exclude_kernel），perf_event_paranoid <= 2 时无需 root。
+// inherit 时计数还包括打开之后才创建的子线程（例如多线程内核的线程池），读出的是所有线程之和。
+#include <linux/perf_event.h>
+#include <sys/ioctl.h>
+#include <sys/syscall.h>
+#include <unistd.h>
+#include <cerrno>
+#include <cstdint>
+#include <cstdlib>
+#include <cstring>
+#include <string>
+#include <vector>
+
+struct CounterEvent {
+    const char* name;  // 与 perf stat -e 相同的事件名
+    uint32_t type;
+    uint64_t config;
+};
+
+// perf 硬件缓存事件的 config: 缓存 | 操作 << 8 | 结果 << 16
+constexpr uint64_t cache_event(uint64_t cache, uint64_t op, uint64_t result) {
+    return cache | (op << 8) | (result << 16);
+}
+
+static const CounterEvent COUNTER_EVENTS[] = {
+    {"instructions", PERF_TYPE_HARDWARE, PERF_COUNT_HW_INSTRUCTIONS},
+    {"cycles", PERF_TYPE_HARDWARE, PERF_COUNT_HW_CPU_CYCLES},
+    {"cache-references", PERF_TYPE_HARDWARE, PERF_COUNT_HW_CACHE_REFERENCES},
+    {"cache-misses", PERF_TYPE_HARDWARE, PERF_COUNT_HW_CACHE_MISSES},
+    {"branches", PERF_TYPE_HARDWARE, PERF_COUNT_HW_BRANCH_INSTRUCTIONS},
+    {"branch-misses", PERF_TYPE_HARDWARE, PERF_COUNT_HW_BRANCH_MISSES},
+    {"L1-dcache-loads", PERF_TYPE_HW_CACHE,
+     cache_event(PERF_COUNT_HW_CACHE_L1D, PERF_COUNT_HW_CACHE_OP_READ, PERF_COUNT_HW_CACHE_RESULT_ACCESS)},
+    {"L1-dcache-load-misses", PERF_TYPE_HW_CACHE,
+     cache_event(PERF_COUNT_HW_CACHE_L1D, PERF_COUNT_HW_CACHE_OP_READ, PERF_COUNT_HW_CACHE_RESULT_MISS)},
+    {"LLC-loads", PERF_TYPE_HW_CACHE,
+     cache_event(PERF_COUNT_HW_CACHE_LL, PERF_COUNT_HW_CACHE_OP_READ, PERF_COUNT_HW_CACHE_RESULT_ACCESS)},
+    {"LLC-load-misses", PERF_TYPE_HW_CACHE,
+     cache_event(PERF_COUNT_HW_CACHE_LL, PERF_COUNT_HW_CACHE_OP_READ, PERF_COUNT_HW_CACHE_RESULT_MISS)},
+    {"dTLB-load-misses", PERF_TYPE_HW_CACHE,
+     cache_event(PERF_COUNT_HW_CACHE_DTLB, PERF_COUNT_HW_CACHE_OP_READ, PERF_COUNT_HW_CACHE_RESULT_MISS)},
+    {"task-clock", PERF_TYPE_SOFTWARE, PERF_COUNT_SW_TASK_CLOCK},
+};
+
+// 事件名 -> (type, config)；"r04d2" 这样的原始事件按十六进制编码处理
+inline bool lookup_event(const std::string& name, uint32_t& type, uint64_t& config) {
+    for (const CounterEvent& event : COUNTER_EVENTS) {
+        if (name == event.name) {
+            type = event.type;
+            config = event.config;
+            return true;
+        }
+    }
+    if (name.size() > 1 && name[0] == 'r') {
+        char* end = nullptr;
+        config = std::strtoull(name.c_str() + 1, &end, 16);
+        type = PERF_TYPE_RAW;
+        return *end == '\0';
+    }
+    return false;
+}
+
+class PerfCounters {
+public:
+    PerfCounters() = default;
+    PerfCounters(const PerfCounters&) = delete;
+    PerfCounters& operator=(const PerfCounters&) = delete;
+    ~PerfCounters() { close(); }
+
+    // 打开事件；不支持的事件（虚拟机、没有该 PMU）标记为不可用而不是整体失败
+    bool open(const std::vector<std::string>& events, size_t group_size = 4, bool inherit = false) {
+        close();
+        inherit_ = inherit;
+        names_ = events;
+        available_.assign(events.size(), 0);
+        for (size_t i = 0; i < events.size(); ++i) {
+            uint32_t type;
+            uint64_t config;
+            if (!lookup_event(events[i], type, config)) {
+                error_ = "未知事件: " + events[i];
+                continue;
+            }
+            // 软件事件不占用 PMU 计数器，不计入组大小
+            if (groups_.empty() || (type != PERF_TYPE_SOFTWARE && groups_.back().hardware >= group_size)) {
+                groups_.push_back(Group());
+            }
+            Group& group = groups_.back();
+            int fd = open_event(type, config, group.leader, inherit_);
+            if (fd < 0) {
+                error_ = events[i] + ": " + std::strerror(errno);
+                if (group.leader < 0) {
+                    groups_.pop_back();
+                }
+                continue;
+            }
+            if (group.leader < 0) {
+                group.leader = fd;
+            }
+            group.fds.push_back(fd);
+            group.slots.push_back(i);
+            available_[i] = 1;
+            if (type != PERF_TYPE_SOFTWARE) {
+                ++group.hardware;
+            }
+        }
+        return !groups_.empty();
+    }
+
+    void start() {
+        for (const Group& group : groups_) {
+            ioctl(group.leader, PERF_EVENT_IOC_RESET, PERF_IOC_FLAG_GROUP);
+        }
+        for (const Group& group : groups_) {
+            ioctl(group.leader, PERF_EVENT_IOC_ENABLE, PERF_IOC_FLAG_GROUP);
+        }
+    }
+
+    void stop() {
+        for (const Group& group : groups_) {
+            ioctl(group.leader, PERF_EVENT_IOC_DISABLE, PERF_IOC_FLAG_GROUP);
+        }
+    }
+
+    // 读取上一次 start/stop 之间的计数；不可用的事件值为 -1
+    bool read(std::vector<double>& values, std::vector<double>& run_pct) {
+        values.assign(names_.size(), -1.0);
+        run_pct.assign(names_.size(), 0.0);
+        for (const Group& group : groups_) {
+            // PERF_FORMAT_GROUP 布局: nr, time_enabled, time_running, value[nr]
+            std::vector<uint64_t> buffer(3 + group.fds.size());
+            ssize_t bytes = ::read(group.leader, buffer.data(), buffer.size() * sizeof(uint64_t));
+            if (bytes < static_cast<ssize_t>(3 * sizeof(uint64_t))) {
+                error_ = std::string("读取计数器失败: ") + std::strerror(errno);
+                return false;
+            }
+            const double enabled = static_cast<double>(buffer[1]);
+            const double running = static_cast<double>(buffer[2]);
+            const double scale = running > 0 ? enabled / running : 0.0;
+            const double pct = enabled > 0 ? 100.0 * running / enabled : 100.0;
+            for (size_t k = 0; k < group.slots.size() && k < buffer[0]; ++k) {
+                values[group.slots[k]] = static_cast<double>(buffer[3 + k]) * scale;
+                run_pct[group.slots[k]] = pct;
+            }
+        }
+        return true;
+    }
+
+    void close() {
+        for (const Group& group : groups_) {
+            for (int fd : group.fds) {
+                ::close(fd);
+            }
+        }
+        groups_.clear();
+    }
+
+    size_t size() const { return names_.size(); }
+    const std::string& name(size_t i) const { return names_[i]; }
+    bool available(size_t i) const { return available_[i] != 0; }
+    const std::string& error() const { return error_; }
+
+private:
+    struct Group {
+        int leader = -1;
+        std::vector<int> fds;
+        std::vector<size_t> slots;  // 组内第 k 个计数器对应的事件序号
+        size_t hardware = 0;        // 组内硬件事件个数
+    };
+
+    static int open_event(uint32_t type, uint64_t config, int group_fd, bool inherit) {
+        perf_event_attr attr;
+        std::memset(&attr, 0, sizeof(attr));
+        attr.size = sizeof(attr);
+        attr.type = type;
+        attr.config = config;
+        attr.disabled = group_fd < 0 ? 1 : 0;  // 只有 leader 初始关闭，由它控制整组
+        attr.exclude_kernel = 1;
+        attr.exclude_hv = 1;
+        attr.inherit = inherit ? 1 : 0;
+        attr.read_format = PERF_FORMAT_GROUP | PERF_FORMAT_TOTAL_TIME_ENABLED | PERF_FORMAT_TOTAL_TIME_RUNNING;
+        // pid = 0, cpu = -1: 统计当前线程，不限定 CPU
+        return static_cast<int>(syscall(SYS_perf_event_open, &attr, 0, -1, group_fd, 0));
+    }
+
+    std::vector<std::string> names_;
+    std::vector<char> available_;
+    std::vector<Group> groups_;
+    std::string error_;
+    bool inherit_ = false;
+};
@@ -0,0 +1,51 @@
+// 任务并行的递归两两相加
+// 原来的 recursive_sum 一直递归到单个元素，函数调用开销比加法本身大得多。这里递归到 leaf 个元素
+// 就改用 8 路展开的循环，规模超过 spawn_threshold 的子树把左半部分作为任务交给工作窃取线程池，
+// 保留两两相加 O(log n) 的误差增长，叶子内部是 8 路展开的速度。
+#include "kernels.h"
+#include "timing.h"
+#include "work_stealing.h"
+
+static double pairwise(const double* data, size_t size, size_t leaf, size_t spawn_threshold,
+                       WorkStealingPool* pool) {
+    if (size <= leaf) {
+        return unrolled_sum(data, size);
+    }
+    const size_t half = size / 2;
+    if (pool && size > spawn_threshold) {
+        double left = 0.0;
+        std::atomic<int> pending(1);
+        pool->spawn([&]() { left = pairwise(data, half, leaf, spawn_threshold, pool); }, pending);
+        double right = pairwise(data + half, size - half, leaf, spawn_threshold, pool);
+        pool->wait(pending);
+        return left + right;
+    }
+    return pairwise(data, half, leaf, spawn_threshold, pool) +
+           pairwise(data + half, size - half, leaf, spawn_threshold, pool);
+}
+
+static double task_recursive_sum(const double* data, size_t size, size_t leaf, size_t spawn_threshold, int threads) {
+    leaf = leaf < 1 ? 1 : leaf;
+    if (threads <= 1) {
+        return pairwise(data, size, leaf, spawn_threshold, nullptr);
+    }
+    WorkStealingPool& pool = shared_stealing_pool(threads);
+    return pool.run([&]() { return pairwise(data, size, leaf, spawn_threshold, &pool); });
+}
+
+extern "C" {
+
+double pk_recursive_sum(const double* data, size_t size, size_t leaf, size_t spawn_threshold, int threads) {
+    return task_recursive_sum(data, size, leaf, spawn_threshold, threads);
+}
+
+// 连续调用 batch 次，返回总纳秒数；线程池在计时前建好，不计入
+double pk_time_recursive_sum(const double* data, size_t size, size_t leaf, size_t spawn_threshold,
+                             int threads, size_t batch) {
+    if (threads > 1) {
+        shared_stealing_pool(threads);
+    }
+    return time_batch([&]() { keep(task_recursive_sum(data, size, leaf, spawn_threshold, threads)); }, batch);
+}
+
+}
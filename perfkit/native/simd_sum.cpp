@@ -0,0 +1,201 @@
+// 显式 SIMD 求和：AVX2 / AVX-512 的 4 路和 8 路分块版本，运行时按 CPU 支持的指令集选择
+// 不加 -ffast-math 时编译器不能重排浮点加法，8 路展开的循环通常仍是标量指令。这里直接用 intrinsics，
+// 每个累加器是一个向量寄存器（AVX2 4 个 double，AVX-512 8 个），多个累加器覆盖加法延迟。
+// 各函数用 target 属性单独开启指令集，整个库仍按基线 x86-64 编译，不支持的机器上不会执行到。
+// 环境变量 PERFKIT_SIMD=avx512/avx2/scalar 可以强制指定 simd4 / simd8 使用的指令集。
+#include "kernels.h"
+#include <algorithm>
+#include <cstdlib>
+#include <cstring>
+
+#if defined(__x86_64__) || defined(__i386__)
+#include <immintrin.h>
+#define PERFKIT_X86 1
+#endif
+
+static const size_t SIMD_BLOCK_SIZE = 8192;  // 与 unrolled_sum 相同的分块大小（约 64KB）
+
+#ifdef PERFKIT_X86
+
+__attribute__((target("avx2")))
+static double avx2_horizontal(__m256d v) {
+    double lanes[4];
+    _mm256_storeu_pd(lanes, v);
+    return (lanes[0] + lanes[1]) + (lanes[2] + lanes[3]);
+}
+
+// 4 个 256 位累加器，每次迭代 16 个元素
+__attribute__((target("avx2")))
+double avx2_sum4(const double* numbers, size_t size) {
+    __m256d acc0 = _mm256_setzero_pd(), acc1 = _mm256_setzero_pd();
+    __m256d acc2 = _mm256_setzero_pd(), acc3 = _mm256_setzero_pd();
+    size_t i = 0;
+    for (; i + 16 <= size; i += 16) {
+        acc0 = _mm256_add_pd(acc0, _mm256_loadu_pd(numbers + i));
+        acc1 = _mm256_add_pd(acc1, _mm256_loadu_pd(numbers + i + 4));
+        acc2 = _mm256_add_pd(acc2, _mm256_loadu_pd(numbers + i + 8));
+        acc3 = _mm256_add_pd(acc3, _mm256_loadu_pd(numbers + i + 12));
+    }
+    double sum = avx2_horizontal(_mm256_add_pd(_mm256_add_pd(acc0, acc1), _mm256_add_pd(acc2, acc3)));
+    for (; i < size; ++i) {
+        sum += numbers[i];
+    }
+    return sum;
+}
+
+// 8 个 256 位累加器 + 分块，每次迭代 32 个元素
+__attribute__((target("avx2")))
+double avx2_sum8(const double* numbers, size_t size) {
+    double total_sum = 0.0;
+    for (size_t block_start = 0; block_start < size; block_start += SIMD_BLOCK_SIZE) {
+        const size_t block_end = std::min(block_start + SIMD_BLOCK_SIZE, size);
+        __m256d acc0 = _mm256_setzero_pd(), acc1 = _mm256_setzero_pd();
+        __m256d acc2 = _mm256_setzero_pd(), acc3 = _mm256_setzero_pd();
+        __m256d acc4 = _mm256_setzero_pd(), acc5 = _mm256_setzero_pd();
+        __m256d acc6 = _mm256_setzero_pd(), acc7 = _mm256_setzero_pd();
+        size_t i = block_start;
+        for (; i + 32 <= block_end; i += 32) {
+            acc0 = _mm256_add_pd(acc0, _mm256_loadu_pd(numbers + i));
+            acc1 = _mm256_add_pd(acc1, _mm256_loadu_pd(numbers + i + 4));
+            acc2 = _mm256_add_pd(acc2, _mm256_loadu_pd(numbers + i + 8));
+            acc3 = _mm256_add_pd(acc3, _mm256_loadu_pd(numbers + i + 12));
+            acc4 = _mm256_add_pd(acc4, _mm256_loadu_pd(numbers + i + 16));
+            acc5 = _mm256_add_pd(acc5, _mm256_loadu_pd(numbers + i + 20));
+            acc6 = _mm256_add_pd(acc6, _mm256_loadu_pd(numbers + i + 24));
+            acc7 = _mm256_add_pd(acc7, _mm256_loadu_pd(numbers + i + 28));
+        }
+        __m256d acc = _mm256_add_pd(_mm256_add_pd(_mm256_add_pd(acc0, acc1), _mm256_add_pd(acc2, acc3)),
+                                    _mm256_add_pd(_mm256_add_pd(acc4, acc5), _mm256_add_pd(acc6, acc7)));
+        double block_sum = avx2_horizontal(acc);
+        for (; i < block_end; ++i) {
+            block_sum += numbers[i];
+        }
+        total_sum += block_sum;
+    }
+    return total_sum;
+}
+
+__attribute__((target("avx512f")))
+static double avx512_horizontal(__m512d v) {
+    double lanes[8];
+    _mm512_storeu_pd(lanes, v);
+    return ((lanes[0] + lanes[1]) + (lanes[2] + lanes[3])) + ((lanes[4] + lanes[5]) + (lanes[6] + lanes[7]));
+}
+
+// 4 个 512 位累加器，每次迭代 32 个元素
+__attribute__((target("avx512f")))
+double avx512_sum4(const double* numbers, size_t size) {
+    __m512d acc0 = _mm512_setzero_pd(), acc1 = _mm512_setzero_pd();
+    __m512d acc2 = _mm512_setzero_pd(), acc3 = _mm512_setzero_pd();
+    size_t i = 0;
+    for (; i + 32 <= size; i += 32) {
+        acc0 = _mm512_add_pd(acc0, _mm512_loadu_pd(numbers + i));
+        acc1 = _mm512_add_pd(acc1, _mm512_loadu_pd(numbers + i + 8));
+        acc2 = _mm512_add_pd(acc2, _mm512_loadu_pd(numbers + i + 16));
+        acc3 = _mm512_add_pd(acc3, _mm512_loadu_pd(numbers + i + 24));
+    }
+    double sum = avx512_horizontal(_mm512_add_pd(_mm512_add_pd(acc0, acc1), _mm512_add_pd(acc2, acc3)));
+    for (; i < size; ++i) {
+        sum += numbers[i];
+    }
+    return sum;
+}
+
+// 8 个 512 位累加器 + 分块，每次迭代 64 个元素
+__attribute__((target("avx512f")))
+double avx512_sum8(const double* numbers, size_t size) {
+    double total_sum = 0.0;
+    for (size_t block_start = 0; block_start < size; block_start += SIMD_BLOCK_SIZE) {
+        const size_t block_end = std::min(block_start + SIMD_BLOCK_SIZE, size);
+        __m512d acc0 = _mm512_setzero_pd(), acc1 = _mm512_setzero_pd();
+        __m512d acc2 = _mm512_setzero_pd(), acc3 = _mm512_setzero_pd();
+        __m512d acc4 = _mm512_setzero_pd(), acc5 = _mm512_setzero_pd();
+        __m512d acc6 = _mm512_setzero_pd(), acc7 = _mm512_setzero_pd();
+        size_t i = block_start;
+        for (; i + 64 <= block_end; i += 64) {
+            acc0 = _mm512_add_pd(acc0, _mm512_loadu_pd(numbers + i));
+            acc1 = _mm512_add_pd(acc1, _mm512_loadu_pd(numbers + i + 8));
+            acc2 = _mm512_add_pd(acc2, _mm512_loadu_pd(numbers + i + 16));
+            acc3 = _mm512_add_pd(acc3, _mm512_loadu_pd(numbers + i + 24));
+            acc4 = _mm512_add_pd(acc4, _mm512_loadu_pd(numbers + i + 32));
+            acc5 = _mm512_add_pd(acc5, _mm512_loadu_pd(numbers + i + 40));
+            acc6 = _mm512_add_pd(acc6, _mm512_loadu_pd(numbers + i + 48));
+            acc7 = _mm512_add_pd(acc7, _mm512_loadu_pd(numbers + i + 56));
+        }
+        __m512d acc = _mm512_add_pd(_mm512_add_pd(_mm512_add_pd(acc0, acc1), _mm512_add_pd(acc2, acc3)),
+                                    _mm512_add_pd(_mm512_add_pd(acc4, acc5), _mm512_add_pd(acc6, acc7)));
+        double block_sum = avx512_horizontal(acc);
+        for (; i < block_end; ++i) {
+            block_sum += numbers[i];
+        }
+        total_sum += block_sum;
+    }
+    return total_sum;
+}
+
+#else
+
+// 非 x86 平台没有这些指令集，退回到标量展开版本（simd_isa_supported 返回 false，不会被选中）
+double avx2_sum4(const double* numbers, size_t size) { return unrolled_sum4(numbers, size); }
+double avx2_sum8(const double* numbers, size_t size) { return unrolled_sum(numbers, size); }
+double avx512_sum4(const double* numbers, size_t size) { return unrolled_sum4(numbers, size); }
+double avx512_sum8(const double* numbers, size_t size) { return unrolled_sum(numbers, size); }
+
+#endif
+
+bool simd_isa_supported(const char* isa) {
+    if (std::strcmp(isa, "scalar") == 0) {
+        return true;
+    }
+#ifdef PERFKIT_X86
+    __builtin_cpu_init();
+    if (std::strcmp(isa, "avx2") == 0) {
+        return __builtin_cpu_supports("avx2");
+    }
+    if (std::strcmp(isa, "avx512") == 0) {
+        return __builtin_cpu_supports("avx512f");
+    }
+#endif
+    return false;
+}
+
+// 支持的最宽指令集；PERFKIT_SIMD 指定且本机支持时以它为准
+const char* simd_isa() {
+    static const char* isa = []() {
+        const char* forced = std::getenv("PERFKIT_SIMD");
+        if (forced && simd_isa_supported(forced)) {
+            return forced;
+        }
+        for (const char* candidate : {"avx512", "avx2"}) {
+            if (simd_isa_supported(candidate)) {
+                return candidate;
+            }
+        }
+        return "scalar";
+    }();
+    return isa;
+}
+
+typedef double (*SimdKernel)(const double*, size_t);
+
+// 按选中的指令集取对应版本，只在第一次调用时判断
+static SimdKernel pick(SimdKernel avx512, SimdKernel avx2, SimdKernel scalar) {
+    const char* isa = simd_isa();
+    if (std::strcmp(isa, "avx512") == 0) {
+        return avx512;
+    }
+    if (std::strcmp(isa, "avx2") == 0) {
+        return avx2;
+    }
+    return scalar;
+}
+
+double simd_sum4(const double* numbers, size_t size) {
+    static const SimdKernel kernel = pick(avx512_sum4, avx2_sum4, unrolled_sum4);
+    return kernel(numbers, size);
+}
+
+double simd_sum8(const double* numbers, size_t size) {
+    static const SimdKernel kernel = pick(avx512_sum8, avx2_sum8, unrolled_sum);
+    return kernel(numbers, size);
+}
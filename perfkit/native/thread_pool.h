@@ -0,0 +1,129 @@
+#pragma once
+// 常驻线程池（fork-join）：run(func) 让每个线程执行一次 func(线程号) 并等待全部完成。
+// 调用线程自己作为 0 号线程参与计算，其余线程在两次 run 之间阻塞在条件变量上，
+// 每次并行求和不再创建和回收线程，小规模的并行开销只剩一次唤醒和一次汇合。
+// 给出 CPU 列表时 t 号线程绑定到 cpus[t]（调用线程在线程池存在期间绑定到 cpus[0]，销毁时恢复）。
+#include <pthread.h>
+#include <sched.h>
+#include <atomic>
+#include <condition_variable>
+#include <functional>
+#include <memory>
+#include <mutex>
+#include <thread>
+#include <vector>
+
+class ThreadPool {
+public:
+    explicit ThreadPool(int threads, std::vector<int> cpus = {})
+        : size_(threads < 1 ? 1 : threads), cpus_(std::move(cpus)) {
+        if (!cpus_.empty()) {
+            pthread_getaffinity_np(pthread_self(), sizeof(caller_mask_), &caller_mask_);
+            pin(0);
+        }
+        for (int t = 1; t < size_; ++t) {
+            workers_.emplace_back([this, t]() { work(t); });
+        }
+    }
+
+    ThreadPool(const ThreadPool&) = delete;
+    ThreadPool& operator=(const ThreadPool&) = delete;
+
+    ~ThreadPool() {
+        {
+            std::lock_guard<std::mutex> lock(mutex_);
+            stopping_ = true;
+            ++generation_;
+        }
+        wake_.notify_all();
+        for (std::thread& worker : workers_) {
+            worker.join();
+        }
+        if (!cpus_.empty()) {
+            pthread_setaffinity_np(pthread_self(), sizeof(caller_mask_), &caller_mask_);
+        }
+    }
+
+    int size() const { return size_; }
+    const std::vector<int>& cpus() const { return cpus_; }
+
+    template<typename Func>
+    void run(Func&& func) {
+        if (size_ == 1) {
+            func(0);
+            return;
+        }
+        {
+            std::lock_guard<std::mutex> lock(mutex_);
+            task_ = std::ref(func);
+            remaining_.store(size_ - 1);
+            ++generation_;
+        }
+        wake_.notify_all();
+        func(0);
+        while (remaining_.load(std::memory_order_acquire) > 0) {
+            std::this_thread::yield();
+        }
+    }
+
+private:
+    void pin(int id) {
+        cpu_set_t mask;
+        CPU_ZERO(&mask);
+        CPU_SET(cpus_[id % cpus_.size()], &mask);
+        pthread_setaffinity_np(pthread_self(), sizeof(mask), &mask);
+    }
+
+    void work(int id) {
+        if (!cpus_.empty()) {
+            pin(id);
+        }
+        unsigned long long seen = 0;
+        for (;;) {
+            std::function<void(int)> task;
+            {
+                std::unique_lock<std::mutex> lock(mutex_);
+                wake_.wait(lock, [&]() { return generation_ != seen; });
+                seen = generation_;
+                if (stopping_) {
+                    return;
+                }
+                task = task_;
+            }
+            task(id);
+            remaining_.fetch_sub(1, std::memory_order_release);
+        }
+    }
+
+    int size_;
+    std::vector<int> cpus_;
+    cpu_set_t caller_mask_;
+    std::vector<std::thread> workers_;
+    std::mutex mutex_;
+    std::condition_variable wake_;
+    std::function<void(int)> task_;
+    std::atomic<int> remaining_{0};
+    unsigned long long generation_ = 0;
+    bool stopping_ = false;
+};
+
+inline std::unique_ptr<ThreadPool>& shared_pool_slot() {
+    static std::unique_ptr<ThreadPool> pool;
+    return pool;
+}
+
+// 共享线程池的绑核 CPU 列表，空表示不绑核
+inline std::vector<int>& shared_pool_affinity() {
+    static std::vector<int> cpus;
+    return cpus;
+}
+
+// 按线程数复用同一个线程池，线程数或绑核列表变化时重建
+inline ThreadPool& shared_pool(int threads) {
+    std::unique_ptr<ThreadPool>& pool = shared_pool_slot();
+    if (!pool || pool->size() != threads || pool->cpus() != shared_pool_affinity()) {
+        pool.reset();
+        pool.reset(new ThreadPool(threads, shared_pool_affinity()));
+    }
+    return *pool;
+}
@@ -0,0 +1,56 @@
+#pragma once
+// 纳秒级计时与批量校准
+// gettimeofday 只有微秒分辨率，L1 范围内单次调用不到 1us，测出来的是量化误差。
+// 这里改用 CLOCK_MONOTONIC_RAW（不受 NTP 调频影响），并把若干次调用合成一个样本，
+// 批大小自动加倍到单个样本不少于 min_sample_ns（默认 100us），最后换算成每次调用的纳秒数。
+#include <time.h>
+#include <cstddef>
+#include <vector>
+
+inline double now_ns() {
+    struct timespec ts;
+    clock_gettime(CLOCK_MONOTONIC_RAW, &ts);
+    return ts.tv_sec * 1e9 + ts.tv_nsec;
+}
+
+inline double now_raw_us() {
+    return now_ns() / 1e3;
+}
+
+// 把结果写入 volatile 变量，防止编译器把结果没有被使用的内核调用整个优化掉
+inline volatile double benchmark_sink;
+
+inline void keep(double value) {
+    benchmark_sink = value;
+}
+
+// 连续调用 batch 次 func，返回总耗时（纳秒）
+template<typename Func>
+double time_batch(Func&& func, size_t batch) {
+    double start = now_ns();
+    for (size_t i = 0; i < batch; ++i) {
+        func();
+    }
+    return now_ns() - start;
+}
+
+// 批大小从 1 开始加倍，直到一批的耗时不少于 min_sample_ns
+template<typename Func>
+size_t calibrate_batch(Func&& func, double min_sample_ns = 1e5, size_t max_batch = size_t(1) << 30) {
+    size_t batch = 1;
+    while (batch < max_batch && time_batch(func, batch) < min_sample_ns) {
+        batch *= 2;
+    }
+    return batch;
+}
+
+// 每个样本为一批调用，返回每次调用的纳秒数
+template<typename Func>
+std::vector<double> time_batched(Func&& func, size_t batch, size_t samples) {
+    std::vector<double> per_call_ns;
+    per_call_ns.reserve(samples);
+    for (size_t s = 0; s < samples; ++s) {
+        per_call_ns.push_back(time_batch(func, batch) / batch);
+    }
+    return per_call_ns;
+}
@@ -0,0 +1,165 @@
+#pragma once
+// 工作窃取线程池：每个线程有自己的双端队列，spawn 把任务压到当前线程队列的尾部，
+// 自己从尾部取（后进先出，刚拆出来的子任务数据还在缓存里），空闲线程从别的队列头部偷
+// （先进先出，偷到的是靠近根的大任务）。wait 在等待期间继续执行任务，不会阻塞线程，
+// 适合递归拆分这类嵌套的 fork-join。队列用互斥锁保护，任务粒度由调用方的拆分阈值保证足够大。
+#include <atomic>
+#include <condition_variable>
+#include <deque>
+#include <functional>
+#include <memory>
+#include <mutex>
+#include <thread>
+#include <vector>
+
+class WorkStealingPool {
+public:
+    explicit WorkStealingPool(int threads) : queues_(threads < 1 ? 1 : threads) {
+        for (size_t id = 1; id < queues_.size(); ++id) {
+            workers_.emplace_back([this, id]() { work(static_cast<int>(id)); });
+        }
+    }
+
+    WorkStealingPool(const WorkStealingPool&) = delete;
+    WorkStealingPool& operator=(const WorkStealingPool&) = delete;
+
+    ~WorkStealingPool() {
+        {
+            std::lock_guard<std::mutex> lock(mutex_);
+            stopping_ = true;
+        }
+        wake_.notify_all();
+        for (std::thread& worker : workers_) {
+            worker.join();
+        }
+    }
+
+    int size() const { return static_cast<int>(queues_.size()); }
+
+    // 在调用线程（0 号）上执行 root，期间其他线程持续窃取 root 拆出来的任务
+    template<typename Func>
+    auto run(Func&& root) -> decltype(root()) {
+        current_worker() = 0;
+        {
+            std::lock_guard<std::mutex> lock(mutex_);
+            active_ = true;
+        }
+        wake_.notify_all();
+        auto result = root();
+        {
+            std::lock_guard<std::mutex> lock(mutex_);
+            active_ = false;
+        }
+        current_worker() = -1;
+        return result;
+    }
+
+    // pending 在任务执行完后减 1，由 wait(pending) 等待
+    void spawn(std::function<void()> task, std::atomic<int>& pending) {
+        Queue& queue = queues_[current_worker()];
+        std::lock_guard<std::mutex> lock(queue.mutex);
+        queue.tasks.push_back(Task{std::move(task), &pending});
+    }
+
+    void wait(std::atomic<int>& pending) {
+        const int id = current_worker();
+        while (pending.load(std::memory_order_acquire) > 0) {
+            if (!run_one(id)) {
+                std::this_thread::yield();
+            }
+        }
+    }
+
+private:
+    struct Task {
+        std::function<void()> run;
+        std::atomic<int>* pending;
+    };
+
+    struct Queue {
+        std::mutex mutex;
+        std::deque<Task> tasks;
+    };
+
+    static int& current_worker() {
+        static thread_local int id = -1;
+        return id;
+    }
+
+    bool pop_local(int id, Task& task) {
+        Queue& queue = queues_[id];
+        std::lock_guard<std::mutex> lock(queue.mutex);
+        if (queue.tasks.empty()) {
+            return false;
+        }
+        task = std::move(queue.tasks.back());
+        queue.tasks.pop_back();
+        return true;
+    }
+
+    bool steal(int id, Task& task) {
+        const int count = size();
+        for (int offset = 1; offset < count; ++offset) {
+            Queue& queue = queues_[(id + offset) % count];
+            std::lock_guard<std::mutex> lock(queue.mutex);
+            if (!queue.tasks.empty()) {
+                task = std::move(queue.tasks.front());
+                queue.tasks.pop_front();
+                return true;
+            }
+        }
+        return false;
+    }
+
+    bool run_one(int id) {
+        Task task;
+        if (!pop_local(id, task) && !steal(id, task)) {
+            return false;
+        }
+        task.run();
+        task.pending->fetch_sub(1, std::memory_order_release);
+        return true;
+    }
+
+    void work(int id) {
+        current_worker() = id;
+        for (;;) {
+            {
+                std::unique_lock<std::mutex> lock(mutex_);
+                wake_.wait(lock, [&]() { return active_ || stopping_; });
+                if (stopping_) {
+                    return;
+                }
+            }
+            // run 执行期间一直窃取，root 返回后回到条件变量上休眠
+            while (active_.load(std::memory_order_acquire) && !stopping_.load()) {
+                if (!run_one(id)) {
+                    std::this_thread::yield();
+                }
+            }
+        }
+    }
+
+    std::vector<Queue> queues_;
+    std::vector<std::thread> workers_;
+    std::mutex mutex_;
+    std::condition_variable wake_;
+    // 只在持有 mutex_ 时修改（避免丢失唤醒），窃取循环中无锁读取
+    std::atomic<bool> active_{false};
+    std::atomic<bool> stopping_{false};
+};
+
+inline std::unique_ptr<WorkStealingPool>& shared_stealing_pool_slot() {
+    static std::unique_ptr<WorkStealingPool> pool;
+    return pool;
+}
+
+// 按线程数复用同一个窃取线程池，线程数变化时重建
+inline WorkStealingPool& shared_stealing_pool(int threads) {
+    std::unique_ptr<WorkStealingPool>& pool = shared_stealing_pool_slot();
+    if (!pool || pool->size() != threads) {
+        pool.reset();
+        pool.reset(new WorkStealingPool(threads));
+    }
+    return *pool;
+}
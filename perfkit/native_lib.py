@@ -0,0 +1,28 @@
+import os
+import ctypes
+import subprocess
+
+# 加载 perfkit/native 下编译出的 libperfkit.so
+# 环境变量 PERFKIT_LIB 可以指定别的库文件（例如用其他编译器或编译选项构建的版本）；
+# 未指定时每次加载前先在 perfkit/native 下运行 make，源文件改动后自动重新构建（已是最新时 make 什么也不做）。
+
+NATIVE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'native')
+LIB_NAME = 'libperfkit.so'
+
+_lib = None
+
+
+def library_path():
+    return os.environ.get('PERFKIT_LIB') or os.path.join(NATIVE_DIR, LIB_NAME)
+
+
+def load_library():
+    global _lib
+    if _lib is None:
+        path = library_path()
+        if 'PERFKIT_LIB' not in os.environ:
+            result = subprocess.run(['make', '-C', NATIVE_DIR], capture_output=True, text=True)
+            if result.returncode != 0:
+                raise OSError(f'构建 {LIB_NAME} 失败，请在 {NATIVE_DIR} 下运行 make:\n{result.stderr}')
+        _lib = ctypes.CDLL(path)
+    return _lib
@@ -0,0 +1,134 @@
+import os
+import csv
+import time
+import shlex
+import argparse
+import subprocess
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from perfkit import topology
+from perfkit.topology import parse_cpu_list, read_sys
+
+# 基准测试调度器：替代 run_perf_all.sh 的串行循环
+# 规模 × 程序 的每个组合是一个任务，分发到一组（隔离的）CPU 上并行运行：
+# 每个物理核心只选一个逻辑 CPU，所以同一时刻每个物理核心最多运行一个任务；
+# 工作进程启动时用 os.sched_setaffinity 绑定到自己的 CPU，被测程序继承该绑定。
+# 被测程序以 --csv 模式运行，在标准输出打印 表头 + 结果行，直接按 CSV 读取。
+
+# run_perf_all.sh 原来的参数列表
+DEFAULT_SIZES = [10, 20, 30, 50, 70, 100, 200, 400, 450, 500, 550, 600, 700, 800, 900, 1000,
+                 1300, 1400, 1500, 1600, 1700, 1800, 1900, 2000, 2200, 3000, 4000]
+
+_worker_cpu = None
+
+
+def default_cpus():
+    # 优先使用内核参数 isolcpus 隔离出来的 CPU，否则使用当前进程允许的全部 CPU
+    isolated = parse_cpu_list(read_sys('/sys/devices/system/cpu/isolated'))
+    return isolated or sorted(os.sched_getaffinity(0))
+
+
+def physical_cores(cpus):
+    # 每个物理核心只保留一个逻辑 CPU（超线程的兄弟线程不再单独调度任务）
+    selected = []
+    seen = set()
+    for cpu in sorted(cpus):
+        siblings = read_sys(f'/sys/devices/system/cpu/cpu{cpu}/topology/thread_siblings_list')
+        core = tuple(parse_cpu_list(siblings)) if siblings else (cpu,)
+        if core not in seen:
+            seen.add(core)
+            selected.append(cpu)
+    return selected
+
+
+def numa_spread(cpus):
+    # 把 CPU 按 NUMA 节点轮流排列：第 t 个线程落在节点 t % 节点数 上，
+    # 线程数少于核心数时也能用上每个节点的内存控制器
+    per_node = [[cpu for cpu in cpus if cpu in set(node_cpus)]
+                for node_cpus in topology.numa_nodes().values()]
+    per_node = [node_cpus for node_cpus in per_node if node_cpus]
+    spread = []
+    for i in range(max(map(len, per_node), default=0)):
+        spread.extend(node_cpus[i] for node_cpus in per_node if i < len(node_cpus))
+    # 不属于任何节点的 CPU 排在最后
+    return spread + [cpu for cpu in cpus if cpu not in spread]
+
+
+def _pin_worker(cpu_queue):
+    global _worker_cpu
+    _worker_cpu = cpu_queue.get()
+    os.sched_setaffinity(0, {_worker_cpu})
+
+
+def run_job(job):
+    program, size, arg_template = job
+    args = [program] + [arg.format(size=size) for arg in shlex.split(arg_template)]
+    start = time.perf_counter()
+    proc = subprocess.run(args, capture_output=True, text=True)
+    wall_time = time.perf_counter() - start
+
+    base = {'program': os.path.basename(program), 'size': size, 'cpu': _worker_cpu,
+            'wall_time_s': round(wall_time, 6), 'returncode': proc.returncode}
+    if proc.returncode != 0:
+        return [dict(base, error=proc.stderr.strip()[-200:])]
+    rows = list(csv.DictReader(line for line in proc.stdout.splitlines() if line.strip()))
+    return [dict(base, **row) for row in rows] or [dict(base, error='没有CSV输出')]
+
+
+def run_sweep(programs, sizes, cpus, arg_template='{size} --csv'):
+    cores = physical_cores(cpus)
+    cpu_queue = multiprocessing.Queue()
+    for cpu in cores:
+        cpu_queue.put(cpu)
+
+    # 大规模任务先提交，缩短整轮的拖尾时间
+    jobs = [(program, size, arg_template) for size in sorted(sizes, reverse=True) for program in programs]
+    results = []
+    with ProcessPoolExecutor(max_workers=len(cores), initializer=_pin_worker,
+                             initargs=(cpu_queue,)) as executor:
+        futures = [executor.submit(run_job, job) for job in jobs]
+        for done, future in enumerate(as_completed(futures), 1):
+            rows = future.result()
+            row = rows[0]
+            status = '失败: ' + row['error'] if 'error' in row else 'OK'
+            print(f"[{done}/{len(jobs)}] {row['program']} 规模={row['size']} CPU={row['cpu']} "
+                  f"{row['wall_time_s']:.2f}s {status}")
+            results.extend(rows)
+
+    results.sort(key=lambda r: (r['program'], r['size']))
+    return results, cores
+
+
+def save_to_csv(results, output_file):
+    fieldnames = []
+    for row in results:
+        for key in row:
+            if key not in fieldnames:
+                fieldnames.append(key)
+    with open(output_file, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.DictWriter(file, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='按物理核心并行、绑核运行 规模 × 程序 的基准测试')
+    parser.add_argument('--program', action='append', required=True, help='被测程序，可重复指定')
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)), help='逗号分隔的规模列表')
+    parser.add_argument('--cpus', default=None, help='可用 CPU 列表，如 2-11；默认取隔离的 CPU 或全部 CPU')
+    parser.add_argument('--args', default='{size} --csv', help='程序参数模板，{size} 替换为规模')
+    parser.add_argument('-o', '--output', default='sweep_results.csv', help='输出 CSV 文件')
+    args = parser.parse_args()
+
+    cpus = parse_cpu_list(args.cpus) if args.cpus else default_cpus()
+    sizes = [int(size) for size in args.sizes.split(',') if size]
+    results, cores = run_sweep(args.program, sizes, cpus, args.args)
+    save_to_csv(results, args.output)
+    # 以任务实际运行的第一个 CPU 的缓存信息为准
+    topology.record(args.output, topology.detect(cores[0]))
+    print(f"✅ 在 {len(cores)} 个物理核心 {cores} 上完成 {len(results)} 个任务，结果已保存到 {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+import math
+import argparse
+import itertools
+
+import numpy as np
+
+from perfkit import ingest, topology
+from perfkit.harness import time_batched, summarize
+from perfkit.kernels import recursive_sum, recursive_sum_batch_timer, sum_batch_timer, buffer_address
+from perfkit.scaling import default_thread_counts
+
+# 递归两两相加的叶子大小 / 任务拆分阈值扫描
+# 对每个 (规模, 线程数, 叶子大小, 拆分阈值) 计时，并与单线程的平凡算法和原来一直递归到单个元素的
+# recursive 比较速度；精度用相对 math.fsum（精确求和）的相对误差衡量，平凡算法的误差一并列出。
+# 单线程时不拆分任务，拆分阈值没有意义，每个叶子大小只测一次。
+
+DEFAULT_SIZES = [65536, 1048576, 8388608, 33554432]
+DEFAULT_LEAVES = [16, 64, 256, 1024, 4096, 16384]
+DEFAULT_SPAWN_THRESHOLDS = [32768, 131072, 524288, 2097152]
+
+
+def relative_error(value, exact):
+    return abs(value - exact) / abs(exact) if exact else abs(value)
+
+
+def configurations(thread_counts, leaves, spawn_thresholds):
+    for threads, leaf in itertools.product(thread_counts, leaves):
+        if threads == 1:
+            yield threads, leaf, None
+        else:
+            for spawn_threshold in spawn_thresholds:
+                if spawn_threshold > leaf:
+                    yield threads, leaf, spawn_threshold
+
+
+def sweep(sizes, thread_counts, leaves, spawn_thresholds, repeats=5, min_sample_ns=1e6, seed=0):
+    data = np.random.default_rng(seed).uniform(-100.0, 100.0, max(sizes))
+    address = buffer_address(data)
+    timer = recursive_sum_batch_timer()
+    baselines = {name: sum_batch_timer(name) for name in ('naive', 'recursive')}
+    rows = []
+    for size in sizes:
+        exact = math.fsum(data[:size])
+        base = {}
+        for name, baseline in baselines.items():
+            times_ns, _, _ = time_batched(lambda batch: baseline(address, None, size, batch), repeats, min_sample_ns)
+            base[name] = summarize(times_ns, [])['median_ns']
+        naive_error = relative_error(float(np.cumsum(data[:size])[-1]), exact)
+
+        for threads, leaf, spawn_threshold in configurations(thread_counts, leaves, spawn_thresholds):
+            # 单线程时 spawn_threshold 取规模本身，不会拆出任何任务
+            spawn = spawn_threshold or size
+            row = {'size': size, 'threads': threads, 'leaf': leaf, 'spawn_threshold': spawn_threshold}
+            row.update(summarize(*time_batched(
+                lambda batch: timer(address, size, leaf, spawn, threads, batch), repeats, min_sample_ns)))
+            row['gbps'] = size * 8 / row['median_ns']
+            row['speedup_vs_naive'] = base['naive'] / row['median_ns']
+            row['speedup_vs_recursive'] = base['recursive'] / row['median_ns']
+            row['relative_error'] = relative_error(recursive_sum(address, size, leaf, spawn, threads), exact)
+            row['naive_relative_error'] = naive_error
+            rows.append(row)
+            print(f"n={size:<10} p={threads:<3} leaf={leaf:<6} spawn={spawn_threshold or '-':<8} "
+                  f"{row['median_ns'] / 1e3:.1f} us  {row['speedup_vs_naive']:.2f}x naive  "
+                  f"误差 {row['relative_error']:.1e}")
+    return rows
+
+
+def best_configurations(rows):
+    # 每个 (规模, 线程数) 最快的叶子大小和拆分阈值
+    best = {}
+    for row in rows:
+        key = (row['size'], row['threads'])
+        if key not in best or row['median_ns'] < best[key]['median_ns']:
+            best[key] = row
+    return [best[key] for key in sorted(best)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='扫描递归两两相加的叶子大小和任务拆分阈值')
+    parser.add_argument('--sizes', default=None, help='逗号分隔的规模列表')
+    parser.add_argument('--threads', default=None, help='逗号分隔的线程数，默认 1,2,4,... 直到物理核心数')
+    parser.add_argument('--leaves', default=None, help='逗号分隔的叶子大小')
+    parser.add_argument('--spawn-thresholds', default=None, help='逗号分隔的任务拆分阈值（元素个数）')
+    parser.add_argument('-r', '--repeats', type=int, default=5, help='每个数据点的重复次数')
+    parser.add_argument('--min-sample-us', type=float, default=1000.0, help='每个样本的最短时长（微秒）')
+    parser.add_argument('-o', '--output', default='pairwise_sweep.csv', help='输出 CSV 文件')
+    args = parser.parse_args()
+
+    def int_list(text, default):
+        return [int(item) for item in text.split(',') if item] if text else default
+
+    rows = sweep(int_list(args.sizes, DEFAULT_SIZES),
+                 int_list(args.threads, default_thread_counts()),
+                 int_list(args.leaves, DEFAULT_LEAVES),
+                 int_list(args.spawn_thresholds, DEFAULT_SPAWN_THRESHOLDS),
+                 args.repeats, args.min_sample_us * 1e3)
+
+    print("\n每个 (规模, 线程数) 的最佳配置:")
+    for row in best_configurations(rows):
+        print(f"n={row['size']:<10} p={row['threads']:<3} leaf={row['leaf']:<6} "
+              f"spawn={row['spawn_threshold'] or '-':<8} {row['speedup_vs_naive']:.2f}x naive, "
+              f"{row['speedup_vs_recursive']:.1f}x recursive")
+
+    ingest.save_to_csv(rows, args.output,
+                       ingest.table_fields(rows, leading=('size', 'threads', 'leaf', 'spawn_threshold')))
+    topology.record(args.output)
+    print(f"✅ 共 {len(rows)} 个数据点，已保存到 {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,231 @@
+import os
+import re
+import json
+
+# perf stat 输出的单遍流式解析器
+# 每个文件只按行读取一次，用一个预编译的正则匹配所有 "<数值> <pmu>/<事件>/" 行，
+# PMU 可以是 cpu_core、cpu_atom 或者没有（非混合架构机器上的 "cycles" 等）。
+# 解析结果是一个扁平字典，键名形如 cpu_core_instructions、cycles、task_clock。
+# 同一遍扫描中顺带提取被测程序自己打印的 "平均时间"/"加速比" 输出。
+# perf stat -x, (CSV) 和 -j (JSON) 的机器可读输出走快速路径：直接 split / json.loads，
+# 每个计数器都记录 <字段>_run_pct（计数器实际运行时间占比，文本格式中省略时为 100%），
+# 机器可读格式在 -r 时还有 <字段>_variance（波动）。
+# collect_perf.sh 会把事件拆成多组、分多轮追加写入同一个文件，同名字段（task-clock、
+# time elapsed 等每轮都有）取各轮的平均值。
+
+# 解析结果的字段或格式变化时加 1，perfkit.cache 据此作废旧的缓存
+PARSER_VERSION = 4
+
+_COUNTER_RE = re.compile(
+    r'^\s*(?P<value>[0-9][0-9,]*(?:\.[0-9]+)?|<not counted>|<not supported>)'
+    r'(?:\s+\+-\s+[0-9.,]+)?\s+'
+    r'(?:(?P<unit>msec|seconds)\s+)?'
+    r'(?:(?P<pmu>[A-Za-z_][\w-]*)/(?P<pmu_event>[^/\s]+)/\S*'
+    r'|(?P<event>[A-Za-z][\w.:-]*(?: elapsed)?))'
+    r'(?:.*\((?P<pct>[0-9.]+)%\))?'
+)
+
+# 被测程序输出: "=== Naive 算法统计 ===" 段标题、"平均时间: 585.10 us"（--adaptive 时为 "中位数时间"）、"加速比(Naive/Optimized): 1.77x"
+_OUTPUT_RE = re.compile(
+    r'^\s*(?:===\s*(?P<section>.+?)\s*==='
+    r'|(?:平均|中位数)时间:?\s*(?P<avg>[0-9.]+)\s*us'
+    r'|加速比\(Naive/Optimized\):\s*(?P<speedup>[0-9.]+)x)'
+)
+
+# "seconds" 单位的行对应的字段名，与 perf_data_output.csv 保持一致
+_SECONDS_FIELDS = {
+    'time elapsed': 'elapsed_time',
+    'user': 'user_time',
+    'sys': 'sys_time',
+}
+
+
+def event_key(event, pmu=None):
+    # 事件名转换为字段名: cpu_core + L1-dcache-load-misses -> cpu_core_L1_dcache_load_misses
+    name = event.split(':', 1)[0].replace('-', '_').replace('.', '_')
+    return f"{pmu.replace('-', '_')}_{name}" if pmu else name
+
+
+def lookup_counter(record, key):
+    # 非混合架构机器上没有 cpu_core/ 前缀，cpu_core_xxx 退回到同名的 xxx
+    if key in record:
+        return record[key]
+    if key.startswith('cpu_core_'):
+        return record.get(key[len('cpu_core_'):])
+    return None
+
+
+def parse_number(text):
+    text = text.replace(',', '')
+    return float(text) if '.' in text else int(text)
+
+
+def split_event(name):
+    # "cpu_core/instructions/" -> ("cpu_core", "instructions")，无 PMU 时返回 (None, name)
+    if '/' in name:
+        pmu, event = name.split('/')[:2]
+        return pmu, event
+    return None, name
+
+
+def _machine_number(text, unit):
+    value = float(text)
+    return int(value) if not unit and value.is_integer() else value
+
+
+def _store(samples, key, value, run_pct=None, variance=None):
+    samples.setdefault(key, []).append(value)
+    if run_pct is not None:
+        samples.setdefault(f'{key}_run_pct', []).append(run_pct)
+    if variance is not None:
+        samples.setdefault(f'{key}_variance', []).append(variance)
+
+
+def _merge_passes(samples):
+    # 多轮 perf stat 追加到同一文件时，同名字段取平均值
+    merged = {}
+    for key, values in samples.items():
+        if len(values) == 1:
+            merged[key] = values[0]
+        elif all(isinstance(value, int) for value in values):
+            merged[key] = round(sum(values) / len(values))
+        else:
+            merged[key] = sum(values) / len(values)
+    return merged
+
+
+# 混合架构上的 PMU 前缀
+HYBRID_PMUS = ('cpu_core', 'cpu_atom')
+
+
+def _hybrid_pmu(key):
+    for pmu in HYBRID_PMUS:
+        if key.startswith(f'{pmu}_'):
+            return pmu
+    return None
+
+
+def multiplexed_events(record, threshold=99.0):
+    # 实际计数时间占比不足的字段（保留 cpu_core_ / cpu_atom_ 前缀）。
+    # 混合架构上任务不在某类核心上运行时，该 PMU 的所有事件都不足 100%（没运行过时为 <not counted>，不记录），
+    # 这不是分时复用；因此以同一 PMU 上运行占比最高的事件作为该 PMU 实际工作的时间，
+    # 只有明显低于它的事件才是分时复用。没有 PMU 前缀的事件以 100% 为准
+    coverage = {key[:-len('_run_pct')]: value for key, value in record.items() if key.endswith('_run_pct')}
+    active = {}
+    for event, run_pct in coverage.items():
+        pmu = _hybrid_pmu(event)
+        active[pmu] = max(active.get(pmu, 0.0), run_pct)
+    events = []
+    for event, run_pct in coverage.items():
+        pmu = _hybrid_pmu(event)
+        reference = active[pmu] if pmu else 100.0
+        if reference > 0 and run_pct < reference * threshold / 100.0:
+            events.append(event)
+    return sorted(events)
+
+
+def _parse_csv_line(samples, line, sep=','):
+    # 字段: 数值, 单位, 事件, [波动%,] 运行时间, 运行占比%, [指标值, 指标单位]
+    fields = line.rstrip('\n').split(sep)
+    if len(fields) < 3 or not (fields[1] == '' or fields[1].isalpha()):
+        return False
+    value, unit, event = fields[0], fields[1], fields[2]
+    if value.startswith('<'):
+        return True
+
+    rest = fields[3:]
+    variance = None
+    if rest and rest[0].endswith('%'):
+        variance = float(rest[0][:-1])
+        rest = rest[1:]
+    run_pct = float(rest[1]) if len(rest) > 1 and rest[1] else None
+
+    pmu, name = split_event(event)
+    _store(samples, event_key(name, pmu), _machine_number(value, unit), run_pct, variance)
+    return True
+
+
+def _parse_json_line(samples, line):
+    try:
+        entry = json.loads(line)
+    except ValueError:
+        return
+    value = str(entry.get('counter-value', ''))
+    if 'event' not in entry or not value or value.startswith('<'):
+        return
+
+    unit = entry.get('unit', '')
+    variance = entry.get('variance')
+    run_pct = entry.get('pcnt-running')
+    pmu, name = split_event(entry['event'])
+    _store(samples, event_key(name, pmu), _machine_number(value, unit),
+           None if run_pct is None else float(run_pct),
+           None if variance is None else float(variance))
+
+
+def _section_field(section):
+    # 根据所在段落决定平均时间写入哪个字段
+    if section is None:
+        return 'avg_time_us'
+    if 'Naive' in section:
+        return 'naive_time_us'
+    if '优化' in section:
+        return 'optimized_time_us'
+    return None
+
+
+def parse_perf_lines(lines):
+    record = {}
+    samples = {}
+    section = None
+    for line in lines:
+        # 机器可读格式: JSON 行以 "{" 开头，CSV 行顶格以数值开头（文本格式的数值前有缩进）
+        first = line[:1]
+        if first == '{':
+            _parse_json_line(samples, line)
+            continue
+        if (first.isdigit() or first == '<') and _parse_csv_line(samples, line):
+            continue
+
+        match = _COUNTER_RE.match(line)
+        if not match:
+            match = _OUTPUT_RE.match(line)
+            if not match:
+                continue
+            if match.group('section'):
+                section = match.group('section')
+            elif match.group('avg'):
+                field = _section_field(section)
+                if field:
+                    record[field] = float(match.group('avg'))
+            else:
+                record['speedup'] = float(match.group('speedup'))
+            continue
+        value = match.group('value')
+        if value.startswith('<'):
+            # <not counted> / <not supported> 不写入记录，由调用方决定默认值
+            continue
+
+        if match.group('unit') == 'seconds':
+            key = _SECONDS_FIELDS.get(match.group('event'))
+            if key is not None:
+                _store(samples, key, parse_number(value))
+            continue
+
+        if match.group('pmu'):
+            key = event_key(match.group('pmu_event'), match.group('pmu'))
+        else:
+            key = event_key(match.group('event'))
+        # perf 只在计数器没有全程运行时才打印 (xx.xx%)
+        pct = match.group('pct')
+        _store(samples, key, parse_number(value), float(pct) if pct else 100.0)
+
+    record.update(_merge_passes(samples))
+    return record
+
+
+def parse_perf_file(file_path):
+    with open(file_path, 'r', encoding='utf-8', errors='replace') as file:
+        record = parse_perf_lines(file)
+    record['file_name'] = os.path.basename(file_path)
+    return record
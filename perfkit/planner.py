@@ -0,0 +1,160 @@
+import sys
+import math
+import time
+import statistics
+import argparse
+
+from perfkit import topology
+
+# 按缓存边界安排扫描规模
+# 手工挑选的规模列表（1024…67108864、10…4000）大多落在远离 L1/L2/L3 转折的位置。
+# 这里根据检测到的缓存容量和内核每个元素占用的字节数，在每个容量拐点附近密集取点，
+# 其余区间只稀疏取点；测量之后再在曲线斜率（log 时间 - log 规模）
+# 偏离最大的区间插入几何中点，直到时间预算或加点数用完。
+# 初始规模数由 max_points 限定（默认约为手工列表 27 个的一半），每个拐点的点数和粗网格的点数都由它推出；
+# refine 最多再加一半，总点数仍少于手工列表。
+
+# 拐点附近取点的范围: [容量 / KNEE_SPAN, 容量 * KNEE_SPAN]
+KNEE_SPAN = 2.0
+# 初始规模数的默认上限，其中约 3/4 分给各拐点，其余给粗网格
+DEFAULT_MAX_POINTS = 12
+KNEE_SHARE = 0.75
+
+
+def footprint_bytes(size, bytes_per_element=8, matrix=False):
+    # 规模 -> 工作集字节数；矩阵按 n×n 个元素计算
+    elements = size * size if matrix else size
+    return elements * bytes_per_element
+
+
+def size_for_bytes(nbytes, bytes_per_element=8, matrix=False):
+    elements = nbytes / bytes_per_element
+    return max(1, int(round(math.sqrt(elements) if matrix else elements)))
+
+
+def log_spaced(low, high, count):
+    # [low, high] 内按对数等间距取 count 个整数规模
+    if count <= 1 or high <= low:
+        return [int(round(low))]
+    ratio = (high / low) ** (1.0 / (count - 1))
+    return [int(round(low * ratio ** i)) for i in range(count)]
+
+
+def knee_windows(topo, bytes_per_element=8, matrix=False):
+    # 每级缓存容量对应的规模区间 (下界, 上界)
+    windows = []
+    for capacity in topology.cache_sizes(topo).values():
+        center = size_for_bytes(capacity, bytes_per_element, matrix)
+        windows.append((center / KNEE_SPAN, center * KNEE_SPAN))
+    return windows
+
+
+def knee_sizes(topo, bytes_per_element=8, matrix=False, points_per_knee=7):
+    sizes = []
+    for low, high in knee_windows(topo, bytes_per_element, matrix):
+        sizes.extend(log_spaced(low, high, points_per_knee))
+    return sizes
+
+
+def allocate_points(max_points, knees):
+    # 返回 (每个拐点的点数, 粗网格点数)；每个拐点至少 3 个点（下界、容量、上界）
+    if knees == 0:
+        return 0, max(2, max_points)
+    points_per_knee = max(3, int(max_points * KNEE_SHARE) // knees)
+    return points_per_knee, max(2, max_points - points_per_knee * knees)
+
+
+def plan(topo, bytes_per_element=8, matrix=False, min_size=None, max_size=None, max_points=DEFAULT_MAX_POINTS):
+    capacities = sorted(topology.cache_sizes(topo).values())
+    if min_size is None:
+        min_size = size_for_bytes(capacities[0] / 8 if capacities else 4096, bytes_per_element, matrix)
+    if max_size is None:
+        max_size = size_for_bytes(capacities[-1] * 4 if capacities else 2 ** 29, bytes_per_element, matrix)
+
+    # 稀疏的粗网格覆盖拐点之外的范围，再叠加每个拐点附近的密集点
+    windows = knee_windows(topo, bytes_per_element, matrix)
+    points_per_knee, coarse_points = allocate_points(max_points, len(windows))
+    sizes = [size for size in log_spaced(min_size, max_size, coarse_points)
+             if not any(low <= size <= high for low, high in windows)]
+    sizes += knee_sizes(topo, bytes_per_element, matrix, points_per_knee)
+    return sorted({size for size in sizes if min_size <= size <= max_size})
+
+
+def describe_plan(sizes, legacy_sizes):
+    return f"规划 {len(sizes)} 个规模，手工列表 {len(legacy_sizes)} 个（{len(sizes) / len(legacy_sizes):.0%}）"
+
+
+def interval_scores(curves):
+    # curves: {规模: {曲线名: 时间}}；返回每个相邻区间 (规模i, 规模i+1) 的得分。
+    # 以整条曲线 log-log 斜率的中位数作为正常增长，得分为区间内 log 时间的增量超出正常增长的部分
+    # （即每元素耗时的跳变），跨过缓存拐点的区间得分高；不按区间宽度放大，窄区间的噪声不会被放大。
+    sizes = sorted(curves)
+    scores = {}
+    names = {name for values in curves.values() for name in values}
+    for name in names:
+        points = [(size, curves[size][name]) for size in sizes
+                  if curves[size].get(name, 0) > 0]
+        if len(points) < 3:
+            continue
+        steps = [(x1, x2, math.log(x2 / x1), math.log(y2 / y1))
+                 for (x1, y1), (x2, y2) in zip(points, points[1:])]
+        typical = statistics.median(dy / dx for _, _, dx, dy in steps)
+        for x1, x2, dx, dy in steps:
+            score = abs(dy - typical * dx)
+            scores[(x1, x2)] = max(scores.get((x1, x2), 0.0), score)
+    return scores
+
+
+def refinement_sizes(curves, threshold=0.1, min_ratio=1.2, batch=4):
+    # 选出得分超过 threshold、且两端规模相差超过 min_ratio 的区间，返回它们的几何中点
+    scores = interval_scores(curves)
+    candidates = sorted(((score, low, high) for (low, high), score in scores.items()
+                         if score > threshold and high / low > min_ratio), reverse=True)
+    new_sizes = []
+    for _, low, high in candidates:
+        middle = int(round(math.sqrt(low * high)))
+        if low < middle < high and middle not in curves and middle not in new_sizes:
+            new_sizes.append(middle)
+        if len(new_sizes) >= batch:
+            break
+    return sorted(new_sizes)
+
+
+def refine(measure, sizes, budget_s, threshold=0.1, min_ratio=1.2, batch=4, max_points=None):
+    # measure(规模列表) -> {规模: {曲线名: 时间}}；先测完初始规模，再逐批加密，
+    # 直到预算用完、加点数达到 max_points（默认为初始点数的一半）或没有需要加密的区间
+    deadline = time.monotonic() + budget_s
+    max_points = len(sizes) // 2 if max_points is None else max_points
+    curves = dict(measure(sorted(sizes)))
+    added = 0
+    while time.monotonic() < deadline and added < max_points:
+        new_sizes = refinement_sizes(curves, threshold, min_ratio, min(batch, max_points - added))
+        if not new_sizes:
+            break
+        curves.update(measure(new_sizes))
+        added += len(new_sizes)
+    return curves
+
+
+def main():
+    parser = argparse.ArgumentParser(description='根据缓存拓扑生成扫描规模列表（逗号分隔，可直接传给 --sizes）')
+    parser.add_argument('--bytes-per-element', type=int, default=8, help='每个元素占用的字节数')
+    parser.add_argument('--matrix', action='store_true', help='规模为 n×n 矩阵的边长')
+    parser.add_argument('--min-size', type=int, default=None, help='最小规模，默认 L1 的 1/8')
+    parser.add_argument('--max-size', type=int, default=None, help='最大规模，默认最后一级缓存的 4 倍')
+    parser.add_argument('--max-points', type=int, default=DEFAULT_MAX_POINTS, help='初始规模数的上限')
+    parser.add_argument('--topology', default=None, help='使用记录下来的拓扑 JSON，默认检测本机')
+    args = parser.parse_args()
+
+    # harness 导入了本模块，在这里再导入以取得手工列表
+    from perfkit.harness import DEFAULT_SUM_SIZES, DEFAULT_MATVEC_SIZES
+
+    topo = topology.load(args.topology) if args.topology else topology.detect()
+    sizes = plan(topo, args.bytes_per_element, args.matrix, args.min_size, args.max_size, args.max_points)
+    # 规模列表输出到标准输出（供脚本读取），对比信息输出到标准错误
+    print(describe_plan(sizes, DEFAULT_MATVEC_SIZES if args.matrix else DEFAULT_SUM_SIZES), file=sys.stderr)
+    print(','.join(map(str, sizes)))
+
+
+if __name__ == '__main__':
+    main()
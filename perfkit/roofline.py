@@ -0,0 +1,295 @@
+import sys
+import csv
+import json
+import ctypes
+import argparse
+import statistics
+
+import numpy as np
+
+from perfkit import topology, costmodel
+from perfkit.harness import time_batched
+from perfkit.kernels import aligned_array, buffer_address
+from perfkit.native_lib import load_library
+from perfkit.orchestrator import default_cpus, physical_cores
+
+# 经验 roofline
+# 用 libperfkit.so 里的 STREAM 风格内核（copy/scale/add/triad/read）分别在 L1、L2、L3 和内存大小的
+# 工作集上测持续带宽（单核和全部核心），再测标量 / SIMD 浮点加法的峰值吞吐，得到 roofline 的各条上限。
+# 报告阶段把 add/ 和 matrix/ 的测量结果按算术强度放到 roofline 上：每个数据点按工作集大小
+# 对应到所在层级的带宽上限，给出达到上限的比例——接近 1 的内核（例如内存区的求和）已经受带宽限制，
+# 再怎么优化指令也没有收益。
+
+ROOFLINE_FILE_NAME = 'roofline.json'
+
+# 内存层工作集上限（三个数组合计），避免 LLC 很大的机器上分配过多内存
+MAX_DRAM_BYTES = 1024 ** 3
+
+# 每个元素的浮点运算次数；求和每个 double 一次加法，矩阵向量每个矩阵元素一次乘加。
+# 流量只计主数据（数组 / 矩阵 A），矩阵向量中 O(n) 的 v 和结果可以忽略
+FLOPS_PER_ELEMENT = {'sum': 1, 'matvec': 2}
+
+_lib = None
+
+
+def _bench_lib():
+    global _lib
+    if _lib is None:
+        lib = load_library()
+        lib.pk_stream_kernel_name.restype = ctypes.c_char_p
+        lib.pk_time_stream.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_void_p, ctypes.c_void_p,
+                                       ctypes.c_size_t, ctypes.c_int, ctypes.c_size_t]
+        lib.pk_time_stream.restype = ctypes.c_double
+        lib.pk_flop_kernel_name.restype = ctypes.c_char_p
+        lib.pk_time_flops.argtypes = [ctypes.c_int, ctypes.c_size_t, ctypes.c_int]
+        lib.pk_time_flops.restype = ctypes.c_double
+        _lib = lib
+    return _lib
+
+
+def stream_kernels():
+    # [(名字, 每个元素读写的字节数)]
+    lib = _bench_lib()
+    return [(lib.pk_stream_kernel_name(i).decode(), lib.pk_stream_kernel_bytes(i))
+            for i in range(lib.pk_stream_kernel_count())]
+
+
+def flop_kernels():
+    # [(编号, 名字, 每次迭代的浮点运算数)]，只列出本机支持的内核（avx2_fma / avx512_fma 需要对应的指令集）
+    lib = _bench_lib()
+    return [(i, lib.pk_flop_kernel_name(i).decode(), lib.pk_flop_kernel_flops(i))
+            for i in range(lib.pk_flop_kernel_count()) if lib.pk_flop_kernel_supported(i)]
+
+
+def working_sets(topo, threads=1):
+    # 每个线程的工作集字节数：每级缓存取容量的一半；最后一级缓存由所有线程分摊，其余按每核私有；
+    # 内存层取最后一级缓存的 4 倍（不超过 MAX_DRAM_BYTES）
+    sizes = topology.cache_sizes(topo)
+    levels = sorted(sizes)
+    result = {}
+    for level in levels:
+        share = sizes[level] / threads if level == levels[-1] else sizes[level]
+        result[level] = share / 2
+    result['DRAM'] = min(sizes[levels[-1]] * 4, MAX_DRAM_BYTES) / threads
+    return result
+
+
+def measure_bandwidth(topo, threads=1, repeats=5, min_sample_ns=1e6):
+    lib = _bench_lib()
+    rows = []
+    for level, nbytes in working_sets(topo, threads).items():
+        # 三个数组一起放进该级缓存；按 64 字节对齐，否则每次 AVX-512 加载都跨缓存行，上限被低估近一半
+        n = max(64, int(nbytes / 24))
+        a, b, c = (aligned_array(n * threads) for _ in range(3))
+        a[:] = 1.0
+        b[:] = 2.0
+        addresses = [buffer_address(array) for array in (a, b, c)]
+        for kernel_id, (name, bytes_per_element) in enumerate(stream_kernels()):
+            def run_batch(batch, kernel_id=kernel_id):
+                return lib.pk_time_stream(kernel_id, *addresses, n, threads, batch)
+            times_ns, _, batch = time_batched(run_batch, repeats, min_sample_ns)
+            moved = n * threads * bytes_per_element
+            # 与 STREAM 一样以最好的一次作为上限，同时给出中位数
+            rows.append({
+                'level': level,
+                'kernel': name,
+                'threads': threads,
+                'elements_per_thread': n,
+                'batch': batch,
+                'gbps': moved / min(times_ns),
+                'median_gbps': moved / statistics.median(times_ns),
+            })
+            print(f"  {level:>4} {name:>6} x{threads}: {rows[-1]['gbps']:.2f} GB/s")
+    return rows
+
+
+def measure_peak_flops(threads=1, repeats=5, min_sample_ns=1e6):
+    lib = _bench_lib()
+    rows = []
+    for kernel_id, name, flops_per_iteration in flop_kernels():
+        def run_batch(iterations, kernel_id=kernel_id):
+            return lib.pk_time_flops(kernel_id, iterations, threads)
+        # 批大小就是迭代次数，换算后每个样本是单次迭代的纳秒数
+        times_ns, _, iterations = time_batched(run_batch, repeats, min_sample_ns)
+        rows.append({
+            'kernel': name,
+            'threads': threads,
+            'iterations': iterations,
+            'gflops': flops_per_iteration * threads / min(times_ns),
+            'median_gflops': flops_per_iteration * threads / statistics.median(times_ns),
+        })
+        print(f"  {name:>10} x{threads}: {rows[-1]['gflops']:.2f} GFLOP/s")
+    return rows
+
+
+def measure(topo=None, thread_counts=(1,), repeats=5, min_sample_ns=1e6):
+    topo = topo or topology.detect()
+    bandwidth = []
+    flops = []
+    for threads in thread_counts:
+        bandwidth += measure_bandwidth(topo, threads, repeats, min_sample_ns)
+        flops += measure_peak_flops(threads, repeats, min_sample_ns)
+    return {'topology': topo, 'bandwidth': bandwidth, 'flops': flops}
+
+
+def ceilings(results, threads=1, stream_kernel='read', flop_kernel=None):
+    # 选出 roofline 的上限：{'bandwidth_gbps': {层级: GB/s}, 'peak_gflops': GFLOP/s}。
+    # 被测的求和和矩阵向量内核以读为主，默认用只读内核的带宽；
+    # 计算上限默认取本机支持的最快浮点内核（peak_gflops），指定 flop_kernel 时只看该内核
+    bandwidth = {row['level']: row['gbps'] for row in results['bandwidth']
+                 if row['threads'] == threads and row['kernel'] == stream_kernel}
+    if flop_kernel is None:
+        peak = peak_gflops(results, threads)
+    else:
+        peak = max(row['gflops'] for row in results['flops']
+                   if row['threads'] == threads and row['kernel'] == flop_kernel)
+    return {'bandwidth_gbps': bandwidth, 'peak_gflops': peak}
+
+
+def peak_gflops(results, threads=1):
+    # 给定线程数下所有浮点内核中的最高吞吐（支持 FMA 时就是 FMA 峰值）
+    return max(row['gflops'] for row in results['flops'] if row['threads'] == threads)
+
+
+def memory_roof(roof, level, missing):
+    # 该层级的带宽上限；上限文件中没有这一级时（数据或上限来自另一台机器）返回 None，
+    # 并对每个缺失的层级只警告一次
+    gbps = roof['bandwidth_gbps'].get(level)
+    if gbps is None and level not in missing:
+        missing.add(level)
+        print(f"警告: 上限文件中没有 {level} 的带宽，落在该层级的点已跳过（数据和上限是否来自同一台机器？）")
+    return gbps
+
+
+def warn_above_roof(rows, key):
+    # 实测超过上限说明上限本身没测准（例如带宽内核受限于计算而不是访存）
+    above = [row for row in rows if row['fraction_of_roof'] > 1.0]
+    if above:
+        worst = max(above, key=lambda row: row['fraction_of_roof'])
+        print(f"警告: {len(above)} 个点超过了 roofline 上限，最高为 {key}={worst[key]} n={worst['size']} 的 "
+              f"{worst['fraction_of_roof']:.0%}，请检查上限的测量")
+
+
+def place(curves, suite, roof, topo, bytes_per_element=8):
+    # curves: {内核: (规模列表, 时间ns列表)}，与 costmodel.read_curves 的返回值相同
+    flops_per_element = FLOPS_PER_ELEMENT[suite]
+    intensity = flops_per_element / bytes_per_element
+    rows = []
+    missing = set()
+    for name, (sizes, times_ns) in curves.items():
+        for size, time_ns in zip(sizes, times_ns):
+            elements = size * size if suite == 'matvec' else size
+            footprint = elements * bytes_per_element
+            level = topology.level_for(footprint, topo)
+            gbps = memory_roof(roof, level, missing)
+            if gbps is None:
+                continue
+            bandwidth_limit = intensity * gbps
+            limit = min(roof['peak_gflops'], bandwidth_limit)
+            attained = elements * flops_per_element / time_ns
+            rows.append({
+                'kernel': name,
+                'size': int(size),
+                'level': level,
+                'intensity': intensity,
+                'gflops': round(attained, 4),
+                'gbps': round(footprint / time_ns, 3),
+                'roof_gflops': round(limit, 4),
+                'fraction_of_roof': round(attained / limit, 4),
+                'bound': 'memory' if bandwidth_limit < roof['peak_gflops'] else 'compute',
+            })
+    warn_above_roof(rows, 'kernel')
+    return rows
+
+
+def summarize(rows):
+    # 每个 (内核, 层级) 取达到上限比例的中位数
+    groups = {}
+    for row in rows:
+        groups.setdefault((row['kernel'], row['level']), []).append(row['fraction_of_roof'])
+    return {key: statistics.median(values) for key, values in groups.items()}
+
+
+def plot(rows, roof, output):
+    # 只有画图时才需要 matplotlib
+    import matplotlib.pyplot as plt
+
+    plt.figure(figsize=(12, 8))
+    intensities = np.logspace(-3, 2, 200)
+    for level, gbps in roof['bandwidth_gbps'].items():
+        plt.plot(intensities, np.minimum(roof['peak_gflops'], intensities * gbps), '--', label=f'{level} {gbps:.1f} GB/s')
+    plt.axhline(y=roof['peak_gflops'], color='black', linewidth=2, label=f"Peak {roof['peak_gflops']:.1f} GFLOP/s")
+
+    markers = {'L1': 'o', 'L2': 's', 'L3': '^', 'DRAM': 'x'}
+    kernels = sorted({row['kernel'] for row in rows})
+    colors = plt.cm.tab10(np.arange(len(kernels)) % 10)
+    for color, kernel in zip(colors, kernels):
+        label = kernel
+        for level, marker in markers.items():
+            points = [row for row in rows if row['kernel'] == kernel and row['level'] == level]
+            if points:
+                plt.scatter([row['intensity'] for row in points], [row['gflops'] for row in points],
+                            color=color, marker=marker, alpha=0.7, label=label)
+                label = None
+
+    plt.xscale('log')
+    plt.yscale('log')
+    plt.xlabel('Arithmetic Intensity (FLOP/Byte)', fontsize=14)
+    plt.ylabel('Performance (GFLOP/s)', fontsize=14)
+    plt.title('Empirical Roofline (marker = cache level of the working set)', fontsize=16)
+    plt.grid(True, which='both', linestyle='--', alpha=0.3)
+    plt.legend(fontsize=9)
+    plt.tight_layout()
+    plt.savefig(output, dpi=300)
+    plt.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='测量 roofline 上限（带宽、浮点峰值），或把内核测量结果放到 roofline 上')
+    parser.add_argument('--report', default=None, help='要放到 roofline 上的结果 CSV（harness 长表或 deep.cpp / common.cpp 宽表）')
+    parser.add_argument('--suite', choices=['sum', 'matvec'], default='sum', help='结果 CSV 中内核的类型')
+    parser.add_argument('--ceilings', default=ROOFLINE_FILE_NAME, help='上限 JSON：测量时写入，报告时读取')
+    parser.add_argument('--threads', default='1', help='测量时的线程数列表（逗号分隔，all 为全部核心）；报告时用第一个')
+    parser.add_argument('--stream-kernel', default='read', help='报告时作为带宽上限的 STREAM 内核')
+    parser.add_argument('-r', '--repeats', type=int, default=5, help='每个微基准的重复次数')
+    parser.add_argument('--time-unit', default='us', choices=['ns', 'us', 'ms'], help='宽表中时间列的单位')
+    parser.add_argument('--plot', default=None, help='保存 roofline 图')
+    parser.add_argument('-o', '--output', default='roofline_placement.csv', help='报告输出 CSV')
+    args = parser.parse_args()
+
+    thread_counts = []
+    for item in args.threads.split(','):
+        # all: 每个物理核心一个线程
+        thread_counts.append(len(physical_cores(default_cpus())) if item == 'all' else int(item))
+
+    if not args.report:
+        results = measure(thread_counts=thread_counts, repeats=args.repeats)
+        with open(args.ceilings, 'w', encoding='utf-8') as file:
+            json.dump(results, file, ensure_ascii=False, indent=2)
+        print(f"✅ 上限已保存到 {args.ceilings}")
+        return
+
+    with open(args.ceilings, encoding='utf-8') as file:
+        results = json.load(file)
+    roof = ceilings(results, thread_counts[0], args.stream_kernel)
+    curves = costmodel.read_curves(args.report, args.time_unit)
+    # 用产生这份数据的机器的缓存大小判断每个点所在的层级
+    rows = place(curves, args.suite, roof, topology.load_for(args.report))
+    if not rows:
+        print(f"❌ {args.report} 中没有能放到 roofline 上的数据点")
+        sys.exit(1)
+    for (kernel, level), fraction in sorted(summarize(rows).items()):
+        print(f"{kernel:>20} {level:>4}: 达到上限的 {fraction:.0%}")
+
+    with open(args.output, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.DictWriter(file, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"✅ 已保存到 {args.output}")
+    if args.plot:
+        plot(rows, roof, args.plot)
+        print(f"✅ roofline 图已保存到 {args.plot}")
+
+
+if __name__ == '__main__':
+    main()
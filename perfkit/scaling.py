@@ -0,0 +1,158 @@
+import json
+import argparse
+
+import numpy as np
+
+from perfkit import ingest, topology, roofline
+from perfkit.harness import time_batched, summarize
+from perfkit.kernels import parallel_sum_kernels, parallel_sum_batch_timer, buffer_address
+from perfkit.orchestrator import default_cpus, physical_cores
+
+# 多线程求和的强扩展 / 弱扩展
+# 强扩展：规模固定，线程数增加，加速比 S(p) = T(1) / T(p)，并行效率 S(p) / p，
+#         用 Amdahl 定律 S(p) = 1 / (s + (1 - s) / p) 拟合串行比例 s；
+# 弱扩展：每个线程的数据量固定，总规模随线程数增长，效率 T(1) / T(p)，
+#         扩展加速比 p · T(1) / T(p) 用 Gustafson 定律 S(p) = p - α (p - 1) 拟合串行比例 α。
+# 默认规模为内存区（8M–33M 个 double），给出 --ceilings 时标出超过单核带宽上限的数据点。
+
+DEFAULT_STRONG_SIZES = [8388608, 16777216, 33554432]
+DEFAULT_WEAK_SIZE = 8388608
+
+
+def default_thread_counts():
+    # 1, 2, 4, ... 直到物理核心数（每个物理核心一个线程）
+    cores = len(physical_cores(default_cpus()))
+    counts = [1]
+    while counts[-1] * 2 < cores:
+        counts.append(counts[-1] * 2)
+    if cores > 1:
+        counts.append(cores)
+    return counts
+
+
+def measure(points, names=None, repeats=5, min_sample_ns=1e6, seed=0):
+    # points: [(线程数, 规模)]；缓冲区按最大规模分配一次
+    names = names or parallel_sum_kernels()
+    capacity = max(size for _, size in points)
+    data = np.random.default_rng(seed).uniform(-100.0, 100.0, capacity)
+    address = buffer_address(data)
+    rows = []
+    for threads, size in points:
+        for name in names:
+            timer = parallel_sum_batch_timer(name)
+            row = {'kernel': name, 'threads': threads, 'size': size}
+            row.update(summarize(*time_batched(lambda batch: timer(address, size, threads, batch),
+                                               repeats, min_sample_ns)))
+            row['gbps'] = size * 8 / row['median_ns']
+            rows.append(row)
+            print(f"{name:>20} p={threads:<3} n={size:<10} 中位数 {row['median_ns'] / 1e3:.1f} us, "
+                  f"{row['gbps']:.2f} GB/s")
+    return rows
+
+
+def strong_scaling(sizes, thread_counts, **kwargs):
+    rows = measure([(threads, size) for size in sizes for threads in thread_counts], **kwargs)
+    base = {(row['kernel'], row['size']): row['median_ns'] for row in rows if row['threads'] == 1}
+    for row in rows:
+        row['mode'] = 'strong'
+        row['speedup'] = base[(row['kernel'], row['size'])] / row['median_ns']
+        row['efficiency'] = row['speedup'] / row['threads']
+    return rows
+
+
+def weak_scaling(size_per_thread, thread_counts, **kwargs):
+    rows = measure([(threads, size_per_thread * threads) for threads in thread_counts], **kwargs)
+    base = {row['kernel']: row['median_ns'] for row in rows if row['threads'] == 1}
+    for row in rows:
+        row['mode'] = 'weak'
+        row['efficiency'] = base[row['kernel']] / row['median_ns']
+        row['speedup'] = row['threads'] * row['efficiency']
+    return rows
+
+
+def fit_amdahl(points):
+    # points: [(p, S)]；1/S - 1/p = s (1 - 1/p)，对 s 做过原点的最小二乘
+    u = [1 - 1 / p for p, _ in points]
+    v = [1 / speedup - 1 / p for p, speedup in points]
+    denominator = sum(x * x for x in u)
+    if denominator == 0:
+        return None
+    return min(1.0, max(0.0, sum(x * y for x, y in zip(u, v)) / denominator))
+
+
+def fit_gustafson(points):
+    # points: [(p, 扩展加速比)]；p - S = α (p - 1)
+    u = [p - 1 for p, _ in points]
+    v = [p - speedup for p, speedup in points]
+    denominator = sum(x * x for x in u)
+    if denominator == 0:
+        return None
+    return min(1.0, max(0.0, sum(x * y for x, y in zip(u, v)) / denominator))
+
+
+def fits(rows):
+    # 每个 (模式, 内核, 规模) 一条曲线；弱扩展按内核合并
+    curves = {}
+    for row in rows:
+        key = (row['mode'], row['kernel'], row['size'] if row['mode'] == 'strong' else None)
+        curves.setdefault(key, []).append((row['threads'], row['speedup']))
+    result = {}
+    for (mode, kernel, size), points in curves.items():
+        fit = fit_amdahl if mode == 'strong' else fit_gustafson
+        result[(mode, kernel, size)] = fit(points)
+    return result
+
+
+def mark_ceiling(rows, ceiling_gbps):
+    # 单核内存带宽上限来自 perfkit.roofline 的测量结果
+    for row in rows:
+        row['above_single_core_ceiling'] = row['gbps'] > ceiling_gbps
+
+
+def main():
+    parser = argparse.ArgumentParser(description='多线程求和的强扩展 / 弱扩展扫描，并拟合 Amdahl / Gustafson 定律')
+    parser.add_argument('--threads', default=None, help='逗号分隔的线程数，默认 1,2,4,... 直到物理核心数')
+    parser.add_argument('--sizes', default=None, help='强扩展的规模列表（逗号分隔），默认内存区 8M/16M/32M')
+    parser.add_argument('--weak-size', type=int, default=DEFAULT_WEAK_SIZE, help='弱扩展中每个线程的元素个数，0 表示不测')
+    parser.add_argument('--kernels', default=None, help='逗号分隔的内核名，默认全部')
+    parser.add_argument('-r', '--repeats', type=int, default=5, help='每个数据点的重复次数')
+    parser.add_argument('--min-sample-us', type=float, default=1000.0, help='每个样本的最短时长（微秒）')
+    parser.add_argument('--ceilings', default=None, help='perfkit.roofline 的上限 JSON，用于标出超过单核带宽的点')
+    parser.add_argument('-o', '--output', default='scaling.csv', help='输出 CSV 文件')
+    args = parser.parse_args()
+
+    thread_counts = [int(item) for item in args.threads.split(',')] if args.threads else default_thread_counts()
+    if 1 not in thread_counts:
+        thread_counts.insert(0, 1)
+    sizes = [int(size) for size in args.sizes.split(',') if size] if args.sizes else DEFAULT_STRONG_SIZES
+    options = dict(names=args.kernels.split(',') if args.kernels else None, repeats=args.repeats,
+                   min_sample_ns=args.min_sample_us * 1e3)
+
+    rows = strong_scaling(sizes, thread_counts, **options)
+    if args.weak_size:
+        rows += weak_scaling(args.weak_size, thread_counts, **options)
+
+    for (mode, kernel, size), serial in fits(rows).items():
+        if serial is None:
+            continue
+        if mode == 'strong':
+            limit = f"{1 / serial:.1f}x" if serial > 0 else '无上限'
+            print(f"Amdahl    {kernel:>20} n={size:<10} 串行比例 s={serial:.3f}，加速比上限 {limit}")
+        else:
+            print(f"Gustafson {kernel:>20} 每线程 n={args.weak_size:<10} 串行比例 α={serial:.3f}")
+
+    if args.ceilings:
+        with open(args.ceilings, encoding='utf-8') as file:
+            ceiling = roofline.ceilings(json.load(file), 1)['bandwidth_gbps']['DRAM']
+        mark_ceiling(rows, ceiling)
+        best = max(rows, key=lambda row: row['gbps'])
+        print(f"单核内存带宽上限 {ceiling:.2f} GB/s，最高 {best['gbps']:.2f} GB/s"
+              f"（{best['kernel']} p={best['threads']}）")
+
+    ingest.save_to_csv(rows, args.output, ingest.table_fields(rows, leading=('mode', 'kernel', 'threads', 'size')))
+    topology.record(args.output)
+    print(f"✅ 共 {len(rows)} 个数据点，已保存到 {args.output}")
+
+
+if __name__ == '__main__':
+    main()
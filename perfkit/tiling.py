@@ -0,0 +1,103 @@
+import argparse
+
+from perfkit import topology
+
+# 由缓存拓扑推出分块大小
+# 矩阵向量内核 tiled 按列分块：一块内 result 的 col_block 个元素一直留在 L1，
+# 取 2 的幂并使这一段不超过 L1 的 1/4，其余空间留给逐行流过的 A 和 v；
+# 每次同时处理 ROW_BLOCK 行，result 的每次读写对应 ROW_BLOCK 个乘加。
+# 扫描时在推出的值附近取候选（列分块 1/4 到 2 倍，行数 2 / 4 / 8），由 perfkit.harness --tiles sweep 使用。
+# 批量矩阵向量（k 个向量）的列分块同时受两处限制：ROW_BLOCK 行的 A 段占 L1 的一半（在 k 个向量间复用），
+# k 个结果段占 L2 的一半。
+# 矩阵乘（perfkit/native/gemm.cpp）按 BLIS 的思路分三层：KC×NR 的 B 微面板占 L1 的一半，
+# MC×KC 的 A 块占 L2 的一半，KC×NC 的 B 块占最后一级缓存的一半（不超过 MAX_NC 列）。
+
+ROW_BLOCK = 4
+ROW_BLOCKS = (2, 4, 8)
+DEFAULT_L1_BYTES = 32 * 1024
+DEFAULT_L2_BYTES = 1024 * 1024
+
+# 与 gemm.cpp 的微内核一致：C 块为 GEMM_MR 行 × GEMM_NR 列
+GEMM_MR = 6
+GEMM_NR = 8
+MAX_NC = 4096
+
+
+def matvec_tiles(topo, row_block=ROW_BLOCK, bytes_per_element=8):
+    # 返回 (列分块, 行数)
+    l1 = topology.cache_sizes(topo).get('L1', DEFAULT_L1_BYTES)
+    col_block = 8
+    while col_block * 2 * bytes_per_element <= l1 / 4:
+        col_block *= 2
+    return col_block, row_block
+
+
+def matvec_tile_candidates(topo):
+    col_block, _ = matvec_tiles(topo)
+    return [(max(8, col_block * scale // 4), row_block)
+            for scale in (1, 2, 4, 8) for row_block in ROW_BLOCKS]
+
+
+def batched_matvec_tiles(topo, vectors, row_block=ROW_BLOCK, bytes_per_element=8):
+    # 返回 (列分块, 行数)
+    sizes = topology.cache_sizes(topo)
+    l1 = sizes.get('L1', DEFAULT_L1_BYTES)
+    l2 = sizes.get('L2', DEFAULT_L2_BYTES)
+    limit = min(l1 / 2 / (row_block * bytes_per_element), l2 / 2 / (vectors * bytes_per_element))
+    return max(8, _power_of_two_floor(limit)), row_block
+
+
+def _round_down(value, multiple):
+    return max(multiple, int(value) // multiple * multiple)
+
+
+def _power_of_two_floor(value):
+    power = 1
+    while power * 2 <= value:
+        power *= 2
+    return power
+
+
+def gemm_tiles(topo, bytes_per_element=8):
+    # 返回 (MC, KC, NC)
+    sizes = topology.cache_sizes(topo)
+    l1 = sizes.get('L1', DEFAULT_L1_BYTES)
+    l2 = sizes.get('L2', DEFAULT_L2_BYTES)
+    last = sizes[max(sizes)] if sizes else 4 * l2
+    kc = _power_of_two_floor(l1 / 2 / (GEMM_NR * bytes_per_element))
+    mc = _round_down(l2 / 2 / (kc * bytes_per_element), GEMM_MR)
+    nc = min(MAX_NC, _round_down(last / 2 / (kc * bytes_per_element), GEMM_NR))
+    return mc, kc, nc
+
+
+def parse_tiles(text):
+    # '1024x4,512x8' -> [(1024, 4), (512, 8)]
+    tiles = []
+    for item in text.split(','):
+        if item:
+            col_block, row_block = item.lower().split('x')
+            tiles.append((int(col_block), int(row_block)))
+    return tiles
+
+
+def format_tiles(tiles):
+    return ','.join(f'{col_block}x{row_block}' for col_block, row_block in tiles)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='根据缓存拓扑给出矩阵向量内核的分块大小（列分块x行数）或矩阵乘的分块大小')
+    parser.add_argument('--topology', default=None, help='使用记录下来的拓扑 JSON，默认检测本机')
+    parser.add_argument('--candidates', action='store_true', help='输出扫描用的全部候选')
+    parser.add_argument('--gemm', action='store_true', help='输出矩阵乘的分块 MCxKCxNC')
+    args = parser.parse_args()
+
+    topo = topology.load(args.topology) if args.topology else topology.detect()
+    if args.gemm:
+        print('x'.join(map(str, gemm_tiles(topo))))
+        return
+    tiles = matvec_tile_candidates(topo) if args.candidates else [matvec_tiles(topo)]
+    print(format_tiles(tiles))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,263 @@
+import os
+import re
+import json
+import math
+import socket
+import platform
+import argparse
+import subprocess
+
+# 机器的缓存拓扑：从 /sys/devices/system/cpu/cpu*/cache/index*/ 读取每级缓存的大小和共享范围，
+# 没有 sysfs 时（Windows、容器）退回到 lscpu 的 "L1d cache: 896 KiB (24 instances)" 汇总行。
+# 每次基准测试都把检测结果保存在数据文件旁边（<数据文件名>.topology.json），
+# 画图和按缓存区间分组时用 load_for(数据文件) 读取产生这份数据的机器的缓存边界；
+# 只找到目录级记录且它的 system 与数据所在平台（调用方给出）不一致时给出警告，边界不可信。
+# perfkit.latency 测得的各级加载延迟也写在同一份记录的 latency 字段里。
+
+TOPOLOGY_SUFFIX = '.topology.json'
+TOPOLOGY_FILE_NAME = 'topology.json'  # 目录级的记录，目录下所有数据文件共用
+
+_SIZE_RE = re.compile(r'([0-9.]+)\s*([KMG]?)(?:i?B)?', re.IGNORECASE)
+_INSTANCES_RE = re.compile(r'\((\d+) instances?\)')
+_UNITS = {'': 1, 'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+
+# lscpu 汇总行 -> 缓存级别
+_LSCPU_CACHES = {'L1d cache': 'L1', 'L2 cache': 'L2', 'L3 cache': 'L3'}
+
+
+def read_sys(path):
+    try:
+        with open(path) as file:
+            return file.read().strip()
+    except OSError:
+        return ''
+
+
+def parse_cpu_list(text):
+    # "0-3,8,10-11" -> [0, 1, 2, 3, 8, 10, 11]
+    cpus = []
+    for part in text.strip().split(','):
+        if not part:
+            continue
+        if '-' in part:
+            start, end = part.split('-')
+            cpus.extend(range(int(start), int(end) + 1))
+        else:
+            cpus.append(int(part))
+    return cpus
+
+
+def parse_size(text):
+    # "48K" / "896 KiB" / "2 MiB" -> 字节数
+    match = _SIZE_RE.search(text or '')
+    if not match:
+        return None
+    return int(float(match.group(1)) * _UNITS[match.group(2).upper()])
+
+
+def read_caches(cpu=0):
+    caches = []
+    base = f'/sys/devices/system/cpu/cpu{cpu}/cache'
+    if not os.path.isdir(base):
+        return caches
+    for name in sorted(os.listdir(base)):
+        if not name.startswith('index'):
+            continue
+        path = os.path.join(base, name)
+        shared = read_sys(os.path.join(path, 'shared_cpu_list'))
+        line_size = read_sys(os.path.join(path, 'coherency_line_size'))
+        caches.append({
+            'level': int(read_sys(os.path.join(path, 'level')) or 0),
+            'type': read_sys(os.path.join(path, 'type')),
+            'size_bytes': parse_size(read_sys(os.path.join(path, 'size'))),
+            'shared_cpu_list': shared,
+            'shared_cpus': len(parse_cpu_list(shared)) if shared else None,
+            'line_size': int(line_size) if line_size else None,
+        })
+    return caches
+
+
+def read_lscpu():
+    try:
+        output = subprocess.run(['lscpu'], capture_output=True, text=True,
+                                env=dict(os.environ, LC_ALL='C')).stdout
+    except OSError:
+        return {}
+    info = {}
+    for line in output.splitlines():
+        key, sep, value = line.partition(':')
+        if sep:
+            info[key.strip()] = value.strip()
+    return info
+
+
+def _sizes_from_caches(caches):
+    # 每级取数据缓存或统一缓存的单个实例大小
+    sizes = {}
+    for cache in caches:
+        if cache['type'] in ('Data', 'Unified') and cache['size_bytes']:
+            sizes.setdefault(f"L{cache['level']}", cache['size_bytes'])
+    return sizes
+
+
+def _sizes_from_lscpu(lscpu):
+    # "896 KiB (24 instances)" 是所有实例的总和，除以实例数得到每个实例的大小
+    sizes = {}
+    for key, level in _LSCPU_CACHES.items():
+        total = parse_size(lscpu.get(key))
+        if total:
+            match = _INSTANCES_RE.search(lscpu[key])
+            sizes[level] = total // int(match.group(1)) if match else total
+    return sizes
+
+
+def detect(cpu=None):
+    if cpu is None:
+        cpu = min(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else 0
+    caches = read_caches(cpu)
+    lscpu = read_lscpu()
+    topology = {
+        'hostname': socket.gethostname(),
+        'system': platform.system(),
+        'machine': platform.machine(),
+        'model_name': lscpu.get('Model name') or platform.processor(),
+        'logical_cpus': os.cpu_count(),
+        'cpu': cpu,
+        'caches': caches,
+        'lscpu': {key: lscpu[key] for key in _LSCPU_CACHES if key in lscpu},
+    }
+    topology['cache_sizes'] = _sizes_from_caches(caches) or _sizes_from_lscpu(lscpu)
+    topology['source'] = 'sysfs' if caches else 'lscpu'
+    return topology
+
+
+def numa_nodes():
+    # {节点号: [CPU 列表]}；没有 /sys/devices/system/node 时整台机器算一个节点
+    base = '/sys/devices/system/node'
+    nodes = {}
+    if os.path.isdir(base):
+        for name in sorted(os.listdir(base)):
+            if re.fullmatch(r'node\d+', name):
+                nodes[int(name[4:])] = parse_cpu_list(read_sys(f'{base}/{name}/cpulist'))
+    return nodes or {0: list(range(os.cpu_count() or 1))}
+
+
+def cache_sizes(topology):
+    # {'L1': 字节, 'L2': 字节, 'L3': 字节}；手工记录的文件可以只有 lscpu 汇总行
+    return topology.get('cache_sizes') or _sizes_from_lscpu(topology.get('lscpu', {}))
+
+
+def boundaries(topology, bytes_per_element=8):
+    # 每级缓存能容纳的元素个数，例如 double 数组求和的 L1/L2/L3 边界
+    return {level: int(size / bytes_per_element) for level, size in cache_sizes(topology).items()}
+
+
+def matrix_boundaries(topology, bytes_per_element=8):
+    # n×n 矩阵恰好装满每级缓存时的 n
+    return {level: int(math.sqrt(size / bytes_per_element)) for level, size in cache_sizes(topology).items()}
+
+
+def regions(topology, bytes_per_element=8):
+    # (下界, 上界, 名称) 区间列表：L1 Region ... Memory Region，上界为元素个数
+    edges = boundaries(topology, bytes_per_element)
+    result = []
+    lower = 0
+    for level in sorted(edges):
+        result.append((lower, edges[level], f'{level} Region'))
+        lower = edges[level]
+    result.append((lower, float('inf'), 'Memory Region'))
+    return result
+
+
+def level_for(nbytes, topology):
+    # 工作集能放进的最小一级缓存，都放不下时为 DRAM
+    for level, capacity in sorted(cache_sizes(topology).items()):
+        if nbytes <= capacity:
+            return level
+    return 'DRAM'
+
+
+def latencies(topology):
+    # perfkit.latency 测得的每级加载延迟 {'L1': ns, ..., 'DRAM': ns}，没有测过时为空
+    return topology.get('latency', {}).get('plateau_ns', {})
+
+
+def format_size(size):
+    if size >= 1024 ** 2:
+        return f'{size / 1024 ** 2:.2f}MB'
+    return f'{size / 1024:.1f}KB'
+
+
+def format_count(count):
+    # 元素个数的简写: 4778 -> 4.8K, 4718592 -> 4.7M
+    if count >= 1e6:
+        return f'{count / 1e6:.1f}M'
+    if count >= 1e3:
+        return f'{count / 1e3:.1f}K'
+    return str(count)
+
+
+def describe(topology):
+    sizes = cache_sizes(topology)
+    parts = [f'{level}={format_size(size)}' for level, size in sorted(sizes.items())]
+    return f"{topology.get('model_name') or '未知CPU'} ({topology.get('source')}): " + ', '.join(parts)
+
+
+def topology_path(data_path):
+    return os.path.splitext(data_path)[0] + TOPOLOGY_SUFFIX
+
+
+def save(topology, path):
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(topology, file, ensure_ascii=False, indent=2)
+
+
+def load(path):
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)
+
+
+def record(data_path, topology=None):
+    # 与数据文件一起保存产生它的机器的拓扑
+    topology = topology or detect()
+    save(topology, topology_path(data_path))
+    return topology
+
+
+def load_for(data_path, system=None):
+    # 依次查找 <数据文件名>.topology.json 和同目录的 topology.json，都没有时使用本机检测结果。
+    # system: 数据来自的平台（platform.system() 的取值，如 'Windows'）；目录级记录是其他平台的时给出警告
+    sidecar = topology_path(data_path)
+    if os.path.exists(sidecar):
+        return load(sidecar)
+    shared = os.path.join(os.path.dirname(os.path.abspath(data_path)), TOPOLOGY_FILE_NAME)
+    if os.path.exists(shared):
+        topology = load(shared)
+        if system and topology.get('system') != system:
+            print(f"警告: {data_path} 来自 {system}，但只有 {topology.get('system') or '未知平台'} 的目录级拓扑记录 "
+                  f"{shared}，缓存边界可能不对；请用 python -m perfkit.topology --for 在该机器上记录")
+        return topology
+    print(f"警告: 没有找到 {data_path} 的拓扑记录，使用本机检测到的缓存大小")
+    detected = detect()
+    if system and detected.get('system') != system:
+        print(f"警告: 本机是 {detected.get('system')}，而数据来自 {system}")
+    return detected
+
+
+def main():
+    parser = argparse.ArgumentParser(description='检测缓存拓扑并保存到数据文件旁边')
+    parser.add_argument('--for', dest='data_file', default=None, help='为该数据文件记录拓扑（<文件名>.topology.json）')
+    parser.add_argument('-o', '--output', default=None, help='直接指定输出的 JSON 文件')
+    parser.add_argument('--cpu', type=int, default=None, help='读取哪个 CPU 的缓存信息，默认当前进程可用的第一个')
+    args = parser.parse_args()
+
+    topology = detect(args.cpu)
+    print(describe(topology))
+    output = args.output or (topology_path(args.data_file) if args.data_file else None)
+    if output:
+        save(topology, output)
+        print(f"✅ 拓扑已保存到 {output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,188 @@
+import os
+import csv
+import sys
+import glob
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+from perfkit import ingest, topology
+from perfkit.native_lib import NATIVE_DIR, LIB_NAME
+
+# 编译器 × 编译选项的变体矩阵
+# add/ 和 matrix/ 下的可执行文件是用什么选项编译的没有记录（add/build/Debug 说明有些结果来自调试构建）。
+# 这里用每个可用的编译器（gcc / clang）和每组选项各构建一份 libperfkit.so（perfkit/native/variants/<变体>/），
+# 再通过 PERFKIT_LIB 让同一个 perfkit.harness 分别测量，结果合并成一张以变体为键的表。
+# pgo 变体先用插桩版本跑一遍较小的扫描收集剖析数据，再用它重新编译。
+# 只允许重排浮点加法（-ffast-math）往往就能让平凡算法变成最快的内核，手工优化之前先看这张表。
+
+COMPILERS = {'gcc': 'g++', 'clang': 'clang++'}
+
+FLAG_SETS = {
+    'O0': '-O0 -g',  # 调试构建
+    'O2': '-O2',
+    'O3': '-O3',
+    'O3-native': '-O3 -march=native',
+    'O3-fast-math': '-O3 -ffast-math',
+    'O3-unroll': '-O3 -funroll-loops',
+    'O3-native-fast-math-unroll': '-O3 -march=native -ffast-math -funroll-loops',
+}
+PGO = 'pgo'
+PGO_FLAGS = '-O3 -march=native'
+
+# 加速比的基准变体
+BASELINE = 'gcc-O2'
+
+DEFAULT_BUILD_DIR = os.path.join(NATIVE_DIR, 'variants')
+DEFAULT_SIZES = {'sum': '1024,8192,65536,1048576,16777216', 'matvec': '100,500,1000,2000'}
+# PGO 训练运行使用的较小规模
+TRAINING_SIZES = {'sum': '1024,65536,1048576', 'matvec': '100,500,1000'}
+
+_PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def compiler_version(cxx):
+    result = subprocess.run([cxx, '--version'], capture_output=True, text=True)
+    return result.stdout.splitlines()[0] if result.returncode == 0 and result.stdout else cxx
+
+
+def build(cxx, optflags, output):
+    # make -B 强制重新编译，输出到 output
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    result = subprocess.run(['make', '-B', '-C', NATIVE_DIR, f'CXX={cxx}', f'OPTFLAGS={optflags}',
+                             f'LIB={os.path.abspath(output)}'], capture_output=True, text=True)
+    if result.returncode != 0:
+        raise OSError(f'构建 {output} 失败（{cxx} {optflags}）:\n{result.stderr}')
+    return output
+
+
+def run_harness(lib_path, suite, sizes, repeats, workdir):
+    # 在子进程中用指定的库运行 perfkit.harness，返回结果行
+    output = os.path.join(workdir, f'{suite}.csv')
+    env = dict(os.environ, PERFKIT_LIB=os.path.abspath(lib_path),
+               PYTHONPATH=os.pathsep.join(filter(None, [_PACKAGE_ROOT, os.environ.get('PYTHONPATH')])))
+    command = [sys.executable, '-m', 'perfkit.harness', suite, '--sizes', sizes, '--batched',
+               '-r', str(repeats), '-o', output]
+    result = subprocess.run(command, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise OSError(f'{lib_path} 的 {suite} 扫描失败:\n{result.stderr}')
+    with open(output, newline='', encoding='utf-8') as file:
+        return list(csv.DictReader(file))
+
+
+def build_pgo(compiler, cxx, output, repeats, workdir):
+    # 插桩版本和最终版本输出到同一路径，gcc 按输出文件名查找剖析数据
+    profile_dir = os.path.join(os.path.dirname(os.path.abspath(output)), 'profile')
+    shutil.rmtree(profile_dir, ignore_errors=True)
+    if compiler == 'gcc':
+        generate = f'-fprofile-generate={profile_dir}'
+        use = f'-fprofile-use={profile_dir} -fprofile-correction -Wno-missing-profile'
+    else:
+        generate = f'-fprofile-instr-generate={profile_dir}/default-%p.profraw'
+        use = f'-fprofile-instr-use={profile_dir}/merged.profdata'
+
+    build(cxx, f'{PGO_FLAGS} {generate}', output)
+    for suite, sizes in TRAINING_SIZES.items():
+        run_harness(output, suite, sizes, repeats, workdir)
+    if compiler == 'clang':
+        raw = glob.glob(os.path.join(profile_dir, '*.profraw'))
+        subprocess.run(['llvm-profdata', 'merge', '-o', os.path.join(profile_dir, 'merged.profdata'), *raw],
+                       check=True, capture_output=True)
+    return build(cxx, f'{PGO_FLAGS} {use}', output)
+
+
+def add_speedups(rows):
+    # speedup_vs_baseline: 同一 (套件, 内核, 规模) 下基准变体的耗时 / 本变体的耗时；
+    # speedup_vs_naive: 同一变体、同一规模下平凡算法的耗时 / 本内核的耗时
+    baseline = {(row['suite'], row['kernel'], row['size']): row['median_ns']
+                for row in rows if row['variant'] == BASELINE}
+    naive = {(row['variant'], row['suite'], row['size']): row['median_ns']
+             for row in rows if row['kernel'] == 'naive'}
+    for row in rows:
+        reference = baseline.get((row['suite'], row['kernel'], row['size']))
+        row['speedup_vs_baseline'] = reference / row['median_ns'] if reference else None
+        reference = naive.get((row['variant'], row['suite'], row['size']))
+        row['speedup_vs_naive'] = reference / row['median_ns'] if reference else None
+
+
+def fastest_kernels(rows):
+    # {(变体, 套件, 规模): 最快的那一行}
+    best = {}
+    for row in rows:
+        key = (row['variant'], row['suite'], row['size'])
+        if key not in best or row['median_ns'] < best[key]['median_ns']:
+            best[key] = row
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='用不同编译器和编译选项构建 libperfkit.so，并用同一个 harness 测量每个变体')
+    parser.add_argument('--compilers', default=','.join(COMPILERS), help='逗号分隔的编译器（gcc,clang），找不到的跳过')
+    parser.add_argument('--flag-sets', default=','.join(list(FLAG_SETS) + [PGO]),
+                        help=f"逗号分隔的选项组: {', '.join(FLAG_SETS)}, {PGO}")
+    parser.add_argument('--suites', default='sum,matvec', help='要测量的内核套件')
+    parser.add_argument('--sum-sizes', default=DEFAULT_SIZES['sum'], help='求和的规模列表')
+    parser.add_argument('--matvec-sizes', default=DEFAULT_SIZES['matvec'], help='矩阵向量的规模列表')
+    parser.add_argument('-r', '--repeats', type=int, default=5, help='每个数据点的重复次数')
+    parser.add_argument('--build-dir', default=DEFAULT_BUILD_DIR, help='变体库的输出目录')
+    parser.add_argument('-o', '--output', default='variants.csv', help='输出 CSV 文件')
+    args = parser.parse_args()
+
+    unknown = [name for name in args.compilers.split(',') if name not in COMPILERS]
+    if unknown:
+        parser.error(f"未知的编译器: {', '.join(unknown)}（可选: {', '.join(COMPILERS)}）")
+    unknown = [name for name in args.flag_sets.split(',') if name not in FLAG_SETS and name != PGO]
+    if unknown:
+        parser.error(f"未知的选项组: {', '.join(unknown)}（可选: {', '.join(FLAG_SETS)}, {PGO}）")
+
+    compilers = {}
+    for name in args.compilers.split(','):
+        if shutil.which(COMPILERS[name]):
+            compilers[name] = COMPILERS[name]
+        else:
+            print(f"警告: 找不到 {COMPILERS[name]}，跳过 {name}")
+    if 'clang' in compilers and not shutil.which('llvm-profdata'):
+        print("警告: 找不到 llvm-profdata，跳过 clang 的 PGO")
+    sizes = {'sum': args.sum_sizes, 'matvec': args.matvec_sizes}
+    suites = args.suites.split(',')
+
+    rows = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for compiler, cxx in compilers.items():
+            version = compiler_version(cxx)
+            for flag_set in args.flag_sets.split(','):
+                variant = f'{compiler}-{flag_set}'
+                output = os.path.join(args.build_dir, variant, LIB_NAME)
+                try:
+                    if flag_set == PGO:
+                        if compiler == 'clang' and not shutil.which('llvm-profdata'):
+                            continue
+                        build_pgo(compiler, cxx, output, args.repeats, workdir)
+                        flags = f'{PGO_FLAGS} +PGO'
+                    else:
+                        flags = FLAG_SETS[flag_set]
+                        build(cxx, flags, output)
+                except OSError as error:
+                    print(f"警告: {error}")
+                    continue
+                print(f"== {variant}: {version}, {flags}")
+                for suite in suites:
+                    for row in run_harness(output, suite, sizes[suite], args.repeats, workdir):
+                        row.update({'variant': variant, 'compiler': version, 'flags': flags, 'suite': suite,
+                                    'size': int(row['size']), 'median_ns': float(row['median_ns'])})
+                        rows.append(row)
+
+    add_speedups(rows)
+    print("\n每个变体在各规模下最快的内核:")
+    for (variant, suite, size), row in sorted(fastest_kernels(rows).items()):
+        print(f"{variant:>32} {suite:>6} n={size:<9} {row['kernel']:>14} {row['median_ns']:.1f} ns")
+
+    ingest.save_to_csv(rows, args.output,
+                       ingest.table_fields(rows, leading=('variant', 'compiler', 'flags', 'suite', 'kernel', 'size')))
+    topology.record(args.output)
+    print(f"✅ 共 {len(rows)} 个数据点，已保存到 {args.output}")
+
+
+if __name__ == '__main__':
+    main()